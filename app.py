@@ -1,40 +1,79 @@
-from flask import Flask, jsonify, request, send_file
+from flask import Flask, jsonify, request, send_file, Response, g
 from flask_cors import CORS
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import zlib
+import gzip
 import re
 import os
+import sys
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate
 from functools import wraps
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlsplit
 import threading
 from queue import Queue
 import time
 import hashlib
 import io
+import glob
+import bisect
+import mimetypes
+import base64
+import uuid
+from collections import OrderedDict, deque
+import importlib
+import importlib.util
+
+class LazyModule:
+    """
+    Stand-in for a heavy dependency: the real module is imported on first attribute
+    access, so a cold start (e.g. a serverless /health) only pays for the subsystems the
+    request actually uses. Imports are serialized by Python's import lock.
+    """
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
 
-# Optional imports with fallbacks
-try:
-    import gspread
-    from google.oauth2.service_account import Credentials
-    GSPREAD_AVAILABLE = True
-except ImportError as e:
-    GSPREAD_AVAILABLE = False
-    print(f"Warning: gspread not available: {e}")
+    def _load(self):
+        module = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, '_module', module)
+        return module
 
-try:
-    import bcrypt
-    BCRYPT_AVAILABLE = True
-except ImportError as e:
-    BCRYPT_AVAILABLE = False
-    print(f"Warning: bcrypt not available: {e}")
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
 
-try:
-    import jwt
-    JWT_AVAILABLE = True
-except ImportError as e:
-    JWT_AVAILABLE = False
-    print(f"Warning: jwt not available: {e}")
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+def module_available(name):
+    """Whether a module can be imported, without importing it (parent packages excepted)"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+# Optional heavy dependencies, imported lazily on first use
+GSPREAD_AVAILABLE = module_available('gspread')
+if not GSPREAD_AVAILABLE:
+    print("Warning: gspread not available")
+gspread = LazyModule('gspread')
+service_account = LazyModule('google.oauth2.service_account')
+
+BCRYPT_AVAILABLE = module_available('bcrypt')
+if not BCRYPT_AVAILABLE:
+    print("Warning: bcrypt not available")
+bcrypt = LazyModule('bcrypt')
+
+JWT_AVAILABLE = module_available('jwt')
+if not JWT_AVAILABLE:
+    print("Warning: jwt not available")
+jwt = LazyModule('jwt')
 
 try:
     from werkzeug.utils import secure_filename
@@ -54,11 +93,14 @@ except ImportError as e:
     print(f"Warning: pathlib not available: {e}")
 
 try:
-    import yt_dlp
-    YT_DLP_AVAILABLE = True
-except ImportError as e:
-    YT_DLP_AVAILABLE = False
-    print(f"Warning: yt_dlp not available: {e}. Video downloads will be disabled.")
+    import fcntl
+except ImportError:
+    fcntl = None  # Not available on Windows; the scrubber then runs in every process
+
+YT_DLP_AVAILABLE = module_available('yt_dlp')
+if not YT_DLP_AVAILABLE:
+    print("Warning: yt_dlp not available. Video downloads will be disabled.")
+yt_dlp = LazyModule('yt_dlp')
 
 try:
     from concurrent.futures import ThreadPoolExecutor
@@ -67,15 +109,14 @@ except ImportError as e:
     THREADPOOL_AVAILABLE = False
     print(f"Warning: ThreadPoolExecutor not available: {e}")
 
-try:
-    from google.oauth2 import id_token
-    from google.auth.transport import requests as google_requests
-    from googleapiclient.discovery import build
-    from googleapiclient.http import MediaIoBaseUpload
-    GOOGLE_API_AVAILABLE = True
-except ImportError as e:
-    GOOGLE_API_AVAILABLE = False
-    print(f"Warning: Google API client not available: {e}")
+GOOGLE_API_AVAILABLE = module_available('googleapiclient') and module_available('google_auth_httplib2')
+if not GOOGLE_API_AVAILABLE:
+    print("Warning: Google API client not available")
+id_token = LazyModule('google.oauth2.id_token')
+google_requests = LazyModule('google.auth.transport.requests')
+googleapiclient_discovery = LazyModule('googleapiclient.discovery')
+googleapiclient_http = LazyModule('googleapiclient.http')
+google_auth_httplib2 = LazyModule('google_auth_httplib2')
 
 # Note: boto3/AWS S3 is no longer used - removed to avoid security issues with credentials
 
@@ -186,17 +227,15 @@ CORS(app, resources={
             "http://127.0.0.1:3000"
         ],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "HEAD"],
-        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Accept", "Origin"],
-        "expose_headers": ["Content-Type", "Authorization"],
+        "allow_headers": ["Content-Type", "Authorization", "X-Requested-With", "Accept", "Origin", "Range"],
+        "expose_headers": ["Content-Type", "Authorization", "Content-Range", "Accept-Ranges", "Content-Length", "ETag"],
         "supports_credentials": True,
         "max_age": 3600
     }
 })
 
-# Add explicit CORS headers for all responses
-@app.after_request
-def add_cors_headers(response):
-    origin = request.headers.get('Origin')
+def cors_headers(origin):
+    """Explicit CORS headers for a request from origin (empty if the origin is not allowed)"""
     allowed_origins = [
         "https://shortssprint.vercel.app",
         "https://shortssprits-backend-git-main-u-r.vercel.app",
@@ -212,12 +251,20 @@ def add_cors_headers(response):
 
     # Allow any Vercel preview deployment URLs
     if origin and (origin in allowed_origins or '.vercel.app' in origin):
-        response.headers['Access-Control-Allow-Origin'] = origin
-        response.headers['Access-Control-Allow-Credentials'] = 'true'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS, HEAD'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-Requested-With, Accept, Origin'
-        response.headers['Access-Control-Expose-Headers'] = 'Content-Type, Authorization'
+        return {
+            'Access-Control-Allow-Origin': origin,
+            'Access-Control-Allow-Credentials': 'true',
+            'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS, HEAD',
+            'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-Requested-With, Accept, Origin, Range',
+            'Access-Control-Expose-Headers': 'Content-Type, Authorization, Content-Range, Accept-Ranges, Content-Length, ETag'
+        }
+    return {}
 
+# Add explicit CORS headers for all responses
+@app.after_request
+def add_cors_headers(response):
+    for name, value in cors_headers(request.headers.get('Origin')).items():
+        response.headers[name] = value
     return response
 
 # ==================== SCALABILITY ENHANCEMENTS ====================
@@ -243,7 +290,26 @@ class SimpleCache:
     def set(self, key, value):
         with self.lock:
             self.cache[key] = (value, time.time())
-    
+
+    def get_many(self, keys):
+        """Return {key: value} for all keys, or None unless every key is present and fresh"""
+        with self.lock:
+            now = time.time()
+            values = {}
+            for key in keys:
+                item = self.cache.get(key)
+                if item is None or now - item[1] >= self.ttl:
+                    return None
+                values[key] = item[0]
+            return values
+
+    def set_many(self, items):
+        """Store several entries under one lock and timestamp, so they expire together"""
+        with self.lock:
+            timestamp = time.time()
+            for key, value in items.items():
+                self.cache[key] = (value, timestamp)
+
     def clear(self):
         with self.lock:
             self.cache.clear()
@@ -258,25 +324,266 @@ sheets_cache = SimpleCache(ttl=300)  # Cache sheets data for 5 minutes
 credentials_cache = SimpleCache(ttl=600)  # Cache credentials for 10 minutes
 filters_cache = SimpleCache(ttl=300)  # Cache filters for 5 minutes
 
+class PooledHTTPClient:
+    """
+    Process-wide HTTP client for outbound calls (gviz exports, Apps Script).
+    - One requests.Session with keep-alive, so repeat calls to docs.google.com skip
+      the TCP and TLS handshakes
+    - Connection pool per host sized to the request threads of a worker
+    - gzip/deflate response compression (requests' default Accept-Encoding)
+    - (connect, read) timeouts chosen per host unless the caller passes one
+    The session is recreated in forked children so workers never share sockets
+    opened by the preloading master.
+    """
+    def __init__(self, pool_maxsize, host_timeouts, default_timeout):
+        self.pool_maxsize = pool_maxsize
+        self.host_timeouts = host_timeouts
+        self.default_timeout = default_timeout
+        self.lock = threading.Lock()
+        self.requests_sent = 0
+        self.errors = 0
+        self._new_session()
+
+    def _new_session(self):
+        self.adapter = HTTPAdapter(pool_connections=8, pool_maxsize=self.pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    def reset(self):
+        """Drop pooled connections (used after fork)"""
+        self.lock = threading.Lock()
+        self._new_session()
+
+    def timeout_for(self, url):
+        return self.host_timeouts.get(urlsplit(url).hostname, self.default_timeout)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout_for(url))
+        with self.lock:
+            self.requests_sent += 1
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            with self.lock:
+                self.errors += 1
+            raise
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def get_stats(self):
+        """Connection reuse per host: requests served vs. connections opened by each pool"""
+        hosts = {}
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats = hosts.setdefault(pool.host, {"connections_opened": 0, "requests": 0})
+            stats["connections_opened"] += pool.num_connections
+            stats["requests"] += pool.num_requests
+        for stats in hosts.values():
+            stats["reuse_rate"] = f"{(1 - stats['connections_opened'] / max(stats['requests'], 1)) * 100:.2f}%"
+        with self.lock:
+            return {
+                "requests_sent": self.requests_sent,
+                "errors": self.errors,
+                "pool_maxsize": self.pool_maxsize,
+                "hosts": hosts
+            }
+
+def gevent_patched():
+    """True when gevent has monkey-patched threading (gunicorn_config.py does this for gevent workers)"""
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+# Requests one worker serves at once: OS threads for gthread (sync workers are
+# single-threaded, as gunicorn_config.py configures them), greenlets for gevent
+GUNICORN_WORKER_CLASS = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+GUNICORN_THREADS = 1 if GUNICORN_WORKER_CLASS == 'sync' else int(os.environ.get('GUNICORN_THREADS', 4))
+GUNICORN_WORKER_CONNECTIONS = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+GEVENT_ACTIVE = gevent_patched()
+WORKER_CONCURRENCY = GUNICORN_WORKER_CONNECTIONS if GEVENT_ACTIVE else GUNICORN_THREADS
+
+# Match the pool to the worker's concurrency (plus headroom for background tasks).
+# Under gevent, requests beyond the cap still run; their extra connections just aren't kept
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', min(WORKER_CONCURRENCY, 64) + 2))
+HTTP_DEFAULT_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+HTTP_HOST_TIMEOUTS = {
+    'docs.google.com': (3.05, 10),
+    # Apps Script runs the sheet write before answering (and redirects to googleusercontent)
+    'script.google.com': (3.05, 20),
+    'script.googleusercontent.com': (3.05, 20),
+}
+
+http_client = PooledHTTPClient(HTTP_POOL_MAXSIZE, HTTP_HOST_TIMEOUTS, HTTP_DEFAULT_TIMEOUT)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=http_client.reset)
+
+class DiskSpaceAdmission:
+    """
+    Admission control for writes into VIDEO_STORAGE_DIR.
+    In-flight uploads/downloads reserve their expected size up front; a new job is
+    admitted only if free space minus outstanding reservations stays above min_free_bytes.
+    """
+    def __init__(self, path, min_free_bytes):
+        self.path = path
+        self.min_free_bytes = min_free_bytes
+        self.reservations = {}
+        self.rejected = 0
+        self._next_id = 0
+        self.lock = threading.Lock()
+        self.released = threading.Condition(self.lock)
+
+    def _free_bytes(self):
+        return shutil.disk_usage(self.path).free
+
+    def _headroom(self):
+        return self._free_bytes() - sum(self.reservations.values()) - self.min_free_bytes
+
+    def has_room(self, nbytes):
+        """Check (without reserving) whether nbytes would currently be admitted"""
+        with self.lock:
+            return self._headroom() >= nbytes
+
+    def reserve(self, nbytes, timeout=0):
+        """
+        Reserve nbytes, waiting up to timeout seconds for in-flight jobs to release space.
+        Returns a reservation id, or None if the space is not available.
+        """
+        deadline = time.time() + timeout
+        with self.released:
+            while self._headroom() < nbytes:
+                remaining = deadline - time.time()
+                # Waiting only helps if some other job still holds a reservation
+                if remaining <= 0 or not self.reservations:
+                    self.rejected += 1
+                    return None
+                self.released.wait(remaining)
+
+            self._next_id += 1
+            self.reservations[self._next_id] = nbytes
+            return self._next_id
+
+    def release(self, reservation_id):
+        with self.released:
+            self.reservations.pop(reservation_id, None)
+            self.released.notify_all()
+
+    def stats(self):
+        with self.lock:
+            free_bytes = self._free_bytes()
+            reserved_bytes = sum(self.reservations.values())
+            return {
+                "free_bytes": free_bytes,
+                "reserved_bytes": reserved_bytes,
+                "in_flight": len(self.reservations),
+                "min_free_bytes": self.min_free_bytes,
+                "headroom_bytes": max(free_bytes - reserved_bytes - self.min_free_bytes, 0),
+                "rejected": self.rejected
+            }
+
+# Disk space admission for local video writes
+MIN_FREE_DISK_BYTES = int(os.environ.get('MIN_FREE_DISK_BYTES', 1024 * 1024 * 1024))  # Keep 1 GB free
+DEFAULT_DOWNLOAD_RESERVATION_BYTES = 512 * 1024 * 1024  # Used when yt-dlp cannot estimate the size
+DOWNLOAD_SPACE_WAIT_SECONDS = 300  # Queued (async) downloads wait this long for space to free up
+INSUFFICIENT_DISK_SPACE_ERROR = "Insufficient disk space for video storage"
+disk_admission = DiskSpaceAdmission(VIDEO_STORAGE_DIR, MIN_FREE_DISK_BYTES)
+
 # Connection pooling for Google API clients
 _gspread_client_instance = None
+_gspread_client_checked_at = 0.0
 _client_lock = threading.Lock()
+_client_create_lock = threading.Lock()
+# The cached client is re-checked against the sheet at most this often (outside Vercel)
+GSPREAD_CLIENT_CHECK_SECONDS = int(os.environ.get('GSPREAD_CLIENT_CHECK_SECONDS', 300))
 
 # Thread pool for async operations (disabled on Vercel serverless)
+EXECUTOR_WORKERS = 10
 if IS_VERCEL or not THREADPOOL_AVAILABLE:
     executor = None  # ThreadPoolExecutor doesn't work well in serverless
 else:
-    executor = ThreadPoolExecutor(max_workers=10)
+    executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS)
+
+def _reset_executor_after_fork():
+    """A forked worker gets a fresh pool: the parent's threads, queue and locks don't survive fork"""
+    global executor
+    if executor is not None:
+        executor = ThreadPoolExecutor(max_workers=EXECUTOR_WORKERS)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_executor_after_fork)
 
 # Video download queue to prevent overload
-video_download_queue = Queue(maxsize=50)
+MAX_ACTIVE_DOWNLOADS = 50
+video_download_queue = Queue(maxsize=MAX_ACTIVE_DOWNLOADS)
 video_downloads_in_progress = {}
 downloads_lock = threading.Lock()
+ACTIVE_DOWNLOAD_STATUSES = ('queued', 'downloading')
+FINISHED_DOWNLOAD_STATUSES = ('completed', 'failed')
+
+# Finished download records are kept this long so clients can still poll their status
+DOWNLOAD_RECORD_RETENTION_SECONDS = int(os.environ.get('DOWNLOAD_RECORD_RETENTION_SECONDS', 3600))
+DOWNLOAD_SWEEP_INTERVAL_SECONDS = 60
 
 # Request tracking for monitoring
 request_counter = {'total': 0, 'successful': 0, 'failed': 0}
 request_counter_lock = threading.Lock()
 
+# Background maintenance tasks
+# Threads started at import time do not survive gunicorn's fork (preload_app = True),
+# so tasks are registered at import and started lazily once per worker process.
+_background_tasks = []
+_background_tasks_pid = None
+_background_tasks_lock = threading.Lock()
+
+def register_background_task(name, func, interval_seconds):
+    """Register a function to be run periodically in a daemon thread (once, right away, if interval_seconds is None)"""
+    _background_tasks.append((name, func, interval_seconds))
+
+def _run_background_task(name, func, interval_seconds):
+    """Run a background task forever, logging (not propagating) its errors"""
+    while True:
+        if interval_seconds is not None:
+            time.sleep(interval_seconds)
+        try:
+            func()
+        except Exception as e:
+            logger.error(f"Background task {name} failed: {e}")
+        if interval_seconds is None:
+            return
+
+def start_background_tasks():
+    """Start registered background tasks once per process (disabled on Vercel serverless)"""
+    global _background_tasks_pid
+
+    if IS_VERCEL:
+        return
+
+    pid = os.getpid()
+    if _background_tasks_pid == pid:
+        return
+
+    with _background_tasks_lock:
+        if _background_tasks_pid == pid:
+            return
+        _background_tasks_pid = pid
+
+        for name, func, interval_seconds in _background_tasks:
+            thread = threading.Thread(
+                target=_run_background_task,
+                args=(name, func, interval_seconds),
+                name=name,
+                daemon=True
+            )
+            thread.start()
+
+    logger.info(f"Started {len(_background_tasks)} background task(s) in process {pid}")
+
 # ==================== END SCALABILITY ENHANCEMENTS ====================
 
 # Allowed email domains for authentication
@@ -303,88 +610,108 @@ AUTHORIZED_REDIRECTS = [
     'https://shortssprits-backend.vercel.app'
 ]
 
+def build_sheet_records(headers, value_rows):
+    """Turn sheet rows (lists of cell values) into record dicts, skipping rows without essential data"""
+    records = []
+    for values in value_rows:
+        # Pad with empty strings if needed
+        values = list(values) + [''] * (len(headers) - len(values))
+
+        record = dict(zip(headers, values))
+
+        # Skip completely empty rows or rows without essential data
+        # Check if row has at least one non-empty value in key columns
+        has_data = any([
+            record.get('Vertical Name', '').strip(),
+            record.get('Email', '').strip(),
+            record.get('Exam Name', '').strip(),
+            record.get('Subject', '').strip(),
+            record.get('Type of Content', '').strip()
+        ])
+
+        if not has_data:
+            continue
+
+        # Clean up Sr no. field - remove leading single quote
+        if 'Sr no.' in record and isinstance(record['Sr no.'], str):
+            record['Sr no.'] = record['Sr no.'].lstrip("'")
+
+        records.append(record)
+    return records
+
+def gviz_url(gid):
+    """Google Visualization API JSON export of one tab (works for public sheets without API key)"""
+    return f'https://docs.google.com/spreadsheets/d/{SHEET_ID}/gviz/tq?tqx=out:json&gid={gid}'
+
+def parse_gviz_records(text, label):
+    """Records from a gviz JSON export, or None (logged) if it can't be parsed or isn't ok"""
+    # Remove the JavaScript wrapper
+    json_str = re.search(r'google\.visualization\.Query\.setResponse\((.*)\);', text)
+    if not json_str:
+        print(f"Could not parse {label} JSON response")
+        return None
+
+    data = json.loads(json_str.group(1))
+    if data.get('status') != 'ok':
+        print(f"Error from {label} API: {data.get('status')}")
+        return None
+
+    table = data.get('table', {})
+    cols = table.get('cols', [])
+    rows = table.get('rows', [])
+
+    # Extract headers
+    headers = [col.get('label', col.get('id', '')) for col in cols]
+
+    # Skip first row if it contains headers
+    if rows and len(rows) > 0:
+        first_row_values = [(cell.get('v') if cell and cell.get('v') is not None else '') for cell in rows[0].get('c', [])]
+
+        # Check if first row is actually headers
+        if first_row_values == headers or 'Sr no.' in first_row_values:
+            headers = first_row_values
+            rows = rows[1:]
+
+    # Convert to list of dictionaries
+    return build_sheet_records(headers, [
+        [(cell.get('v') if cell and cell.get('v') is not None else '') for cell in row.get('c', [])]
+        for row in rows
+    ])
+
+SHEET_DATA_CACHE_KEY = f'sheet_data_{SHEET_ID}'
+REEDIT_DATA_CACHE_KEY = f'reedit_data_{SHEET_ID}_{REEDIT_GID}'
+
 def get_sheet_data():
     """Fetch data from Google Sheet using Google Visualization API (no auth required) with caching - reads only from main sheet (gid=0)"""
     try:
         # Check cache first
-        cache_key = f'sheet_data_{SHEET_ID}'
+        cache_key = SHEET_DATA_CACHE_KEY
         cached_data = sheets_cache.get(cache_key)
         if cached_data is not None:
             logger.debug(f"Returning cached sheet data ({len(cached_data)} records)")
             return cached_data
 
+        # One batchGet refreshes every tab; gviz below is the fallback without a service account
+        if sheet_snapshot_loader.load():
+            cached_data = sheets_cache.get(cache_key)
+            if cached_data is not None:
+                return cached_data
+
         # Use Google Visualization API (works for public sheets without API key)
         # gid=0 ensures we read only from the main sheet (Final entries)
-        url = f'https://docs.google.com/spreadsheets/d/{SHEET_ID}/gviz/tq?tqx=out:json&gid=0'
-
-        response = requests.get(url, timeout=10)
+        response = http_client.get(gviz_url(0))
 
         if response.status_code == 200:
-            # Remove the JavaScript wrapper
-            json_str = response.text
-            json_str = re.search(r'google\.visualization\.Query\.setResponse\((.*)\);', json_str)
-
-            if json_str:
-                data = json.loads(json_str.group(1))
-
-                if data.get('status') == 'ok':
-                    table = data.get('table', {})
-                    cols = table.get('cols', [])
-                    rows = table.get('rows', [])
-
-                    # Extract headers
-                    headers = [col.get('label', col.get('id', '')) for col in cols]
-
-                    # Skip first row if it contains headers
-                    if rows and len(rows) > 0:
-                        first_row_values = [(cell.get('v') if cell and cell.get('v') is not None else '') for cell in rows[0].get('c', [])]
-
-                        # Check if first row is actually headers
-                        if first_row_values == headers or 'Sr no.' in first_row_values:
-                            headers = first_row_values
-                            rows = rows[1:]
-
-                    # Convert to list of dictionaries
-                    records = []
-                    for row in rows:
-                        cells = row.get('c', [])
-                        values = [(cell.get('v') if cell and cell.get('v') is not None else '') for cell in cells]
-
-                        # Pad with empty strings if needed
-                        values = values + [''] * (len(headers) - len(values))
-
-                        record = dict(zip(headers, values))
-
-                        # Skip completely empty rows or rows without essential data
-                        # Check if row has at least one non-empty value in key columns
-                        has_data = any([
-                            record.get('Vertical Name', '').strip(),
-                            record.get('Email', '').strip(),
-                            record.get('Exam Name', '').strip(),
-                            record.get('Subject', '').strip(),
-                            record.get('Type of Content', '').strip()
-                        ])
-
-                        if not has_data:
-                            continue
-
-                        # Clean up Sr no. field - remove leading single quote
-                        if 'Sr no.' in record and isinstance(record['Sr no.'], str):
-                            record['Sr no.'] = record['Sr no.'].lstrip("'")
+            records = parse_gviz_records(response.text, 'sheet')
+            if records is None:
+                return None
 
-                        records.append(record)
+            # Cache the results
+            sheets_cache.set(cache_key, records)
+            dataset_events.observe('main', records)
+            logger.debug(f"Cached sheet data ({len(records)} records)")
 
-                    # Cache the results
-                    sheets_cache.set(cache_key, records)
-                    logger.debug(f"Cached sheet data ({len(records)} records)")
-                    
-                    return records
-                else:
-                    print(f"Error from API: {data.get('status')}")
-                    return None
-            else:
-                print("Could not parse JSON response")
-                return None
+            return records
         else:
             print(f"Error: {response.status_code} - {response.text}")
             return None
@@ -403,83 +730,31 @@ def get_reedit_data():
     """Fetch data from the Re-edit (Drive Links) sheet using Google Visualization API with caching"""
     try:
         # Check cache first
-        cache_key = f'reedit_data_{SHEET_ID}_{REEDIT_GID}'
+        cache_key = REEDIT_DATA_CACHE_KEY
         cached_data = sheets_cache.get(cache_key)
         if cached_data is not None:
             logger.debug(f"Returning cached re-edit data ({len(cached_data)} records)")
             return cached_data
 
-        # Use Google Visualization API with REEDIT_GID
-        url = f'https://docs.google.com/spreadsheets/d/{SHEET_ID}/gviz/tq?tqx=out:json&gid={REEDIT_GID}'
+        if sheet_snapshot_loader.load():
+            cached_data = sheets_cache.get(cache_key)
+            if cached_data is not None:
+                return cached_data
 
-        response = requests.get(url, timeout=10)
+        # Use Google Visualization API with REEDIT_GID
+        response = http_client.get(gviz_url(REEDIT_GID))
 
         if response.status_code == 200:
-            # Remove the JavaScript wrapper
-            json_str = response.text
-            json_str = re.search(r'google\.visualization\.Query\.setResponse\((.*)\);', json_str)
-
-            if json_str:
-                data = json.loads(json_str.group(1))
-
-                if data.get('status') == 'ok':
-                    table = data.get('table', {})
-                    cols = table.get('cols', [])
-                    rows = table.get('rows', [])
-
-                    # Extract headers
-                    headers = [col.get('label', col.get('id', '')) for col in cols]
-
-                    # Skip first row if it contains headers
-                    if rows and len(rows) > 0:
-                        first_row_values = [(cell.get('v') if cell and cell.get('v') is not None else '') for cell in rows[0].get('c', [])]
-
-                        # Check if first row is actually headers
-                        if first_row_values == headers or 'Sr no.' in first_row_values:
-                            headers = first_row_values
-                            rows = rows[1:]
-
-                    # Convert to list of dictionaries
-                    records = []
-                    for row in rows:
-                        cells = row.get('c', [])
-                        values = [(cell.get('v') if cell and cell.get('v') is not None else '') for cell in cells]
-
-                        # Pad with empty strings if needed
-                        values = values + [''] * (len(headers) - len(values))
-
-                        record = dict(zip(headers, values))
-
-                        # Skip completely empty rows or rows without essential data
-                        # Check if row has at least one non-empty value in key columns
-                        has_data = any([
-                            record.get('Vertical Name', '').strip(),
-                            record.get('Email', '').strip(),
-                            record.get('Exam Name', '').strip(),
-                            record.get('Subject', '').strip(),
-                            record.get('Type of Content', '').strip()
-                        ])
-
-                        if not has_data:
-                            continue
-
-                        # Clean up Sr no. field - remove leading single quote
-                        if 'Sr no.' in record and isinstance(record['Sr no.'], str):
-                            record['Sr no.'] = record['Sr no.'].lstrip("'")
-
-                        records.append(record)
+            records = parse_gviz_records(response.text, 'Re-edit')
+            if records is None:
+                return []
 
-                    # Cache the results
-                    sheets_cache.set(cache_key, records)
-                    logger.debug(f"Cached re-edit data ({len(records)} records)")
+            # Cache the results
+            sheets_cache.set(cache_key, records)
+            dataset_events.observe('reedit', records)
+            logger.debug(f"Cached re-edit data ({len(records)} records)")
 
-                    return records
-                else:
-                    print(f"Error from Re-edit API: {data.get('status')}")
-                    return []
-            else:
-                print("Could not parse Re-edit JSON response")
-                return []
+            return records
         else:
             print(f"Error fetching re-edit data: {response.status_code} - {response.text}")
             return []
@@ -494,18 +769,77 @@ def get_reedit_data():
         traceback.print_exc()
         return []
 
+class CredentialsIndex:
+    """
+    Users from the credentials sheet plus case-folded username -> user and
+    email -> user maps, so duplicate checks and lookups are O(1).
+    Built once per cache refresh and extended in place after a signup.
+    """
+    def __init__(self, users):
+        self.lock = threading.Lock()
+        self.users = list(users)
+        self.by_username = {}
+        self.by_email = {}
+        for user in self.users:
+            self._map(user)
+
+    def _map(self, user):
+        # First occurrence wins, like the linear scans this replaces
+        if user['username']:
+            self.by_username.setdefault(user['username'].casefold(), user)
+        if user['email']:
+            self.by_email.setdefault(user['email'].casefold(), user)
+
+    def find_by_username(self, username):
+        return self.by_username.get(username.casefold())
+
+    def find_by_email(self, email):
+        return self.by_email.get(email.casefold())
+
+    def add(self, user):
+        with self.lock:
+            # Copy-on-write so callers iterating the old list are unaffected
+            self.users = self.users + [user]
+            self._map(user)
+
+    def __len__(self):
+        return len(self.users)
+
+CREDENTIALS_CACHE_KEY = f'credentials_data_{SHEET_ID}_{CREDENTIALS_GID}'
+
+def build_credential_users(value_rows):
+    """Turn credentials rows (username, email, hashed password, ...) into user dicts"""
+    users = []
+    for values in value_rows:
+        if len(values) >= 4 and values[0]:  # Must have username
+            user = {
+                'username': str(values[0]) if values[0] else '',
+                'email': str(values[1]) if values[1] else '',
+                'password': str(values[2]) if values[2] else '',  # This will be the hashed password
+            }
+            users.append(user)
+    return users
+
 def get_credentials_data():
     """Fetch credentials from the specific credentials sheet tab with caching"""
+    return get_credentials_index().users
+
+def get_credentials_index():
+    """Fetch credentials (as a CredentialsIndex) from the credentials sheet tab with caching"""
     try:
         # Check cache first
-        cache_key = f'credentials_data_{SHEET_ID}_{CREDENTIALS_GID}'
-        cached_data = credentials_cache.get(cache_key)
-        if cached_data is not None:
-            logger.debug(f"Returning cached credentials data ({len(cached_data)} users)")
-            return cached_data
-        
+        cached_index = credentials_cache.get(CREDENTIALS_CACHE_KEY)
+        if cached_index is not None:
+            logger.debug(f"Returning cached credentials data ({len(cached_index)} users)")
+            return cached_index
+
+        if sheet_snapshot_loader.load():
+            cached_index = credentials_cache.get(CREDENTIALS_CACHE_KEY)
+            if cached_index is not None:
+                return cached_index
+
         url = f'https://docs.google.com/spreadsheets/d/{SHEET_ID}/gviz/tq?gid={CREDENTIALS_GID}&tqx=out:json'
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url)
 
         if response.status_code == 200:
             json_str = response.text
@@ -523,185 +857,1097 @@ def get_credentials_data():
                         rows = rows[1:]
 
                     # Convert to list of user dictionaries
-                    users = []
-                    for row in rows:
-                        cells = row.get('c', [])
-                        values = [cell.get('v', '') if cell else '' for cell in cells]
-
-                        if len(values) >= 4 and values[0]:  # Must have username
-                            user = {
-                                'username': str(values[0]) if values[0] else '',
-                                'email': str(values[1]) if values[1] else '',
-                                'password': str(values[2]) if values[2] else '',  # This will be the hashed password
-                            }
-                            users.append(user)
-
-                    # Cache the results
-                    credentials_cache.set(cache_key, users)
+                    users = build_credential_users([
+                        [cell.get('v', '') if cell else '' for cell in row.get('c', [])]
+                        for row in rows
+                    ])
+
+                    # Cache the results with their lookup maps
+                    index = CredentialsIndex(users)
+                    credentials_cache.set(CREDENTIALS_CACHE_KEY, index)
                     logger.debug(f"Cached credentials data ({len(users)} users)")
                     
-                    return users
-        return []
+                    return index
+        return CredentialsIndex([])
     except Exception as e:
         print(f"Error fetching credentials: {e}")
         import traceback
         traceback.print_exc()
-        return []
+        return CredentialsIndex([])
 
 def get_gspread_client():
     """Initialize gspread client with service account credentials using connection pooling"""
-    global _gspread_client_instance
+    global _gspread_client_instance, _gspread_client_checked_at
 
     try:
         # Use existing client if available (connection pooling)
+        # The validity check is a round trip to Google, so it runs outside the lock and at
+        # most every GSPREAD_CLIENT_CHECK_SECONDS; other threads keep using the client meanwhile.
         # SKIP validation on Vercel to prevent cold start timeout
         with _client_lock:
-            if _gspread_client_instance is not None:
-                if IS_VERCEL:
-                    # On serverless, trust the cached client without validation
-                    return _gspread_client_instance
-                else:
-                    # Only validate in local development
-                    try:
-                        # Test if client is still valid
-                        _gspread_client_instance.open_by_key(SHEET_ID)
-                        return _gspread_client_instance
-                    except Exception as e:
-                        logger.warning(f"Cached gspread client invalid, recreating: {e}")
+            client = _gspread_client_instance
+            check = (
+                client is not None and not IS_VERCEL
+                and time.time() - _gspread_client_checked_at >= GSPREAD_CLIENT_CHECK_SECONDS
+            )
+            if check:
+                _gspread_client_checked_at = time.time()
+        if client is not None:
+            if not check:
+                return client
+            try:
+                # Test if client is still valid
+                client.open_by_key(SHEET_ID)
+                return client
+            except Exception as e:
+                logger.warning(f"Cached gspread client invalid, recreating: {e}")
+                with _client_lock:
+                    if _gspread_client_instance is client:
                         _gspread_client_instance = None
-        
-        # Use hardcoded base64 encoded credentials
-        creds_base64 = GOOGLE_CREDENTIALS_BASE64
-
-        # Define the scope
-        scopes = [
-            'https://www.googleapis.com/auth/spreadsheets'
-        ]
-
-        if creds_base64:
-            # Decode base64 credentials
-            import base64
-            creds_json = base64.b64decode(creds_base64).decode('utf-8')
-            creds_dict = json.loads(creds_json)
-
-            # Authenticate using credentials dictionary
-            creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
-            client = gspread.authorize(creds)
-            
-            with _client_lock:
-                _gspread_client_instance = client
-            
-            logger.info("Created new gspread client (pooled)")
-            return client
 
-        # Fallback to local credentials.json file (for local development)
-        creds_file = os.path.join(os.path.dirname(__file__), 'credentials.json')
-        if os.path.exists(creds_file):
-            # Authenticate using service account file
-            creds = Credentials.from_service_account_file(creds_file, scopes=scopes)
-            client = gspread.authorize(creds)
-            
+        # One thread builds the client; the others wait for it instead of each authorizing
+        with _client_create_lock:
             with _client_lock:
-                _gspread_client_instance = client
-            
-            logger.info("Created new gspread client (pooled)")
+                if _gspread_client_instance is not None:
+                    return _gspread_client_instance
+            client = _create_gspread_client()
+            if client is not None:
+                with _client_lock:
+                    _gspread_client_instance = client
+                    _gspread_client_checked_at = time.time()
+                logger.info("Created new gspread client (pooled)")
             return client
-
-        return None
     except Exception as e:
         logger.error(f"Error initializing gspread client: {e}")
         import traceback
         traceback.print_exc()
         return None
 
-# Google Drive service instance (connection pooling)
-_drive_service_instance = None
-_drive_service_lock = threading.Lock()
+def _create_gspread_client():
+    # Use hardcoded base64 encoded credentials
+    creds_base64 = GOOGLE_CREDENTIALS_BASE64
 
-def get_drive_service():
-    """Initialize Google Drive service with connection pooling"""
-    global _drive_service_instance
-    
-    try:
-        # Use existing service if available
-        with _drive_service_lock:
-            if _drive_service_instance is not None:
-                return _drive_service_instance
-        
-        # Define the scope for Drive API
-        scopes = [
-            'https://www.googleapis.com/auth/drive.file',
-            'https://www.googleapis.com/auth/drive'
-        ]
-        
-        # Use hardcoded base64 encoded credentials
-        creds_base64 = GOOGLE_CREDENTIALS_BASE64
-        
-        if creds_base64:
-            # Decode base64 credentials
-            import base64
-            creds_json = base64.b64decode(creds_base64).decode('utf-8')
-            creds_dict = json.loads(creds_json)
-            
-            # Authenticate using credentials dictionary
-            creds = Credentials.from_service_account_info(creds_dict, scopes=scopes)
-            service = build('drive', 'v3', credentials=creds)
-            
-            with _drive_service_lock:
-                _drive_service_instance = service
-            
-            logger.info("Created new Drive service (pooled)")
-            return service
-        
-        # Fallback to local credentials.json file (for local development)
-        creds_file = os.path.join(os.path.dirname(__file__), 'credentials.json')
-        if os.path.exists(creds_file):
-            creds = Credentials.from_service_account_file(creds_file, scopes=scopes)
-            service = build('drive', 'v3', credentials=creds)
-            
-            with _drive_service_lock:
-                _drive_service_instance = service
-            
-            logger.info("Created new Drive service from file (pooled)")
-            return service
-        
-        return None
-    except Exception as e:
-        logger.error(f"Error initializing Drive service: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
+    # Define the scope
+    scopes = [
+        'https://www.googleapis.com/auth/spreadsheets'
+    ]
 
-def upload_video_to_drive(file_content, filename, mimetype='video/mp4'):
+    if creds_base64:
+        # Decode base64 credentials
+        creds_json = base64.b64decode(creds_base64).decode('utf-8')
+        creds_dict = json.loads(creds_json)
+
+        # Authenticate using credentials dictionary
+        creds = service_account.Credentials.from_service_account_info(creds_dict, scopes=scopes)
+        return gspread.authorize(creds)
+
+    # Fallback to local credentials.json file (for local development)
+    creds_file = os.path.join(os.path.dirname(__file__), 'credentials.json')
+    if os.path.exists(creds_file):
+        # Authenticate using service account file
+        creds = service_account.Credentials.from_service_account_file(creds_file, scopes=scopes)
+        return gspread.authorize(creds)
+
+    return None
+
+# ==================== SHEET SNAPSHOT (values:batchGet) ====================
+
+def sheet_column_letter(index):
+    """1-based column index -> A1 column letters (1 -> A, 27 -> AA)"""
+    letters = ''
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord('A') + remainder) + letters
+    return letters
+
+class MainSheetSync:
     """
-    Upload video to Google Drive and return file ID and link.
-    Returns (file_id, drive_link, error_message)
+    Incremental sync state for the main sheet, which is the only tab that grows large.
+    Remembers the synced row count, the header row and a CRC32 fingerprint per row, so
+    a refresh only has to read the appended tail:
+    - tail_range() covers the last synced row (the anchor) through the end of the sheet.
+      If the anchor no longer matches its fingerprint, rows were deleted or moved and
+      apply_tail() returns None so the caller does a full read instead
+    - reconcile() takes a full read and re-parses only rows whose fingerprint changed;
+      it runs every reconcile_seconds, and right after edits made through this API
+    Published record lists are rebuilt on each sync, so readers holding the previous
+    list never see it change underneath them.
     """
-    try:
-        service = get_drive_service()
-        
-        if not service:
-            return None, None, "Could not initialize Drive service"
-        
-        # Create file metadata
-        file_metadata = {
-            'name': filename,
-            'parents': [DRIVE_FOLDER_ID]
-        }
-        
-        # Create media from file content
-        media = MediaIoBaseUpload(
-            io.BytesIO(file_content),
-            mimetype=mimetype,
-            resumable=True
-        )
-        
-        # Upload file
-        logger.info(f"Starting Drive upload for: {filename}")
-        file = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id, webViewLink, webContentLink',
+    def __init__(self, reconcile_seconds=900):
+        self.reconcile_seconds = reconcile_seconds
+        self.lock = threading.Lock()
+        self.headers = None
+        self.fingerprints = []
+        self.row_records = []
+        self.reconciled_at = 0.0
+        self.reconcile_requested = False
+        self.last_diff = None
+        self.tail_syncs = 0
+        self.full_syncs = 0
+        self.rows_appended = 0
+        self.rows_changed = 0
+        self.anchor_mismatches = 0
+
+    def fingerprint(self, row):
+        width = len(self.headers) if self.headers else len(row)
+        trimmed = list(row[:width])
+        while trimmed and trimmed[-1] == '':
+            trimmed.pop()
+        return zlib.crc32(json.dumps(trimmed, default=str).encode('utf-8'))
+
+    def _parse(self, row):
+        records = build_sheet_records(self.headers, [row])
+        return records[0] if records else None
+
+    def _records(self):
+        return [record for record in self.row_records if record is not None]
+
+    def request_reconcile(self):
+        """Force a full read on the next refresh (an existing row was edited or deleted)"""
+        with self.lock:
+            self.reconcile_requested = True
+
+    def mark_reconciled(self):
+        """Record that the synced rows are known to match the sheet, without reading it"""
+        with self.lock:
+            if not self.reconcile_requested:
+                self.reconciled_at = time.time()
+
+    def tail_range(self, title):
+        """A1 range for an incremental read, or None when a full read is due"""
+        with self.lock:
+            if self.headers is None or self.reconcile_requested:
+                return None
+            if time.time() - self.reconciled_at >= self.reconcile_seconds:
+                return None
+            anchor_row = len(self.row_records) + 1  # header is sheet row 1
+            end_column = sheet_column_letter(max(len(self.headers), 1))
+            return f"{SheetSnapshotLoader.a1_range(title)}!A{anchor_row}:{end_column}"
+
+    def apply_tail(self, rows):
+        """Append rows read from tail_range(); None if the anchor row moved"""
+        with self.lock:
+            anchor = rows[0] if rows else []
+            expected = self.fingerprints[-1] if self.fingerprints else self.fingerprint(self.headers)
+            if self.fingerprint(anchor) != expected:
+                self.anchor_mismatches += 1
+                return None
+            first_new_row = len(self.row_records) + 2
+            for row in rows[1:]:
+                self.fingerprints.append(self.fingerprint(row))
+                self.row_records.append(self._parse(row))
+            self.last_diff = {'appended_rows': list(range(first_new_row, first_new_row + len(rows) - 1))}
+            self.rows_appended += len(rows) - 1
+            self.tail_syncs += 1
+            return self._records()
+
+    def reconcile(self, rows):
+        """Apply a full read (header row included), re-parsing only changed rows"""
+        with self.lock:
+            headers = rows[0] if rows else []
+            data_rows = rows[1:]
+            headers_changed = headers != self.headers
+            if headers_changed:
+                # New or renamed columns: every record changes shape
+                self.headers = headers
+                self.fingerprints = []
+                self.row_records = []
+
+            changed_rows = []
+            fingerprints = []
+            row_records = []
+            for position, row in enumerate(data_rows):
+                fingerprint = self.fingerprint(row)
+                if position < len(self.fingerprints) and self.fingerprints[position] == fingerprint:
+                    row_records.append(self.row_records[position])
+                else:
+                    row_records.append(self._parse(row))
+                    changed_rows.append(position + 2)  # sheet row number
+                fingerprints.append(fingerprint)
+
+            removed = max(len(self.fingerprints) - len(data_rows), 0)
+            changed = len(changed_rows) + removed
+            self.last_diff = None if headers_changed else {'changed_rows': changed_rows, 'removed_rows': removed}
+            self.fingerprints = fingerprints
+            self.row_records = row_records
+            self.rows_changed += changed
+            self.full_syncs += 1
+            self.reconciled_at = time.time()
+            self.reconcile_requested = False
+            return self._records()
+
+    def export_state(self):
+        with self.lock:
+            return {
+                'headers': self.headers,
+                'fingerprints': list(self.fingerprints),
+                'row_records': list(self.row_records),
+                'reconciled_at': self.reconciled_at
+            }
+
+    def import_state(self, state):
+        with self.lock:
+            self.headers = state['headers']
+            self.fingerprints = state['fingerprints']
+            self.row_records = state['row_records']
+            self.reconciled_at = state['reconciled_at']
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "synced_rows": len(self.row_records),
+                "tail_syncs": self.tail_syncs,
+                "full_syncs": self.full_syncs,
+                "rows_appended": self.rows_appended,
+                "rows_changed": self.rows_changed,
+                "anchor_mismatches": self.anchor_mismatches,
+                "reconcile_seconds": self.reconcile_seconds
+            }
+
+class SheetSnapshotStore:
+    """
+    On-disk warm-start copy of the last sheet snapshot (parsed records, credentials,
+    main-sheet sync state and Drive version) as gzip'd JSON. Written atomically after
+    each real fetch and read at import, so a fresh worker or cold start can serve its
+    first request without waiting for Google.
+    The credentials part holds the sheet's password hashes, so the file is created
+    owner-only (0600) and cache/ is git-ignored; keep it out of backups and images.
+    """
+    FORMAT = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.saves = 0
+        self.failures = 0
+        self.last_save_ms = 0.0
+        self.last_size_bytes = 0
+        # mtime of this process's own last write, so it never adopts its own snapshot
+        self.written_at = None
+
+    def save(self, state):
+        started = time.perf_counter()
+        state = dict(state, format=self.FORMAT, saved_at=time.time())
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            payload = json.dumps(state, separators=(',', ':'), default=str).encode('utf-8')
+            # Credentials include password hashes: owner-only permissions
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=5, mtime=0) as f:
+                    f.write(payload)
+                size = raw.tell()
+            os.replace(tmp_path, self.path)
+            self.written_at = self.validated_at()
+        except Exception as e:
+            with self.lock:
+                self.failures += 1
+            logger.warning(f"Could not write sheet snapshot {self.path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+        with self.lock:
+            self.saves += 1
+            self.last_save_ms = (time.perf_counter() - started) * 1000
+            self.last_size_bytes = size
+        return True
+
+    def touch(self):
+        """Mark the stored snapshot as re-validated now; its mtime is the validation time"""
+        try:
+            os.utime(self.path, None)
+            self.written_at = self.validated_at()
+        except OSError:
+            pass
+
+    def validated_at(self):
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def load(self):
+        """Return the saved state, or None if there is no usable snapshot"""
+        try:
+            with gzip.open(self.path, 'rb') as f:
+                state = json.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sheet snapshot {self.path}: {e}")
+            return None
+        if not isinstance(state, dict) or state.get('format') != self.FORMAT:
+            return None
+        return state
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "path": self.path,
+                "saves": self.saves,
+                "failures": self.failures,
+                "last_save_ms": round(self.last_save_ms, 2),
+                "last_size_bytes": self.last_size_bytes
+            }
+
+class SheetSnapshotLoader:
+    """
+    Loads every tab the API reads (main, re-edit, credentials) with a single
+    Sheets API values:batchGet through the service-account client, then publishes all
+    of their cache entries together. A cold load costs one round trip, and the main
+    and re-edit records served side by side always come from the same fetch.
+    - gid -> tab title map is resolved once per spreadsheet handle (tabs are addressed
+      by title in A1 ranges) and re-resolved if a batchGet fails, e.g. after a rename
+    - Concurrent cold loads are single-flight: waiters reuse the result of the load
+      that was running when they arrived
+    - load() returns False when no service account is configured or the fetch fails,
+      so callers fall back to the per-tab gviz exports; after a failure, batchGet is
+      not retried for retry_seconds
+    - Once primed, the main tab is read incrementally (see MainSheetSync); the small
+      tabs are re-read whole in the same batchGet
+    - Before fetching, the spreadsheet's Drive version/modifiedTime is checked. If it
+      is unchanged since the last fetch, the last snapshot is re-published with a
+      fresh TTL instead. A real fetch still happens at least every max_skip_seconds,
+      and on the next load after request_refresh() (writes made through this API)
+    - With a store, each real fetch is persisted and restore() re-publishes it at
+      startup; validate() then checks the restored copy against the sheet
+    - A stored snapshot fetched or validated by another process (the gunicorn master's
+      refresh loop) within adopt_seconds is adopted instead of going upstream
+    """
+    def __init__(self, spreadsheet_id, main_gid, reedit_gid, credentials_gid,
+                 retry_seconds=30, reconcile_seconds=900, max_skip_seconds=3600, store=None,
+                 adopt_seconds=0, max_age_seconds=None):
+        self.spreadsheet_id = spreadsheet_id
+        self.gids = [str(main_gid), str(reedit_gid), str(credentials_gid)]
+        self.retry_seconds = retry_seconds
+        self.max_skip_seconds = max_skip_seconds
+        self.main_sync = MainSheetSync(reconcile_seconds)
+        self.published = None
+        self.version = None
+        self.reconciled_version = None
+        self.fetched_at = 0.0
+        self.refresh_requested = False
+        self.store = store
+        self.adopt_seconds = adopt_seconds
+        self.max_age_seconds = max_age_seconds
+        self.save_in_background = True
+        # Context manager held around every change to published state (never around a
+        # network call); the gunicorn master swaps in its fork guard
+        self.publish_guard = nullcontext
+        self.published_at = 0.0
+        self.restored_from = None
+        self.validation_pending = False
+        self.adopted = 0
+        self.skipped = 0
+        self.version_checks_failed = 0
+        self.load_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.spreadsheet = None
+        self.titles = {}
+        self.retry_at = 0.0
+        self.generation = 0
+        self.loads = 0
+        self.failures = 0
+        self.last_load_ms = 0.0
+        self.last_loaded_at = None
+
+    @staticmethod
+    def a1_range(title):
+        return "'" + title.replace("'", "''") + "'"
+
+    def _open(self):
+        """Return (spreadsheet, gid -> title), opening the spreadsheet on first use"""
+        if self.spreadsheet is None:
+            client = get_gspread_client()
+            if client is None:
+                return None, {}
+            spreadsheet = client.open_by_key(self.spreadsheet_id)
+            metadata = spreadsheet.fetch_sheet_metadata(params={'fields': 'sheets.properties(sheetId,title)'})
+            self.titles = {
+                str(sheet['properties']['sheetId']): sheet['properties']['title']
+                for sheet in metadata.get('sheets', [])
+            }
+            self.spreadsheet = spreadsheet
+        return self.spreadsheet, self.titles
+
+    # Numbers stay numbers like the gviz export. Date cells come back as their displayed
+    # text (e.g. "15/01/2024") where gviz gives Date(2024,0,15) literals: the values API
+    # has no column types to rebuild those from. Nothing server-side or in index.html
+    # parses date columns; API clients reading them should accept both forms
+    VALUE_PARAMS = {
+        'majorDimension': 'ROWS',
+        'valueRenderOption': 'UNFORMATTED_VALUE',
+        'dateTimeRenderOption': 'FORMATTED_STRING'
+    }
+
+    def fetch(self):
+        """
+        One batchGet for all tabs. Returns (gid -> list of rows, main_is_tail): rows
+        include the header row, except for an incremental main-tab read, which starts
+        at the anchor row.
+        """
+        spreadsheet, titles = self._open()
+        if spreadsheet is None:
+            return None, False
+        gids = [gid for gid in self.gids if gid in titles]
+        missing = [gid for gid in self.gids if gid not in titles]
+        if missing:
+            logger.warning(f"Sheet tabs not found for gid(s) {', '.join(missing)}")
+
+        main_gid = self.gids[0]
+        tail_range = self.main_sync.tail_range(titles[main_gid]) if main_gid in titles else None
+        ranges = [
+            tail_range if gid == main_gid and tail_range else self.a1_range(titles[gid])
+            for gid in gids
+        ]
+        response = spreadsheet.values_batch_get(ranges, params=self.VALUE_PARAMS)
+        value_ranges = response.get('valueRanges', [])
+        tabs = {gid: value_range.get('values', []) for gid, value_range in zip(gids, value_ranges)}
+        return tabs, tail_range is not None
+
+    def fetch_main(self):
+        """Full read of the main tab, for when an incremental read cannot be applied"""
+        spreadsheet, titles = self._open()
+        response = spreadsheet.values_get(self.a1_range(titles[self.gids[0]]), params=self.VALUE_PARAMS)
+        return response.get('values', [])
+
+    def publish(self, tabs, main_is_tail=False):
+        """
+        Parse fetched tabs into the record formats of the gviz readers and cache them
+        together. Returns whether the main tab was fully reconciled, or None if its tail
+        read could not be applied (fetch_main() the whole tab and publish again).
+        """
+        main_gid, reedit_gid, credentials_gid = self.gids
+        entries = {}
+        reconciled = False
+        if main_gid in tabs:
+            records = self.main_sync.apply_tail(tabs[main_gid]) if main_is_tail else None
+            if records is None:
+                if main_is_tail:
+                    # The anchor row moved: nothing is published, the caller re-reads the tab
+                    return None
+                records = self.main_sync.reconcile(tabs[main_gid])
+                reconciled = True
+            entries[SHEET_DATA_CACHE_KEY] = records
+            dataset_events.observe('main', records, self.main_sync.last_diff)
+        if reedit_gid in tabs:
+            rows = tabs[reedit_gid]
+            entries[REEDIT_DATA_CACHE_KEY] = build_sheet_records(rows[0], rows[1:]) if rows else []
+            dataset_events.observe('reedit', entries[REEDIT_DATA_CACHE_KEY])
+        sheets_cache.set_many(entries)
+
+        credentials_index = None
+        if credentials_gid in tabs:
+            rows = tabs[credentials_gid]
+            # The values API drops trailing empty cells; pad to the header width like gviz does
+            width = len(rows[0]) if rows else 0
+            users = build_credential_users([list(row) + [''] * (width - len(row)) for row in rows[1:]])
+            credentials_index = CredentialsIndex(users)
+            credentials_cache.set(CREDENTIALS_CACHE_KEY, credentials_index)
+
+        self.published = (entries, credentials_index)
+        self.published_at = time.time()
+        return reconciled
+
+    def request_refresh(self):
+        """Make the next load fetch even if Drive still reports the old version"""
+        self.refresh_requested = True
+
+    def remote_version(self):
+        """Drive (version, modifiedTime) of the spreadsheet, or None if it cannot be checked"""
+        service = get_drive_service()
+        if service is None:
+            return None
+        try:
+            metadata = service.files().get(
+                fileId=self.spreadsheet_id,
+                fields='version,modifiedTime',
+                supportsAllDrives=True
+            ).execute()
+        except Exception as e:
+            with self.stats_lock:
+                self.version_checks_failed += 1
+            logger.warning(f"Drive change check failed, fetching sheet: {e}")
+            return None
+        return (metadata.get('version'), metadata.get('modifiedTime'))
+
+    def republish_if_unchanged(self, version):
+        """Re-publish the last snapshot when Drive reports no change since it was fetched"""
+        if version is None or version != self.version or self.published is None:
+            return False
+        if self.refresh_requested or time.time() - self.fetched_at >= self.max_skip_seconds:
+            return False
+
+        entries, credentials_index = self.published
+        sheets_cache.set_many(entries)
+        if credentials_index is not None:
+            credentials_cache.set(CREDENTIALS_CACHE_KEY, credentials_index)
+        if version == self.reconciled_version:
+            # Nothing changed since the last full read either
+            self.main_sync.mark_reconciled()
+        self.published_at = time.time()
+        if self.store is not None:
+            self.store.touch()
+        with self.stats_lock:
+            self.skipped += 1
+        return True
+
+    def adopt_stored(self):
+        """Re-publish a stored snapshot another process fetched or validated recently"""
+        if self.store is None or not self.adopt_seconds or self.refresh_requested:
+            return False
+        validated_at = self.store.validated_at()
+        if validated_at is None or validated_at <= self.published_at or validated_at == self.store.written_at:
+            return False
+        if time.time() - validated_at > self.adopt_seconds:
+            return False
+        state = self.store.load()
+        if state is None or not self._apply_state(state, True, validated_at):
+            return False
+        with self.stats_lock:
+            self.adopted += 1
+        return True
+
+    def load(self):
+        """Fetch and publish a fresh snapshot; True once the caches hold one"""
+        generation = self.generation
+        with self.load_lock:
+            if self.generation != generation:
+                # Another thread finished a load while we waited for the lock
+                return True
+            if time.time() < self.retry_at:
+                return False
+
+            started = time.perf_counter()
+            try:
+                with self.publish_guard():
+                    adopted = self.adopt_stored()
+                    if adopted:
+                        self.generation += 1
+                        self.validation_pending = False
+                if adopted:
+                    return True
+
+                version = self.remote_version()
+                with self.publish_guard():
+                    unchanged = self.republish_if_unchanged(version)
+                    if unchanged:
+                        self.generation += 1
+                        self.validation_pending = False
+                if unchanged:
+                    logger.debug(f"Sheet unchanged (version {version[0]}), extended cached snapshot")
+                    return True
+
+                tabs, main_is_tail = self.fetch()
+                if tabs is None:
+                    return False
+                with self.publish_guard():
+                    reconciled = self.publish(tabs, main_is_tail)
+                    if reconciled is not None:
+                        self._record_fetch(version, reconciled)
+                if reconciled is None:
+                    tabs[self.gids[0]] = self.fetch_main()
+                    with self.publish_guard():
+                        self._record_fetch(version, self.publish(tabs))
+            except Exception as e:
+                # Drop the handle so the next load re-resolves tab titles
+                self.spreadsheet = None
+                self.retry_at = time.time() + self.retry_seconds
+                with self.stats_lock:
+                    self.failures += 1
+                logger.error(f"Sheet batchGet failed, falling back to gviz: {e}")
+                return False
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.generation += 1
+            with self.stats_lock:
+                self.loads += 1
+                self.last_load_ms = elapsed_ms
+                self.last_loaded_at = datetime.now().isoformat()
+            logger.info(f"Loaded {len(tabs)} sheet tabs in one batchGet ({elapsed_ms:.0f} ms)")
+            return True
+
+    def _record_fetch(self, version, reconciled):
+        """Note the version just published and save the snapshot (under publish_guard)"""
+        if reconciled:
+            self.reconciled_version = version
+        self.version = version
+        self.fetched_at = time.time()
+        self.refresh_requested = False
+        self.validation_pending = False
+        self.persist()
+
+    def persist(self):
+        """Write the current snapshot to the store, off the request thread when possible"""
+        if self.store is None or self.published is None:
+            return
+        entries, credentials_index = self.published
+        state = {
+            'spreadsheet_id': self.spreadsheet_id,
+            'version': self.version,
+            'reconciled_version': self.reconciled_version,
+            'fetched_at': self.fetched_at,
+            'entries': entries,
+            'credentials': credentials_index.users if credentials_index is not None else None,
+            'main_sync': self.main_sync.export_state()
+        }
+        if executor is not None and self.save_in_background:
+            executor.submit(self.store.save, state)
+        else:
+            self.store.save(state)
+
+    def restore(self):
+        """Publish the stored snapshot into the caches; True if one was restored"""
+        state = self.store.load() if self.store is not None else None
+        if state is None:
+            return False
+        with self.load_lock:
+            return self._apply_state(state, False, self.store.validated_at())
+
+    def _apply_state(self, state, validated, validated_at):
+        """
+        Publish a stored snapshot (caller holds load_lock). validated_at is when the file
+        was last written or confirmed current; it becomes published_at, so the snapshot
+        does not look newer than it is. Snapshots saved more than max_age_seconds ago
+        are rejected rather than served while validation is pending.
+        """
+        if state.get('spreadsheet_id') != self.spreadsheet_id:
+            return False
+        try:
+            age = time.time() - state['saved_at']
+            if self.max_age_seconds is not None and age > self.max_age_seconds:
+                logger.info(f"Ignoring sheet snapshot saved {age:.0f}s ago (max {self.max_age_seconds}s)")
+                return False
+            entries = state['entries']
+            credentials = state['credentials']
+            credentials_index = CredentialsIndex(credentials) if credentials is not None else None
+            self.main_sync.import_state(state['main_sync'])
+            self.version = tuple(state['version']) if state['version'] else None
+            self.reconciled_version = tuple(state['reconciled_version']) if state['reconciled_version'] else None
+            self.fetched_at = state['fetched_at']
+            self.published = (entries, credentials_index)
+            self.published_at = min(validated_at or state['saved_at'], time.time())
+            self.restored_from = datetime.fromtimestamp(state['saved_at']).isoformat()
+            self.validation_pending = not validated
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring malformed sheet snapshot: {e}")
+            return False
+
+        sheets_cache.set_many(entries)
+        if credentials_index is not None:
+            credentials_cache.set(CREDENTIALS_CACHE_KEY, credentials_index)
+        for dataset, key in (('main', SHEET_DATA_CACHE_KEY), ('reedit', REEDIT_DATA_CACHE_KEY)):
+            if key in entries:
+                dataset_events.observe(dataset, entries[key])
+        logger.info(f"{'Adopted' if validated else 'Restored'} sheet snapshot saved at {self.restored_from}")
+        return True
+
+    def validate(self):
+        """Check a restored snapshot against the sheet (one Drive call if it is current)"""
+        if self.validation_pending:
+            self.load()
+
+    def get_stats(self):
+        with self.stats_lock:
+            return {
+                "loads": self.loads,
+                "failures": self.failures,
+                "last_load_ms": round(self.last_load_ms, 2),
+                "last_loaded_at": self.last_loaded_at,
+                "unchanged_skips": self.skipped,
+                "adopted_snapshots": self.adopted,
+                "version_checks_failed": self.version_checks_failed,
+                "tabs": {gid: self.titles.get(gid) for gid in self.gids},
+                "main_sheet": self.main_sync.get_stats(),
+                "restored_from": self.restored_from,
+                "validation_pending": self.validation_pending,
+                "store": self.store.get_stats() if self.store is not None else None
+            }
+
+SHEET_BATCH_RETRY_SECONDS = int(os.environ.get('SHEET_BATCH_RETRY_SECONDS', 30))
+# Appended rows show up on every refresh; edits made directly in the sheet within this window
+SHEET_RECONCILE_SECONDS = int(os.environ.get('SHEET_RECONCILE_SECONDS', 900))
+
+# Longest time a Drive "unchanged" answer may keep serving the same snapshot
+SHEET_CHANGE_CHECK_MAX_SKIP_SECONDS = int(os.environ.get('SHEET_CHANGE_CHECK_MAX_SKIP_SECONDS', 3600))
+
+# Warm-start snapshot lives next to the logs directory (/tmp/cache on Vercel)
+SHEET_SNAPSHOT_FILE = os.environ.get(
+    'SHEET_SNAPSHOT_FILE', os.path.join(os.path.dirname(LOG_DIR), 'cache', 'sheet_snapshot.json.gz')
+)
+
+# Under gunicorn the master re-validates the snapshot this often (see start_master_sheet_refresh);
+# workers adopt a stored snapshot validated within twice that instead of going upstream
+SHEET_MASTER_REFRESH_SECONDS = int(os.environ.get('SHEET_MASTER_REFRESH_SECONDS', 60))
+SHEET_SNAPSHOT_ADOPT_SECONDS = int(os.environ.get('SHEET_SNAPSHOT_ADOPT_SECONDS', 2 * SHEET_MASTER_REFRESH_SECONDS))
+# Older snapshots are not served at startup (a running loader re-saves at least every
+# SHEET_CHANGE_CHECK_MAX_SKIP_SECONDS, so this only rejects files left by a long-idle deployment)
+SHEET_SNAPSHOT_MAX_AGE_SECONDS = int(os.environ.get('SHEET_SNAPSHOT_MAX_AGE_SECONDS', 6 * 3600))
+
+sheet_snapshot_loader = SheetSnapshotLoader(
+    SHEET_ID, '0', REEDIT_GID, CREDENTIALS_GID,
+    SHEET_BATCH_RETRY_SECONDS, SHEET_RECONCILE_SECONDS, SHEET_CHANGE_CHECK_MAX_SKIP_SECONDS,
+    store=SheetSnapshotStore(SHEET_SNAPSHOT_FILE), adopt_seconds=SHEET_SNAPSHOT_ADOPT_SECONDS,
+    max_age_seconds=SHEET_SNAPSHOT_MAX_AGE_SECONDS
+)
+
+def invalidate_sheet_cache(action, dataset='main', row=None, reconcile=False):
+    """
+    Drop cached main-sheet data after a write through this API so the next read refetches.
+    Event-stream subscribers get a 'write' event now and a 'dataset' event once the
+    refreshed data is cached.
+    """
+    if reconcile:
+        # Rows were edited or deleted in place, which a tail read cannot see
+        sheet_snapshot_loader.main_sync.request_reconcile()
+    sheet_snapshot_loader.request_refresh()
+    sheets_cache.delete(SHEET_DATA_CACHE_KEY)
+    filters_cache.clear()
+
+    dataset_events.publish('write', {'action': action, 'dataset': dataset, 'row': row})
+    if dataset_events.has_subscribers() and executor is not None:
+        # Refresh eagerly so subscribers are told about the new version and find it cached
+        executor.submit(get_sheet_and_reedit_data)
+
+def get_sheet_and_reedit_data():
+    """Return (main records, re-edit records) taken from the same sheet snapshot when possible"""
+    keys = [SHEET_DATA_CACHE_KEY, REEDIT_DATA_CACHE_KEY]
+    cached = sheets_cache.get_many(keys)
+    if cached is None and sheet_snapshot_loader.load():
+        cached = sheets_cache.get_many(keys)
+    if cached is not None:
+        return cached[SHEET_DATA_CACHE_KEY], cached[REEDIT_DATA_CACHE_KEY]
+    # No service account (or the batchGet failed): per-tab gviz exports
+    return get_sheet_data(), get_reedit_data()
+
+# ==================== DATASET CHANGE EVENTS (SSE) ====================
+
+class DatasetEventBroker:
+    """
+    Fans out "dataset changed" notifications to Server-Sent Events subscribers of this
+    worker, so dashboards can stop polling /api/data and /api/leaderboard.
+    - Each refresh calls observe() per dataset. The dataset version is derived from the
+      CRC32 of the records, so workers serving the same data report the same version
+      and a reconnecting client can tell whether it missed anything
+    - Subscribers wait on a Condition and get a comment heartbeat while idle
+    - Streams are bounded in length (clients reconnect per the retry hint) and in
+      number per worker, so long-lived connections cannot take every request thread
+    """
+    def __init__(self, max_connections, history=64, max_diff_rows=50):
+        self.max_connections = max_connections
+        self.max_diff_rows = max_diff_rows
+        self.condition = threading.Condition()
+        self.fingerprints = {}
+        self.version = None
+        self.sequence = 0
+        self.events = deque(maxlen=history)  # (sequence, event name, payload)
+        self.connections = 0
+        self.published = 0
+        self.rejected = 0
+
+    def _trim_diff(self, diff):
+        trimmed = {}
+        for key, value in diff.items():
+            if isinstance(value, list):
+                trimmed[key.replace('_rows', '_count')] = len(value)
+                if len(value) <= self.max_diff_rows:
+                    trimmed[key] = value
+            else:
+                trimmed[key] = value
+        return trimmed
+
+    def observe(self, dataset, records, diff=None):
+        """Record the records just cached for a dataset; publishes an event if they changed"""
+        fingerprint = zlib.crc32(json.dumps(records, sort_keys=True, default=str).encode('utf-8'))
+        with self.condition:
+            if self.fingerprints.get(dataset) == fingerprint:
+                return False
+            self.fingerprints[dataset] = fingerprint
+            self.version = '-'.join(f"{self.fingerprints[name]:08x}" for name in sorted(self.fingerprints))
+            payload = {'version': self.version, 'dataset': dataset, 'count': len(records)}
+            if diff is not None:
+                payload['diff'] = self._trim_diff(diff)
+            self._publish('dataset', payload)
+            return True
+
+    def publish(self, event, payload):
+        with self.condition:
+            self._publish(event, dict(payload, version=self.version))
+
+    def _publish(self, event, payload):
+        payload['timestamp'] = datetime.now().isoformat()
+        self.sequence += 1
+        self.published += 1
+        self.events.append((self.sequence, event, payload))
+        self.condition.notify_all()
+
+    def has_subscribers(self):
+        with self.condition:
+            return self.connections > 0
+
+    @staticmethod
+    def format(event, payload, event_id=None):
+        lines = [f"id: {event_id}"] if event_id else []
+        lines.append(f"event: {event}")
+        lines.append(f"data: {json.dumps(payload)}")
+        return '\n'.join(lines) + '\n\n'
+
+    def stream(self, last_version=None, max_seconds=300, heartbeat_seconds=15, retry_ms=5000):
+        """SSE generator for one subscriber; the connection slot is taken on first iteration"""
+        with self.condition:
+            if self.connections >= self.max_connections:
+                self.rejected += 1
+                busy = True
+            else:
+                self.connections += 1
+                busy = False
+        if busy:
+            # 200 + a long retry makes EventSource come back later instead of giving up
+            yield f"retry: {retry_ms * 6}\n\n"
+            yield self.format('busy', {'message': 'Too many event streams, poll instead for now'})
+            return
+
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            with self.condition:
+                sequence = self.sequence
+                version = self.version
+            if version is not None and version != last_version:
+                # Tell a (re)connecting client the current version so it can catch up
+                yield self.format('dataset', {'version': version}, version)
+
+            deadline = time.time() + max_seconds
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return
+                with self.condition:
+                    if self.sequence == sequence:
+                        self.condition.wait(min(heartbeat_seconds, remaining))
+                    pending = [item for item in self.events if item[0] > sequence]
+                    sequence = self.sequence
+                if not pending:
+                    yield ": keep-alive\n\n"
+                    continue
+                for _, event, payload in pending:
+                    yield self.format(event, payload, payload.get('version'))
+        finally:
+            with self.condition:
+                self.connections -= 1
+
+    def get_stats(self):
+        with self.condition:
+            return {
+                "version": self.version,
+                "connections": self.connections,
+                "max_connections": self.max_connections,
+                "events_published": self.published,
+                "streams_rejected": self.rejected
+            }
+
+# Every open stream holds a request thread (a greenlet under gevent), so by default at
+# most half of the worker's concurrency streams
+SSE_MAX_CONNECTIONS = int(os.environ.get('SSE_MAX_CONNECTIONS', max(1, WORKER_CONCURRENCY // 2)))
+SSE_MAX_STREAM_SECONDS = int(os.environ.get('SSE_MAX_STREAM_SECONDS', 30 if IS_VERCEL else 300))
+SSE_HEARTBEAT_SECONDS = 15
+# Streams are opened with a ticket from /api/events/ticket; it is only checked on (re)connect
+SSE_TICKET_SECONDS = int(os.environ.get('SSE_TICKET_SECONDS', 600))
+# While a worker has subscribers it re-checks the sheet this often, so changes made
+# directly in the sheet (or picked up by another worker) reach idle dashboards too
+SSE_WATCH_SECONDS = int(os.environ.get('SSE_WATCH_SECONDS', 30))
+
+dataset_events = DatasetEventBroker(SSE_MAX_CONNECTIONS)
+
+def watch_dataset_changes():
+    """Refresh this worker's sheet snapshot while it has event subscribers"""
+    if not dataset_events.has_subscribers():
+        return
+    # Adopts a snapshot the master validated, or checks the Drive version (one call if unchanged)
+    if not sheet_snapshot_loader.load():
+        # No service account: the gviz readers refetch once the cached copy expires
+        get_sheet_and_reedit_data()
+
+register_background_task('dataset-events-watch', watch_dataset_changes, SSE_WATCH_SECONDS)
+
+# Serve the first requests from the last saved snapshot; each worker then checks it
+# against the sheet once, in the background, right after it starts
+sheet_snapshot_loader.restore()
+register_background_task('sheet-snapshot-validate', sheet_snapshot_loader.validate, None)
+
+# ==================== MASTER-SIDE SHEET REFRESH (gunicorn preload_app) ====================
+
+# Held across every fork and, in the master, while a refresh publishes to the caches or
+# writes the snapshot, so a worker never inherits half-published state or a held cache
+# lock. Drive checks and batchGets run outside it, so a slow Google call cannot delay
+# a fork; locks they may hold are replaced in the child
+_sheet_fork_guard = threading.Lock()
+
+def refresh_sheet_snapshot():
+    """One master refresh: Drive check, fetch if changed, write the snapshot"""
+    sheet_snapshot_loader.load()
+
+@contextmanager
+def _hold_sheet_fork_guard():
+    with _sheet_fork_guard:
+        yield
+
+def _run_master_sheet_refresh():
+    while True:
+        time.sleep(SHEET_MASTER_REFRESH_SECONDS)
+        try:
+            refresh_sheet_snapshot()
+        except Exception as e:
+            logger.error(f"Master sheet refresh failed: {e}")
+
+def start_master_sheet_refresh():
+    """
+    Called from gunicorn's when_ready hook (preload_app = True), in the master before
+    any worker is forked. Loads the sheet, re-edit and credentials data once
+    so workers inherit the warm caches copy-on-write, then keeps the on-disk snapshot
+    validated every SHEET_MASTER_REFRESH_SECONDS so workers adopt it rather than each
+    going upstream when their caches expire.
+    """
+    # Write snapshots inline: the refresh holds the fork guard until the file is saved
+    sheet_snapshot_loader.save_in_background = False
+    sheet_snapshot_loader.publish_guard = _hold_sheet_fork_guard
+    started = time.perf_counter()
+    refresh_sheet_snapshot()
+    logger.info(f"Master warmed sheet caches in {(time.perf_counter() - started) * 1000:.0f} ms")
+    threading.Thread(target=_run_master_sheet_refresh, name='sheet-master-refresh', daemon=True).start()
+
+def _reset_sheet_clients_after_fork():
+    """
+    Workers must not reuse the master's Google client sessions or its fork guard. The
+    refresh thread may have been mid-request at the fork, holding locks no thread of
+    the child will release, so those are replaced too.
+    """
+    global _sheet_fork_guard, _gspread_client_instance, _drive_service_instance, _drive_http_local
+    global _client_lock, _drive_service_lock
+    _sheet_fork_guard = threading.Lock()
+    _client_lock = threading.Lock()
+    _drive_service_lock = threading.Lock()
+    _gspread_client_instance = None
+    _drive_service_instance = None
+    _drive_http_local = threading.local()
+    sheet_snapshot_loader.spreadsheet = None
+    sheet_snapshot_loader.save_in_background = True
+    sheet_snapshot_loader.publish_guard = nullcontext
+    sheet_snapshot_loader.load_lock = threading.Lock()
+    sheet_snapshot_loader.stats_lock = threading.Lock()
+    sheet_snapshot_loader.main_sync.lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(
+        before=lambda: _sheet_fork_guard.acquire(),
+        after_in_parent=lambda: _sheet_fork_guard.release(),
+        after_in_child=_reset_sheet_clients_after_fork
+    )
+
+# Google Drive service instance (connection pooling)
+_drive_service_instance = None
+_drive_service_lock = threading.Lock()
+# httplib2 connections are not thread-safe: the shared service sends each request over
+# the calling thread's own authorized connection (one per greenlet under gevent)
+_drive_http_local = threading.local()
+
+def build_drive_service(creds):
+    """Build the Drive v3 service; safe to share across request threads"""
+    def request_builder(http, *args, **kwargs):
+        local = _drive_http_local
+        if getattr(local, 'credentials', None) is not creds:
+            local.credentials = creds
+            local.http = google_auth_httplib2.AuthorizedHttp(creds, http=googleapiclient_http.build_http())
+        return googleapiclient_http.HttpRequest(local.http, *args, **kwargs)
+    return googleapiclient_discovery.build('drive', 'v3', credentials=creds, requestBuilder=request_builder)
+
+def get_drive_service():
+    """Initialize Google Drive service with connection pooling"""
+    global _drive_service_instance
+    
+    try:
+        # Use existing service if available
+        with _drive_service_lock:
+            if _drive_service_instance is not None:
+                return _drive_service_instance
+        
+        # Define the scope for Drive API
+        scopes = [
+            'https://www.googleapis.com/auth/drive.file',
+            'https://www.googleapis.com/auth/drive'
+        ]
+        
+        # Use hardcoded base64 encoded credentials
+        creds_base64 = GOOGLE_CREDENTIALS_BASE64
+        
+        if creds_base64:
+            # Decode base64 credentials
+            import base64
+            creds_json = base64.b64decode(creds_base64).decode('utf-8')
+            creds_dict = json.loads(creds_json)
+            
+            # Authenticate using credentials dictionary
+            creds = service_account.Credentials.from_service_account_info(creds_dict, scopes=scopes)
+            service = build_drive_service(creds)
+            
+            with _drive_service_lock:
+                _drive_service_instance = service
+            
+            logger.info("Created new Drive service (pooled)")
+            return service
+        
+        # Fallback to local credentials.json file (for local development)
+        creds_file = os.path.join(os.path.dirname(__file__), 'credentials.json')
+        if os.path.exists(creds_file):
+            creds = service_account.Credentials.from_service_account_file(creds_file, scopes=scopes)
+            service = build_drive_service(creds)
+            
+            with _drive_service_lock:
+                _drive_service_instance = service
+            
+            logger.info("Created new Drive service from file (pooled)")
+            return service
+        
+        return None
+    except Exception as e:
+        logger.error(f"Error initializing Drive service: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
+def upload_video_to_drive(file_content, filename, mimetype='video/mp4'):
+    """
+    Upload video to Google Drive and return file ID and link.
+    Returns (file_id, drive_link, error_message)
+    """
+    try:
+        service = get_drive_service()
+        
+        if not service:
+            return None, None, "Could not initialize Drive service"
+        
+        # Create file metadata
+        file_metadata = {
+            'name': filename,
+            'parents': [DRIVE_FOLDER_ID]
+        }
+        
+        # Create media from file content
+        media = googleapiclient_http.MediaIoBaseUpload(
+            io.BytesIO(file_content),
+            mimetype=mimetype,
+            resumable=True
+        )
+        
+        # Upload file
+        logger.info(f"Starting Drive upload for: {filename}")
+        file = service.files().create(
+            body=file_metadata,
+            media_body=media,
+            fields='id, webViewLink, webContentLink',
             supportsAllDrives=True  # Support for Shared Drives
         ).execute()
         
@@ -731,17 +1977,694 @@ def upload_video_to_drive(file_content, filename, mimetype='video/mp4'):
         traceback.print_exc()
         return None, None, str(e)
 
-def save_video_locally(file_content, filename):
+# ==================== LOCAL VIDEO STORAGE INDEX ====================
+
+class StorageIndex:
+    """
+    In-memory index of the videos in VIDEO_STORAGE_DIR, persisted as a hidden JSON file
+    that every worker process shares.
+    - New videos are written into 256 hashed shard directories (ab/<filename>), so
+      each holds about 1/256 of the archive and a scan still lists many files per
+      scandir call; files from the old flat layout are still found at the top level
+      until migrated
+    - Entries are keyed by filename and record the relative path, so callers look
+      videos up by name and never need to know where the file physically lives
+    - Every change is applied under an flock on top of the latest shared state, so no
+      process overwrites what another one recorded; access times are batched until flush()
+    - Changes are appended to a journal (<index>.journal, one JSON record per change)
+      instead of rewriting the whole file; the journal is compacted into the snapshot
+      once it outgrows a quarter of it
+    - A process applies the journal records it has not seen yet, entry by entry, when
+      another one changed the index (checked on flush, on a lookup miss and before each
+      change; two stats when nothing changed), and reloads the snapshot only after a
+      compaction
+    - Reconciled periodically with one os.scandir pass per shard directory
+    - File count and total size are maintained incrementally, so stats are O(1)
+    - Sorted (key, filename) lists per sort field serve paginated listings in O(page size)
+    Entries also carry the confirmed Drive file id and the last API access time,
+    which the retention engine uses to pick eviction candidates, and the SHA-256
+    recorded at ingest, which the integrity scrubber re-verifies.
+    """
+    VERSION = 1
+    SORT_FIELDS = ('name', 'size', 'mtime', 'ctime')
+    SHARD_DEPTH = 1
+    JOURNAL_COMPACT_BYTES = 1024 * 1024  # journal size that always allows a compaction
+
+    def __init__(self, storage_dir, index_path):
+        self.storage_dir = storage_dir
+        self.index_path = index_path
+        self.journal_path = index_path + '.journal'
+        self.entries = {}  # filename -> {'path', 'size', 'mtime', 'ctime', 'indexed_at', ['sha256', 'verified_at', 'drive_file_id', 'last_access']}
+        self.total_bytes = 0
+        self.last_reconciled = None
+        self.dirty = False
+        self.lock = threading.Lock()  # in-memory entries and views
+        self.write_lock = threading.Lock()  # one file-lock waiter per process
+        self._disk_state_seen = None
+        self._journal_seen = None  # (inode, bytes applied) of the journal
+        self._journal_broken = False  # a record was missing or unreadable; compact on the next write
+        self._seq = 0  # sequence number of the last change applied to memory
+        self._changed = set()  # filenames changed by the current transaction
+        self._compact = False  # the current transaction rewrites the snapshot
+        self._pending_access = {}  # filename -> last_access not yet written
+        self._sorted = {field: [] for field in self.SORT_FIELDS}
+        self._type_totals = {}  # content_type -> [count, bytes]
+
+    @staticmethod
+    def is_video_name(name):
+        """Hidden files (index, registry) and in-progress .tmp writes are not videos"""
+        return not name.startswith('.') and not name.endswith('.tmp')
+
+    @staticmethod
+    def is_shard_name(name):
+        return len(name) == 2 and all(c in '0123456789abcdef' for c in name)
+
+    @classmethod
+    def shard_relpath(cls, filename):
+        """Relative path of a video in the shard layout, keyed by a hash of its filename"""
+        digest = hashlib.sha1(filename.encode('utf-8')).hexdigest()
+        shards = [digest[i * 2:i * 2 + 2] for i in range(cls.SHARD_DEPTH)]
+        return os.path.join(*shards, filename)
+
+    @staticmethod
+    def content_type_for(filename):
+        return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    @staticmethod
+    def content_type_matches(content_type, wanted):
+        """Match an exact type ('video/mp4') or a family wildcard ('video/*')"""
+        if wanted.endswith('/*'):
+            return content_type.startswith(wanted[:-1])
+        return content_type == wanted
+
+    @staticmethod
+    def _sort_value(field, filename, entry):
+        if field == 'name':
+            return filename
+        return entry[field]
+
+    def _view_add(self, filename, entry):
+        # Caller holds self.lock
+        entry.setdefault('content_type', self.content_type_for(filename))
+        for field, keys in self._sorted.items():
+            bisect.insort(keys, (self._sort_value(field, filename, entry), filename))
+        totals = self._type_totals.setdefault(entry['content_type'], [0, 0])
+        totals[0] += 1
+        totals[1] += entry['size']
+
+    def _view_remove(self, filename, entry):
+        # Caller holds self.lock
+        for field, keys in self._sorted.items():
+            item = (self._sort_value(field, filename, entry), filename)
+            position = bisect.bisect_left(keys, item)
+            if position < len(keys) and keys[position] == item:
+                del keys[position]
+        totals = self._type_totals.get(entry.get('content_type'))
+        if totals is not None:
+            totals[0] -= 1
+            totals[1] -= entry['size']
+            if totals[0] <= 0:
+                del self._type_totals[entry['content_type']]
+
+    def _rebuild_views(self):
+        # Caller holds self.lock
+        self._type_totals = {}
+        for filename, entry in self.entries.items():
+            entry.setdefault('content_type', self.content_type_for(filename))
+            totals = self._type_totals.setdefault(entry['content_type'], [0, 0])
+            totals[0] += 1
+            totals[1] += entry['size']
+        for field in self.SORT_FIELDS:
+            self._sorted[field] = sorted(
+                (self._sort_value(field, filename, entry), filename)
+                for filename, entry in self.entries.items()
+            )
+        self.total_bytes = sum(entry['size'] for entry in self.entries.values())
+
+    def _disk_state(self):
+        """Identity of the index file as written last: (mtime_ns, size, inode), or None"""
+        try:
+            stats = os.stat(self.index_path)
+        except FileNotFoundError:
+            return None
+        return stats.st_mtime_ns, stats.st_size, stats.st_ino
+
+    def _read_disk(self):
+        """Return (files, last_reconciled, seq) from the index file, or None if there is nothing usable"""
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not load storage index {self.index_path}: {e}")
+            return None
+
+        if data.get('version') != self.VERSION:
+            return None
+        return data.get('files', {}), data.get('last_reconciled'), data.get('seq', 0)
+
+    def _sync(self):
+        """
+        Catch up with changes other processes made since this one last read or wrote
+        the index: reload the snapshot if it was rewritten, then apply the journal
+        records not seen yet. Caller holds self.write_lock. Returns True if anything changed.
+        """
+        reloaded = False
+        disk_state = self._disk_state()
+        if disk_state is None:
+            # No snapshot yet (or it was deleted): the next change writes one
+            self._disk_state_seen = None
+        elif disk_state != self._disk_state_seen:
+            loaded = self._read_disk()
+            if loaded is not None:
+                with self.lock:
+                    self.entries, self.last_reconciled, self._seq = loaded
+                    self._rebuild_views()
+                self._disk_state_seen = disk_state
+                # Records the snapshot already holds are skipped by sequence number
+                self._journal_seen = None
+                self._journal_broken = False
+                reloaded = True
+        return self._replay_journal() or reloaded
+
+    def _replay_journal(self):
+        """Apply journal records appended since the last read. Caller holds self.write_lock."""
+        try:
+            stats = os.stat(self.journal_path)
+        except FileNotFoundError:
+            self._journal_seen = None
+            return False
+        inode, offset = self._journal_seen or (None, 0)
+        if stats.st_ino == inode and stats.st_size == offset:
+            return False
+
+        try:
+            with open(self.journal_path, 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                if self._journal_seen is None or inode != self._journal_seen[0]:
+                    offset = 0  # new journal after a compaction
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            self._journal_seen = None
+            return False
+
+        # A record still being appended is picked up by the next read
+        end = data.rfind(b'\n') + 1
+        self._journal_seen = (inode, offset + end)
+        applied = False
+        with self.lock:
+            for line in data[:end].splitlines():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if record is not None and record.get('seq', 0) <= self._seq:
+                    continue
+                if record is None or record.get('seq') != self._seq + 1:
+                    logger.warning(f"Storage index journal {self.journal_path} is missing or has an unreadable record; "
+                                   f"it will be compacted on the next change")
+                    self._journal_broken = True
+                    break
+                self._apply_record(record)
+                applied = True
+        return applied
+
+    def _apply_record(self, record):
+        # Caller holds self.lock
+        for filename in record.get('drop', ()):
+            self._replace(filename, None)
+        for filename, entry in record.get('put', {}).items():
+            self._replace(filename, entry)
+        self.last_reconciled = record.get('last_reconciled', self.last_reconciled)
+        self._seq = record['seq']
+
+    def _journal_full(self):
+        """True if the next change should rewrite the snapshot instead of growing the journal"""
+        if self._journal_broken or self._disk_state_seen is None:
+            return True
+        journal_bytes = self._journal_seen[1] if self._journal_seen else 0
+        return journal_bytes >= max(self.JOURNAL_COMPACT_BYTES, self._disk_state_seen[1] // 4)
+
+    def _write_snapshot(self, payload):
+        """Replace the snapshot, then start an empty journal. Caller holds the file lock."""
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(payload)
+        os.replace(temp_path, self.index_path)
+        self._disk_state_seen = self._disk_state()
+
+        temp_path = self.journal_path + '.tmp'
+        open(temp_path, 'wb').close()
+        os.replace(temp_path, self.journal_path)
+        self._journal_seen = (os.stat(self.journal_path).st_ino, 0)
+        self._journal_broken = False
+
+    def _append_journal(self, record):
+        """Append one record to the journal. Caller holds the file lock."""
+        data = (record + '\n').encode('utf-8')
+        with open(self.journal_path, 'ab') as f:
+            stats = os.fstat(f.fileno())
+            inode, offset = self._journal_seen or (None, 0)
+            if stats.st_ino != inode:
+                offset = 0
+            if stats.st_size != offset:
+                # Drop the partial record of a writer that died mid-append
+                f.truncate(offset)
+            f.write(data)
+        self._journal_seen = (stats.st_ino, offset + len(data))
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive flock shared by every process (workers, video_manager.py) using this index"""
+        lock_file = open(self.index_path + '.lock', 'a')
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+        finally:
+            lock_file.close()
+
+    @contextmanager
+    def _transaction(self, on_commit=None):
+        """
+        Change the shared index under its file lock. The block runs with the latest
+        shared state loaded and self.lock held, and reports what it changed with
+        _mark() (or sets self._compact to rewrite everything); the change is appended to
+        the journal, or compacted into the snapshot, before the file lock is released.
+        on_commit runs after that write, still under the file lock. Only one thread per
+        process waits on the flock (self.write_lock), so greenlets never block the hub on it.
+        """
+        with self.write_lock, self._file_lock():
+            self._sync()
+            try:
+                snapshot = record = None
+                with self.lock:
+                    self.dirty = self._compact = False
+                    self._changed = set()
+                    yield
+                    if self.dirty:
+                        self._seq += 1
+                        if self._compact or self._journal_full():
+                            snapshot = json.dumps({
+                                'version': self.VERSION,
+                                'seq': self._seq,
+                                'last_reconciled': self.last_reconciled,
+                                'files': self.entries
+                            })
+                        else:
+                            record = json.dumps({
+                                'seq': self._seq,
+                                'last_reconciled': self.last_reconciled,
+                                'put': {name: self.entries[name] for name in self._changed if name in self.entries},
+                                'drop': [name for name in self._changed if name not in self.entries]
+                            })
+                    self.dirty = self._compact = False
+                    self._changed = set()
+
+                if snapshot is not None:
+                    self._write_snapshot(snapshot)
+                elif record is not None:
+                    self._append_journal(record)
+                if on_commit is not None:
+                    on_commit()
+            except BaseException:
+                # Memory may now differ from the files; reload them on the next access
+                self._disk_state_seen = self._journal_seen = None
+                raise
+
+    def _mark(self, filename):
+        # Caller holds self.lock inside _transaction()
+        self._changed.add(filename)
+        self.dirty = True
+
+    def load(self):
+        """Load the persisted index; returns False if there was nothing usable to load"""
+        return self.refresh()
+
+    def refresh(self):
+        """Pick up changes other processes made to the index (a single stat if there are none)"""
+        with self.write_lock:
+            return self._sync()
+
+    def modify(self, mutate):
+        """Apply mutate(files) to the shared index under its file lock (used by video_manager.py)"""
+        with self._transaction():
+            mutate(self.entries)
+            self._rebuild_views()
+            self._compact = self.dirty = True
+
+    def flush(self):
+        """Persist batched access times, then adopt other processes' changes"""
+        with self.lock:
+            accessed, self._pending_access = self._pending_access, {}
+        if not accessed:
+            self.refresh()
+            return
+
+        with self._transaction():
+            for filename, last_access in accessed.items():
+                entry = self.entries.get(filename)
+                # Memory already holds the value unless the file was reloaded since touch()
+                if entry is not None and last_access >= (entry.get('last_access') or 0):
+                    entry['last_access'] = last_access
+                    self._mark(filename)
+
+    def _replace(self, filename, entry):
+        """Set (or with entry=None drop) one entry, updating totals and views. Caller holds self.lock."""
+        previous = self.entries.pop(filename, None)
+        if previous is not None:
+            self.total_bytes -= previous['size']
+            self._view_remove(filename, previous)
+        if entry is not None:
+            self.entries[filename] = entry
+            self.total_bytes += entry['size']
+            self._view_add(filename, entry)
+
+    def _put(self, filename, entry):
+        # Caller holds self.lock
+        previous = self.entries.get(filename)
+        if previous is not None:
+            # Keep Drive confirmation / access metadata across re-indexing of the same name
+            for key in ('drive_file_id', 'last_access'):
+                if key in previous and key not in entry:
+                    entry[key] = previous[key]
+        self._replace(filename, entry)
+        self._mark(filename)
+
+    def add_path(self, path, **extra):
+        """Index (or re-index) a file with a single stat call"""
+        stats = os.stat(path)
+        entry = {
+            'path': os.path.relpath(path, self.storage_dir),
+            'size': stats.st_size,
+            'mtime': stats.st_mtime,
+            'ctime': stats.st_ctime,
+            'indexed_at': time.time()
+        }
+        entry.update(extra)
+        with self._transaction():
+            self._put(os.path.basename(path), entry)
+        return entry
+
+    def remove(self, filenames):
+        with self._transaction():
+            for filename in filenames:
+                self._pending_access.pop(filename, None)
+                if filename in self.entries:
+                    self._replace(filename, None)
+                    self._mark(filename)
+
+    def get(self, filename):
+        """Entry copy for filename; a miss re-checks the index file for other workers' additions"""
+        with self.lock:
+            entry = self.entries.get(filename)
+        if entry is None and self.refresh():
+            with self.lock:
+                entry = self.entries.get(filename)
+        return dict(entry) if entry is not None else None
+
+    def path_for(self, filename, entry=None):
+        """Physical path of an indexed video (entries from the flat layout have no 'path')"""
+        if entry is None:
+            with self.lock:
+                entry = self.entries.get(filename) or {}
+        return os.path.join(self.storage_dir, entry.get('path', filename))
+
+    def new_path(self, filename):
+        """Path a new video should be written to; creates its shard directories"""
+        path = os.path.join(self.storage_dir, self.shard_relpath(filename))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def locate(self, filename):
+        """Find a video on disk by name (shard location first, then the flat layout)"""
+        for relative in (self.shard_relpath(filename), filename):
+            path = os.path.join(self.storage_dir, relative)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def confirm_drive(self, filename, drive_file_id):
+        with self._transaction():
+            entry = self.entries.get(filename)
+            if entry is not None:
+                entry['drive_file_id'] = drive_file_id
+                entry['last_access'] = time.time()
+                self._mark(filename)
+
+    def record_verifications(self, results):
+        """
+        Record completed hashes [(filename, size, mtime, sha256)] with one index write,
+        checked against the hashes persisted by any process. Returns {filename: outcome}:
+        'ok', 'baseline' (no hash was recorded; this one becomes the reference),
+        'mismatch' (differs from the recorded hash) or 'stale' (the file was re-indexed
+        as a different version while it was being hashed).
+        """
+        outcomes = {}
+        verified_at = time.time()
+        with self._transaction():
+            for filename, size, mtime, sha256 in results:
+                entry = self.entries.get(filename)
+                if entry is None or entry['size'] != size or entry['mtime'] != mtime:
+                    outcomes[filename] = 'stale'
+                    continue
+                expected = entry.get('sha256')
+                if expected is not None and expected != sha256:
+                    outcomes[filename] = 'mismatch'
+                    continue
+                entry['sha256'] = sha256
+                entry['verified_at'] = verified_at
+                self._mark(filename)
+                outcomes[filename] = 'ok' if expected is not None else 'baseline'
+        return outcomes
+
+    def touch(self, filename):
+        """Record an API access; access times are batched and persisted by flush()"""
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(filename)
+            if entry is not None:
+                entry['last_access'] = now
+                self._pending_access[filename] = now
+
+    def totals(self):
+        """Return (video_count, total_bytes) in O(1)"""
+        with self.lock:
+            return len(self.entries), self.total_bytes
+
+    def snapshot(self):
+        """Return a list of (filename, entry) copies"""
+        with self.lock:
+            return [(name, dict(entry)) for name, entry in self.entries.items()]
+
+    def _scan(self, directory, relative, depth, scanned):
+        """Collect videos under directory, descending into shard directories only"""
+        try:
+            with os.scandir(directory) as dir_entries:
+                for dir_entry in dir_entries:
+                    if dir_entry.is_dir(follow_symlinks=False):
+                        if depth < self.SHARD_DEPTH and self.is_shard_name(dir_entry.name):
+                            self._scan(dir_entry.path, os.path.join(relative, dir_entry.name), depth + 1, scanned)
+                        continue
+                    if not self.is_video_name(dir_entry.name) or not dir_entry.is_file():
+                        continue
+                    stats = dir_entry.stat()
+                    path = os.path.join(relative, dir_entry.name)
+                    scanned[dir_entry.name] = (path, stats.st_size, stats.st_mtime, stats.st_ctime)
+        except FileNotFoundError:
+            pass
+
+    def reconcile(self):
+        """
+        Re-sync with the directory tree using os.scandir (DirEntry stats are cached).
+        The scan runs without locks; its result is merged into the on-disk index under
+        the file lock, so metadata recorded by other processes (Drive ids, ingest hashes,
+        verification times) is kept for every file whose size and mtime are unchanged.
+        """
+        scan_started = time.time()
+        scanned = {}
+        self._scan(self.storage_dir, '', 0, scanned)
+
+        with self._transaction():
+            entries = {}
+            for filename, (path, size, mtime, ctime) in scanned.items():
+                entry = self.entries.get(filename)
+                if entry is None and not os.path.exists(os.path.join(self.storage_dir, path)):
+                    # Deleted (and dropped from the index) by some process after the scan saw it
+                    continue
+                if (entry is None or entry['size'] != size or entry['mtime'] != mtime
+                        or entry.get('path', filename) != path):
+                    previous = entry or {}
+                    entry = {'path': path, 'size': size, 'mtime': mtime, 'ctime': ctime, 'indexed_at': scan_started}
+                    for key in ('drive_file_id', 'last_access'):
+                        if key in previous:
+                            entry[key] = previous[key]
+                entries[filename] = entry
+
+            # Files indexed while the scan was running may not have been seen by it
+            for filename, entry in self.entries.items():
+                if filename not in entries and entry.get('indexed_at', 0) >= scan_started:
+                    entries[filename] = entry
+
+            added = len(entries.keys() - self.entries.keys())
+            removed = len(self.entries.keys() - entries.keys())
+            for filename in self.entries.keys() | entries.keys():
+                entry = entries.get(filename)
+                if entry is not self.entries.get(filename):
+                    self._replace(filename, entry)
+                    self._mark(filename)
+            self.last_reconciled = datetime.utcnow().isoformat()
+            self.dirty = True
+
+        if added or removed:
+            logger.info(f"Storage index reconciled: +{added} / -{removed} files ({len(entries)} indexed)")
+
+    def migrate_drive_registry(self, registry_path):
+        """
+        Fold confirmations from the old .drive_uploads.json registry into the index.
+        The registry is read, merged and removed under the index file lock, so only one
+        process migrates it, and it is removed only once the merge has been written.
+        """
+        registry = None
+
+        def remove_registry():
+            if registry is not None:
+                os.remove(registry_path)
+
+        with self._transaction(on_commit=remove_registry):
+            try:
+                with open(registry_path, 'r') as f:
+                    registry = json.load(f)
+            except FileNotFoundError:
+                return
+            except Exception as e:
+                logger.warning(f"Could not migrate Drive upload registry {registry_path}: {e}")
+                return
+            for filename, record in registry.items():
+                entry = self.entries.get(filename)
+                if entry is not None:
+                    entry['drive_file_id'] = record.get('drive_file_id')
+                    entry['last_access'] = record.get('last_access', record.get('confirmed_at'))
+                    self._mark(filename)
+        logger.info(f"Migrated {len(registry)} Drive upload confirmations into the storage index")
+
+    def page(self, sort='mtime', descending=True, after=None, limit=100, prefix=None, content_type=None):
+        """
+        Return (items, next_after) for one page of the listing.
+        items are (sort_key, filename, entry) tuples; after/next_after is the
+        (sort_key, filename) position of the last item of the previous/current page.
+        limit=None returns every match.
+        Costs O(log n + page size) except when filters skip many non-matching files.
+        """
+        with self.lock:
+            keys = self._sorted[sort]
+            low, high = 0, len(keys)
+
+            # Name-sorted listings can jump straight to the prefix range
+            if prefix and sort == 'name':
+                low = bisect.bisect_left(keys, (prefix,))
+                high = bisect.bisect_left(keys, (prefix + '\U0010ffff',))
+
+            if descending:
+                if after is not None:
+                    high = min(high, bisect.bisect_left(keys, after))
+                positions = range(high - 1, low - 1, -1)
+            else:
+                if after is not None:
+                    low = max(low, bisect.bisect_right(keys, after))
+                positions = range(low, high)
+
+            items = []
+            next_after = None
+            for position in positions:
+                sort_key, filename = keys[position]
+                entry = self.entries[filename]
+                if prefix and not filename.startswith(prefix):
+                    continue
+                if content_type and not self.content_type_matches(entry['content_type'], content_type):
+                    continue
+                if len(items) == limit:
+                    next_after = (items[-1][0], items[-1][1])
+                    break
+                items.append((sort_key, filename, dict(entry)))
+
+            return items, next_after
+
+    def summary(self, prefix=None, content_type=None):
+        """Return (count, total_bytes) of matching files; O(1) unless a prefix is given"""
+        with self.lock:
+            if prefix:
+                keys = self._sorted['name']
+                low = bisect.bisect_left(keys, (prefix,))
+                high = bisect.bisect_left(keys, (prefix + '\U0010ffff',))
+                count = total_bytes = 0
+                for _, filename in keys[low:high]:
+                    entry = self.entries[filename]
+                    if content_type and not self.content_type_matches(entry['content_type'], content_type):
+                        continue
+                    count += 1
+                    total_bytes += entry['size']
+                return count, total_bytes
+
+            if content_type:
+                count = total_bytes = 0
+                for entry_type, (type_count, type_bytes) in self._type_totals.items():
+                    if self.content_type_matches(entry_type, content_type):
+                        count += type_count
+                        total_bytes += type_bytes
+                return count, total_bytes
+
+            return len(self.entries), self.total_bytes
+
+    def stats(self):
+        with self.lock:
+            return {
+                "indexed_videos": len(self.entries),
+                "total_bytes": self.total_bytes,
+                "last_reconciled": self.last_reconciled
+            }
+
+STORAGE_INDEX_RECONCILE_SECONDS = 300
+STORAGE_INDEX_FLUSH_SECONDS = 30
+
+storage_index = StorageIndex(VIDEO_STORAGE_DIR, os.path.join(VIDEO_STORAGE_DIR, '.storage_index.json'))
+# Import only reads the index; building or migrating it is left to the first background run
+storage_index.load()
+
+def initialize_storage_index():
+    """Build the index if no process has written it yet, and fold in the old Drive registry"""
+    if not os.path.exists(storage_index.index_path):
+        storage_index.reconcile()
+    storage_index.migrate_drive_registry(os.path.join(VIDEO_STORAGE_DIR, '.drive_uploads.json'))
+
+register_background_task('storage-index-init', initialize_storage_index, None)
+register_background_task('storage-index-reconcile', storage_index.reconcile, STORAGE_INDEX_RECONCILE_SECONDS)
+register_background_task('storage-index-flush', storage_index.flush, STORAGE_INDEX_FLUSH_SECONDS)
+
+# ==================== END LOCAL VIDEO STORAGE INDEX ====================
+
+def save_video_locally(file_content, filename, reservation=None):
     """
     Save video file to local storage with error handling.
+    reservation: disk space the caller already reserved for this write (the caller releases it)
     Returns (success, local_path, error_message)
     """
+    own_reservation = None
     try:
+        # Reserve disk space before writing anything
+        if reservation is None:
+            reservation = own_reservation = disk_admission.reserve(len(file_content))
+        if reservation is None:
+            logger.warning(f"Not saving {filename} locally: {INSUFFICIENT_DISK_SPACE_ERROR}")
+            return False, None, INSUFFICIENT_DISK_SPACE_ERROR
+
         # Create timestamped filename to avoid conflicts
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         safe_filename = secure_filename(filename)
         local_filename = f"{timestamp}_{safe_filename}"
-        local_path = os.path.join(VIDEO_STORAGE_DIR, local_filename)
+        local_path = storage_index.new_path(local_filename)
         
         # Save file with atomic write (write to temp file, then move)
         temp_path = local_path + '.tmp'
@@ -759,6 +2682,7 @@ def save_video_locally(file_content, filename):
         
         # Move temp file to final location (atomic operation)
         shutil.move(temp_path, local_path)
+        storage_index.add_path(local_path, sha256=hashlib.sha256(file_content).hexdigest())
         
         logger.info(f"Video saved locally: {local_filename} ({file_size} bytes)")
         return True, local_path, None
@@ -774,6 +2698,389 @@ def save_video_locally(file_content, filename):
             except:
                 pass
         return False, None, str(e)
+    finally:
+        if own_reservation is not None:
+            disk_admission.release(own_reservation)
+
+# ==================== LOCAL VIDEO RETENTION ====================
+
+class RetentionEngine:
+    """
+    Evicts local copies of videos that are already safely on Google Drive.
+    - Files older than max_age_seconds (by last access) are evicted when an age limit is set
+    - While the directory exceeds max_bytes, the least recently used confirmed files are evicted
+    Files without a confirmed Drive upload are never touched.
+    """
+    def __init__(self, storage_dir, index, max_bytes, max_age_seconds=0):
+        self.storage_dir = storage_dir
+        self.index = index
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.lock = threading.Lock()
+        self.stats = {
+            'runs': 0,
+            'evicted_files': 0,
+            'reclaimed_bytes': 0,
+            'last_run': None,
+            'last_run_evicted_files': 0,
+            'last_run_reclaimed_bytes': 0
+        }
+
+    def run_once(self, now=None):
+        """Run one eviction pass over the storage index. Returns (evicted_files, reclaimed_bytes)."""
+        now = now if now is not None else time.time()
+
+        # Decide on the shared index, including other workers' Drive confirmations
+        self.index.refresh()
+        total_bytes = 0
+        candidates = []  # (last_used, size, filename, path)
+        for filename, entry in self.index.snapshot():
+            total_bytes += entry['size']
+            if entry.get('drive_file_id'):
+                last_used = max(entry['mtime'], entry.get('last_access') or 0)
+                candidates.append((last_used, entry['size'], filename, self.index.path_for(filename, entry)))
+
+        # Least recently used first
+        candidates.sort()
+        to_evict = []
+        remaining_bytes = total_bytes
+        for last_used, size, filename, path in candidates:
+            too_old = self.max_age_seconds and now - last_used > self.max_age_seconds
+            over_budget = remaining_bytes > self.max_bytes
+            if not (too_old or over_budget):
+                continue
+            to_evict.append((filename, path, size))
+            remaining_bytes -= size
+
+        evicted = []
+        reclaimed_bytes = 0
+        for filename, path, size in to_evict:
+            try:
+                os.remove(path)
+                evicted.append(filename)
+                reclaimed_bytes += size
+                logger.info(f"Retention evicted local copy (on Drive): {filename} ({size} bytes)")
+            except FileNotFoundError:
+                # Moved into its shard since it was indexed; evict it from there
+                moved_path = self.index.locate(filename)
+                if moved_path is not None:
+                    try:
+                        os.remove(moved_path)
+                        reclaimed_bytes += size
+                    except OSError as e:
+                        logger.error(f"Retention could not evict {filename}: {e}")
+                        continue
+                evicted.append(filename)
+            except Exception as e:
+                logger.error(f"Retention could not evict {filename}: {e}")
+
+        if evicted:
+            self.index.remove(evicted)
+
+        with self.lock:
+            self.stats['runs'] += 1
+            self.stats['evicted_files'] += len(evicted)
+            self.stats['reclaimed_bytes'] += reclaimed_bytes
+            self.stats['last_run'] = datetime.utcnow().isoformat()
+            self.stats['last_run_evicted_files'] = len(evicted)
+            self.stats['last_run_reclaimed_bytes'] = reclaimed_bytes
+
+        return len(evicted), reclaimed_bytes
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        stats['max_bytes'] = self.max_bytes
+        stats['max_age_seconds'] = self.max_age_seconds
+        stats['reclaimed_mb'] = round(stats['reclaimed_bytes'] / (1024 * 1024), 2)
+        return stats
+
+# Local copies are evicted (LRU) once the directory exceeds this budget; 0 age = no age limit
+RETENTION_MAX_BYTES = int(os.environ.get('RETENTION_MAX_BYTES', 50 * 1024 * 1024 * 1024))  # 50 GB
+RETENTION_MAX_AGE_DAYS = float(os.environ.get('RETENTION_MAX_AGE_DAYS', 0))
+RETENTION_INTERVAL_SECONDS = 600
+
+retention_engine = RetentionEngine(
+    VIDEO_STORAGE_DIR,
+    storage_index,
+    max_bytes=RETENTION_MAX_BYTES,
+    max_age_seconds=RETENTION_MAX_AGE_DAYS * 86400
+)
+register_background_task('video-retention', retention_engine.run_once, RETENTION_INTERVAL_SECONDS)
+
+# ==================== END LOCAL VIDEO RETENTION ====================
+
+# ==================== LOCAL VIDEO INTEGRITY SCRUBBER ====================
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def hash_file(path, bytes_per_second=0):
+    """
+    SHA-256 of a file, read in chunks. With bytes_per_second set, reading is paced
+    to that rate and the pages read are dropped from the page cache afterwards, so
+    scrubbing does not compete with uploads and streaming for IO or cache.
+    """
+    digest = hashlib.sha256()
+    started = time.monotonic()
+    bytes_read = 0
+    with open(path, 'rb') as f:
+        if bytes_per_second and hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            bytes_read += len(chunk)
+            if bytes_per_second:
+                ahead = bytes_read / bytes_per_second - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+        if bytes_per_second and hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return digest.hexdigest()
+
+class IntegrityScrubber:
+    """
+    Re-verifies stored videos against the SHA-256 recorded at ingest.
+    - Hashes at most bytes_per_second, least recently verified files first, and
+      re-verifies each file every reverify_seconds
+    - A file whose content changed without its size/mtime changing is corrupt: it is
+      moved to quarantine_dir and dropped from the index
+    - Orphaned .tmp/.part files (crashed writes/downloads) older than tmp_max_age_seconds
+      are deleted
+    Only one process per storage directory scrubs at a time (flock on a lock file).
+    Verification times and hashes live in the shared storage index, so whichever
+    worker takes the lock continues where the last one stopped.
+    """
+    ORPHAN_SUFFIXES = ('.tmp', '.part')
+
+    def __init__(self, storage_dir, index, quarantine_dir, bytes_per_second,
+                 reverify_seconds, tmp_max_age_seconds, max_run_seconds=300, commit_seconds=30):
+        self.storage_dir = storage_dir
+        self.index = index
+        self.quarantine_dir = quarantine_dir
+        self.bytes_per_second = bytes_per_second
+        self.reverify_seconds = reverify_seconds
+        self.tmp_max_age_seconds = tmp_max_age_seconds
+        self.max_run_seconds = max_run_seconds
+        self.commit_seconds = commit_seconds
+        self.lock_path = os.path.join(storage_dir, '.scrubber.lock')
+        self.lock = threading.Lock()
+        self.stats = {
+            'runs': 0,
+            'files_verified': 0,
+            'bytes_hashed': 0,
+            'baselines_recorded': 0,
+            'corrupt_files': 0,
+            'tmp_files_removed': 0,
+            'tmp_bytes_removed': 0,
+            'last_run': None,
+            'last_corrupt_file': None
+        }
+
+    def _count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def collect_orphans(self, now=None):
+        """Delete .tmp/.part files older than tmp_max_age_seconds; returns the count removed"""
+        now = now if now is not None else time.time()
+        removed = 0
+        directories = [(self.storage_dir, 0)]
+        while directories:
+            directory, depth = directories.pop()
+            try:
+                with os.scandir(directory) as dir_entries:
+                    for dir_entry in dir_entries:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            if depth < StorageIndex.SHARD_DEPTH and StorageIndex.is_shard_name(dir_entry.name):
+                                directories.append((dir_entry.path, depth + 1))
+                            continue
+                        if not dir_entry.name.endswith(self.ORPHAN_SUFFIXES) or not dir_entry.is_file():
+                            continue
+                        stats = dir_entry.stat()
+                        if now - stats.st_mtime < self.tmp_max_age_seconds:
+                            continue
+                        try:
+                            os.remove(dir_entry.path)
+                        except FileNotFoundError:
+                            continue
+                        removed += 1
+                        self._count('tmp_files_removed')
+                        self._count('tmp_bytes_removed', stats.st_size)
+                        logger.info(f"Scrubber removed orphaned partial file: {dir_entry.path} ({stats.st_size} bytes)")
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def quarantine(self, filename, path):
+        os.makedirs(self.quarantine_dir, exist_ok=True)
+        target = os.path.join(self.quarantine_dir, filename)
+        if os.path.exists(target):
+            target = f"{target}.{int(time.time())}"
+        os.replace(path, target)
+        self.index.remove([filename])
+        return target
+
+    def _hash(self, filename, entry):
+        """Hash one indexed file; returns (outcome, digest) with outcome 'hashed', 'changed' or 'missing'"""
+        path = self.index.path_for(filename, entry)
+        try:
+            stats = os.stat(path)
+            if stats.st_size != entry['size'] or stats.st_mtime != entry['mtime']:
+                # Legitimately rewritten since it was indexed
+                self.index.add_path(path)
+                return 'changed', None
+            digest = hash_file(path, self.bytes_per_second)
+        except FileNotFoundError:
+            return 'missing', None
+
+        self._count('files_verified')
+        self._count('bytes_hashed', entry['size'])
+        return 'hashed', digest
+
+    def _record(self, hashed):
+        """
+        Check hashed [(filename, entry, digest)] against the shared index (which holds
+        the ingest hash whichever worker recorded it) and quarantine mismatches.
+        Returns one outcome per file: 'ok', 'baseline', 'changed', 'missing' or 'corrupt'.
+        """
+        recorded = self.index.record_verifications(
+            [(filename, entry['size'], entry['mtime'], digest) for filename, entry, digest in hashed]
+        )
+        outcomes = []
+        for filename, entry, digest in hashed:
+            outcome = recorded[filename]
+            if outcome == 'stale':
+                outcome = 'changed'
+            elif outcome == 'baseline':
+                self._count('baselines_recorded')
+            elif outcome == 'mismatch':
+                outcome = self._mismatch(filename, entry, digest)
+            outcomes.append(outcome)
+        return outcomes
+
+    def _mismatch(self, filename, entry, digest):
+        path = self.index.path_for(filename, entry)
+        # Re-check metadata: a write that raced the hash is a change, not corruption
+        try:
+            stats = os.stat(path)
+        except FileNotFoundError:
+            return 'missing'
+        if stats.st_size != entry['size'] or stats.st_mtime != entry['mtime']:
+            self.index.add_path(path)
+            return 'changed'
+
+        expected = (self.index.get(filename) or {}).get('sha256')
+        target = self.quarantine(filename, path)
+        self._count('corrupt_files')
+        with self.lock:
+            self.stats['last_corrupt_file'] = filename
+        logger.error(f"Integrity check failed for {filename}: expected sha256 {expected}, got {digest}; quarantined at {target}")
+        return 'corrupt'
+
+    def verify(self, filename, entry):
+        """Hash one indexed file; returns 'ok', 'baseline', 'changed', 'missing' or 'corrupt'"""
+        outcome, digest = self._hash(filename, entry)
+        if outcome != 'hashed':
+            return outcome
+        return self._record([(filename, entry, digest)])[0]
+
+    def pending(self, now=None):
+        """Indexed files due for verification, least recently verified first"""
+        now = now if now is not None else time.time()
+        due = [
+            (entry.get('verified_at') or 0, filename, entry)
+            for filename, entry in self.index.snapshot()
+            if now - (entry.get('verified_at') or 0) >= self.reverify_seconds
+        ]
+        due.sort(key=lambda item: (item[0], item[1]))
+        return [(filename, entry) for _, filename, entry in due]
+
+    def run_once(self, now=None):
+        """
+        One scrub pass: collect orphans, then verify due files for up to max_run_seconds.
+        Results are written to the shared index every commit_seconds and at the end.
+        """
+        lock_file = open(self.lock_path, 'a')
+        try:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Another worker process is scrubbing this directory
+                    return None
+
+            # Choose what is due from the shared index, so files another worker verified
+            # (or ingested with a hash) are seen here too
+            self.index.refresh()
+            self.collect_orphans(now)
+
+            started = last_commit = time.monotonic()
+            outcomes = {}
+            hashed = []
+
+            def tally(outcome):
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+            for filename, entry in self.pending(now):
+                if time.monotonic() - started >= self.max_run_seconds:
+                    break
+                outcome, digest = self._hash(filename, entry)
+                if outcome == 'hashed':
+                    hashed.append((filename, entry, digest))
+                else:
+                    tally(outcome)
+                if hashed and time.monotonic() - last_commit >= self.commit_seconds:
+                    for outcome in self._record(hashed):
+                        tally(outcome)
+                    hashed = []
+                    last_commit = time.monotonic()
+            if hashed:
+                for outcome in self._record(hashed):
+                    tally(outcome)
+
+            with self.lock:
+                self.stats['runs'] += 1
+                self.stats['last_run'] = datetime.utcnow().isoformat()
+            return outcomes
+        finally:
+            lock_file.close()
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+        now = time.time()
+        entries = self.index.snapshot()
+        verified = sum(
+            1 for _, entry in entries
+            if entry.get('verified_at') and now - entry['verified_at'] < self.reverify_seconds
+        )
+        stats['indexed_files'] = len(entries)
+        stats['verified_within_window'] = verified
+        stats['progress_percent'] = round(verified / len(entries) * 100, 1) if entries else 100.0
+        stats['bytes_per_second'] = self.bytes_per_second
+        stats['reverify_seconds'] = self.reverify_seconds
+        return stats
+
+# IO budget for re-hashing stored videos, and how often each file is re-verified
+SCRUB_BYTES_PER_SECOND = int(os.environ.get('SCRUB_BYTES_PER_SECOND', 10 * 1024 * 1024))  # 10 MB/s
+SCRUB_REVERIFY_DAYS = float(os.environ.get('SCRUB_REVERIFY_DAYS', 7))
+SCRUB_TMP_MAX_AGE_HOURS = float(os.environ.get('SCRUB_TMP_MAX_AGE_HOURS', 24))
+SCRUB_INTERVAL_SECONDS = 60
+
+integrity_scrubber = IntegrityScrubber(
+    VIDEO_STORAGE_DIR,
+    storage_index,
+    quarantine_dir=os.path.join(VIDEO_STORAGE_DIR, '.quarantine'),
+    bytes_per_second=SCRUB_BYTES_PER_SECOND,
+    reverify_seconds=SCRUB_REVERIFY_DAYS * 86400,
+    tmp_max_age_seconds=SCRUB_TMP_MAX_AGE_HOURS * 3600
+)
+register_background_task('video-integrity-scrubber', integrity_scrubber.run_once, SCRUB_INTERVAL_SECONDS)
+
+# ==================== END LOCAL VIDEO INTEGRITY SCRUBBER ====================
 
 def extract_youtube_video_id(url):
     """
@@ -796,11 +3103,23 @@ def extract_youtube_video_id(url):
     
     return None
 
-def download_youtube_video(youtube_url, content_type='Unknown'):
+def estimate_download_size(info):
+    """Estimate the bytes needed on disk for a yt-dlp download (parts plus merged output)"""
+    formats = info.get('requested_formats') or [info]
+    size = sum((f.get('filesize') or f.get('filesize_approx') or 0) for f in formats)
+    if not size:
+        return DEFAULT_DOWNLOAD_RESERVATION_BYTES
+    # Separate video/audio parts coexist with the merged file until yt-dlp cleans up
+    return size * 2
+
+def download_youtube_video(youtube_url, content_type='Unknown', space_wait_seconds=0):
     """
     Download YouTube video using yt-dlp and save it locally.
+    Disk space for the estimated size is reserved before any media is transferred;
+    if it is not available within space_wait_seconds the download is rejected.
     Returns (success, local_path, video_info, error_message)
     """
+    reservation = None
     try:
         video_id = extract_youtube_video_id(youtube_url)
         if not video_id:
@@ -810,7 +3129,7 @@ def download_youtube_video(youtube_url, content_type='Unknown'):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         safe_content_type = content_type.replace(' ', '_').replace('/', '_')
         output_filename = f"{timestamp}_{safe_content_type}_{video_id}.mp4"
-        output_path = os.path.join(VIDEO_STORAGE_DIR, output_filename)
+        output_path = storage_index.new_path(output_filename)
         
         logger.info(f"Starting YouTube download: {youtube_url} (ID: {video_id})")
         
@@ -852,7 +3171,16 @@ def download_youtube_video(youtube_url, content_type='Unknown'):
         
         # Download video
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(youtube_url, download=True)
+            # Resolve formats first so the size can be checked before transferring media
+            info = ydl.extract_info(youtube_url, download=False)
+
+            estimated_size = estimate_download_size(info)
+            reservation = disk_admission.reserve(estimated_size, timeout=space_wait_seconds)
+            if reservation is None:
+                logger.warning(f"Rejecting YouTube download {video_id}: needs ~{estimated_size} bytes")
+                return False, None, None, INSUFFICIENT_DISK_SPACE_ERROR
+
+            info = ydl.process_ie_result(info, download=True)
             
             # Get video information
             video_info = {
@@ -872,6 +3200,8 @@ def download_youtube_video(youtube_url, content_type='Unknown'):
             file_size = os.path.getsize(output_path)
             if file_size == 0:
                 raise Exception("Downloaded file is empty")
+
+            storage_index.add_path(output_path, sha256=hash_file(output_path))
             
             logger.info(f"YouTube video downloaded successfully: {output_filename} ({file_size} bytes)")
             logger.info(f"Video title: {video_info['title']}")
@@ -884,15 +3214,20 @@ def download_youtube_video(youtube_url, content_type='Unknown'):
         import traceback
         traceback.print_exc()
         
-        # Clean up partial download if it exists
-        if 'output_path' in locals() and os.path.exists(output_path):
-            try:
-                os.remove(output_path)
-                logger.info(f"Cleaned up partial download: {output_path}")
-            except:
-                pass
+        # Clean up partial download (and yt-dlp .part/format fragments) if they exist
+        if 'output_path' in locals():
+            partial_files = glob.glob(glob.escape(os.path.splitext(output_path)[0]) + '.*')
+            for partial_path in partial_files:
+                try:
+                    os.remove(partial_path)
+                    logger.info(f"Cleaned up partial download: {partial_path}")
+                except:
+                    pass
         
         return False, None, None, str(e)
+    finally:
+        if reservation is not None:
+            disk_admission.release(reservation)
 
 def write_to_credentials_sheet(username, email, password_hash):
     """Write new user credentials to the sheet with retry logic"""
@@ -930,10 +3265,11 @@ def write_to_credentials_sheet(username, email, password_hash):
             new_row = [username, email, password_hash, password_hash]  # Username, Email, Password, Confirm Password
             worksheet.append_row(new_row)
             
-            # Clear credentials cache after adding new user
-            cache_key = f'credentials_data_{SHEET_ID}_{CREDENTIALS_GID}'
-            credentials_cache.delete(cache_key)
-            logger.info(f"Added new user and cleared credentials cache: {username}")
+            # Add the new user to the cached index instead of refetching the whole sheet
+            cached_index = credentials_cache.get(CREDENTIALS_CACHE_KEY)
+            if cached_index is not None:
+                cached_index.add({'username': username, 'email': email, 'password': password_hash})
+            logger.info(f"Added new user to sheet and credentials cache: {username}")
 
             return {
                 'success': True,
@@ -959,68 +3295,636 @@ def write_to_credentials_sheet(username, email, password_hash):
         'message': 'Max retries exceeded'
     }
 
+class PasswordPoolSaturated(Exception):
+    """Raised when the password hashing pool already has its maximum number of jobs"""
+
+class PasswordHasherPool:
+    """
+    Dedicated, bounded pool for bcrypt work.
+    - At most `workers` hashes run at once (bcrypt releases the GIL, so they use
+      real cores without starving the request threads of the interpreter)
+    - At most `max_pending` more may wait; beyond that run() raises
+      PasswordPoolSaturated immediately so the endpoint can answer 503
+    Falls back to running inline (still bounded) where thread pools are disabled.
+    """
+    def __init__(self, workers, max_pending, use_threads=True):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = None
+        if use_threads:
+            if GEVENT_ACTIVE:
+                # Under gevent, stdlib pool threads are greenlets and bcrypt would block the
+                # whole worker; gevent's executor runs the hashes on real OS threads
+                from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+                self.executor = NativeThreadPoolExecutor(max_workers=workers)
+            else:
+                self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self.slots = threading.BoundedSemaphore(workers + max_pending)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_ms = 0.0
+
+    def _release(self, started):
+        self.slots.release()
+        with self.lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_ms += (time.perf_counter() - started) * 1000
+
+    def run(self, func, *args):
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise PasswordPoolSaturated("Too many password operations in progress")
+
+        started = time.perf_counter()
+        with self.lock:
+            self.in_flight += 1
+
+        if self.executor is None:
+            try:
+                return func(*args)
+            finally:
+                self._release(started)
+
+        try:
+            future = self.executor.submit(func, *args)
+        except Exception:
+            self._release(started)
+            raise
+        # The slot is held until the job itself finishes, even if the caller gives up
+        future.add_done_callback(lambda _: self._release(started))
+        return future.result()
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_ms": round(self.total_ms / max(self.completed, 1), 2)
+            }
+
+# bcrypt cost factor for new hashes (existing hashes keep the cost they were created with)
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+BCRYPT_POOL_WORKERS = int(os.environ.get('BCRYPT_POOL_WORKERS', os.cpu_count() or 2))
+BCRYPT_MAX_PENDING = int(os.environ.get('BCRYPT_MAX_PENDING', 16))
+PASSWORD_POOL_BUSY_MESSAGE = 'Server is busy, please retry shortly'
+
+password_pool = PasswordHasherPool(
+    BCRYPT_POOL_WORKERS,
+    BCRYPT_MAX_PENDING,
+    use_threads=not IS_VERCEL and THREADPOOL_AVAILABLE
+)
+
 def hash_password(password):
-    """Hash a password using bcrypt"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    """Hash a password using bcrypt (raises PasswordPoolSaturated when the pool is full)"""
+    def _hash():
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+    return password_pool.run(_hash)
 
 def verify_password(password, hashed):
-    """Verify a password against its hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    """Verify a password against its hash (raises PasswordPoolSaturated when the pool is full)"""
+    return password_pool.run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+@app.errorhandler(PasswordPoolSaturated)
+def password_pool_busy(e):
+    """Any route that finds the bcrypt pool full answers a retryable 503"""
+    response = jsonify({'success': False, 'message': PASSWORD_POOL_BUSY_MESSAGE})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+# ==================== JWT VERIFICATION CACHE ====================
+
+class TokenCache:
+    """
+    Bounded LRU of verified JWT -> claims.
+    Entries are only served until the token's own 'exp', so a cached token expires
+    exactly when jwt.decode would start rejecting it.
+    """
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # token -> (claims, exp)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token, now=None):
+        now = now if now is not None else time.time()
+        with self.lock:
+            item = self.entries.get(token)
+            if item is None:
+                self.misses += 1
+                return None
+            claims, exp = item
+            if exp is not None and now >= exp:
+                del self.entries[token]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(token)
+            self.hits += 1
+            return claims
+
+    def peek(self, token, now=None):
+        """True if get() would serve token from the cache (no LRU or stats update)"""
+        now = now if now is not None else time.time()
+        with self.lock:
+            item = self.entries.get(token)
+        return item is not None and (item[1] is None or now < item[1])
+
+    def put(self, token, claims):
+        with self.lock:
+            self.entries[token] = (claims, claims.get('exp'))
+            self.entries.move_to_end(token)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, token):
+        with self.lock:
+            self.entries.pop(token, None)
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": f"{(self.hits / max(lookups, 1) * 100):.2f}%"
+            }
+
+class TokenRevocationList:
+    """
+    Revoked token ids (jti) until their expiry, shared between worker processes
+    through a small JSON file. The file is re-read only when it changes, and checked
+    at most once per check_interval seconds. Revoking is a read-merge-write under an
+    flock, so concurrent revocations in different workers are all kept.
+    """
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self.revoked = {}  # jti -> exp
+        self.lock = threading.Lock()
+        self._file_state = None
+        self._last_check = 0
+
+    def _refresh(self, now):
+        # Caller holds self.lock
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        try:
+            stats = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        file_state = (stats.st_mtime_ns, stats.st_size, stats.st_ino)
+        if file_state == self._file_state:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.revoked.update(json.load(f))
+            self._file_state = file_state
+        except Exception as e:
+            logger.warning(f"Could not load token revocation list {self.path}: {e}")
+
+    def check_due(self, now=None):
+        """True if the next is_revoked() call will stat (and maybe re-read) the file"""
+        now = now if now is not None else time.time()
+        return now - self._last_check >= self.check_interval
+
+    def is_revoked(self, jti, now=None):
+        if not jti:
+            return False
+        now = now if now is not None else time.time()
+        # Between checks this is a dict lookup; it never waits on a revoke() holding the lock
+        if self.check_due(now):
+            with self.lock:
+                self._refresh(now)
+        return jti in self.revoked
+
+    def revoke(self, jti, exp):
+        now = time.time()
+        # self.lock keeps this process to one flock waiter
+        with self.lock:
+            lock_file = open(self.path + '.lock', 'a')
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                # Merge what other workers revoked since this one last read the file
+                self._last_check = 0
+                self._refresh(now)
+                self.revoked[jti] = exp
+                # Tokens past their expiry are rejected anyway; stop tracking them
+                self.revoked = {key: value for key, value in self.revoked.items() if value is None or value > now}
+                temp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w') as f:
+                    json.dump(self.revoked, f)
+                os.replace(temp_path, self.path)
+                stats = os.stat(self.path)
+                self._file_state = (stats.st_mtime_ns, stats.st_size, stats.st_ino)
+            finally:
+                lock_file.close()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.revoked)
+
+class AuthTimer:
+    """Aggregate time spent verifying tokens in token_required"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+        self.cached = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms, cached):
+        with self.lock:
+            self.count += 1
+            self.cached += 1 if cached else 0
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "verifications": self.count,
+                "served_from_cache": self.cached,
+                "avg_ms": round(self.total_ms / max(self.count, 1), 4),
+                "max_ms": round(self.max_ms, 4),
+                "total_ms": round(self.total_ms, 2)
+            }
+
+JWT_EXPIRATION_DAYS = 7
+JWT_CACHE_MAX_ENTRIES = int(os.environ.get('JWT_CACHE_MAX_ENTRIES', 10000))
+TOKEN_REVOCATION_FILE = os.environ.get('TOKEN_REVOCATION_FILE', os.path.join(LOG_DIR, '.revoked_tokens.json'))
+
+token_cache = TokenCache(JWT_CACHE_MAX_ENTRIES)
+token_revocations = TokenRevocationList(TOKEN_REVOCATION_FILE)
+auth_timer = AuthTimer()
 
 def generate_token(username, email):
     """Generate JWT token for authenticated user"""
     payload = {
         'username': username,
         'email': email,
-        'exp': datetime.utcnow() + timedelta(days=7)  # Token expires in 7 days
+        'jti': uuid.uuid4().hex,  # Lets a single token be revoked (logout)
+        'exp': datetime.utcnow() + timedelta(days=JWT_EXPIRATION_DAYS)  # Token expires in 7 days
     }
     return jwt.encode(payload, JWT_SECRET_KEY, algorithm='HS256')
 
+def verify_jwt(token):
+    """
+    Verify a JWT, serving repeat verifications of the same token from the cache.
+    Returns (claims, cached, error_message); claims is None on failure.
+    """
+    claims = token_cache.get(token)
+    cached = claims is not None
+    if claims is None:
+        try:
+            claims = jwt.decode(token, JWT_SECRET_KEY, algorithms=['HS256'])
+        except jwt.ExpiredSignatureError:
+            return None, False, 'Token has expired'
+        except jwt.InvalidTokenError:
+            return None, False, 'Invalid token'
+        if 'username' not in claims or 'scope' in claims:
+            # Scoped tickets (see generate_ticket) are not session tokens
+            return None, False, 'Invalid token'
+        token_cache.put(token, claims)
+
+    if token_revocations.is_revoked(claims.get('jti')):
+        token_cache.discard(token)
+        return None, cached, 'Token has been revoked'
+
+    return claims, cached, None
+
+def revoke_token(token, claims):
+    """Revoke a token for the rest of its lifetime (tokens issued before jti support cannot be revoked)"""
+    token_cache.discard(token)
+    if not claims.get('jti'):
+        return False
+    token_revocations.revoke(claims['jti'], claims.get('exp'))
+    return True
+
+def authenticate_request(authorization):
+    """
+    Check the bearer token of a request (shared by token_required and the ASGI handlers).
+    Returns (token, claims, error, auth_ms); claims is None when the request is rejected.
+    """
+    token = None
+
+    # Get token from header
+    if authorization is not None:
+        try:
+            token = authorization.split(' ')[1]  # Bearer <token>
+        except IndexError:
+            return None, None, 'Invalid token format', None
+
+    if not token:
+        return None, None, 'Token is missing', None
+
+    started = time.perf_counter()
+    claims, cached, error = verify_jwt(token)
+    auth_ms = (time.perf_counter() - started) * 1000
+    auth_timer.record(auth_ms, cached)
+    return token, claims, error, auth_ms
+
 def token_required(f):
     """Decorator to protect routes that require authentication"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
+        token, claims, error, auth_ms = authenticate_request(request.headers.get('Authorization'))
+        if auth_ms is not None:
+            g.auth_ms = auth_ms
 
-        # Get token from header
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                token = auth_header.split(' ')[1]  # Bearer <token>
-            except IndexError:
-                return jsonify({'success': False, 'message': 'Invalid token format'}), 401
+        if claims is None:
+            return jsonify({'success': False, 'message': error}), 401
 
-        if not token:
-            return jsonify({'success': False, 'message': 'Token is missing'}), 401
-
-        try:
-            data = jwt.decode(token, JWT_SECRET_KEY, algorithms=['HS256'])
-            current_user = data['username']
-        except jwt.ExpiredSignatureError:
-            return jsonify({'success': False, 'message': 'Token has expired'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'success': False, 'message': 'Invalid token'}), 401
+        g.jwt_token = token
+        g.jwt_claims = claims
+        current_user = claims['username']
 
         return f(current_user, *args, **kwargs)
 
     return decorated
 
-@app.before_request
-def track_request():
-    """Middleware to track requests for monitoring"""
+# Scoped tickets: short-lived JWTs for URLs a browser fetches without an Authorization
+# header (<video src>, EventSource), so the session token never appears in a URL or access log
+VIDEO_STREAM_TICKET_SECONDS = int(os.environ.get('VIDEO_STREAM_TICKET_SECONDS', 3600))
+
+def generate_ticket(claims, scope, resource, seconds):
+    """Ticket valid only for scope/resource; revoking the session (jti) also revokes it"""
+    payload = {
+        'username': claims['username'],
+        'scope': scope,
+        'resource': resource,
+        'sid': claims.get('jti'),
+        'exp': datetime.utcnow() + timedelta(seconds=seconds)
+    }
+    return jwt.encode(payload, JWT_SECRET_KEY, algorithm='HS256')
+
+def verify_ticket(ticket, scope, resource):
+    """Returns (claims, error_message); claims is None unless the ticket grants scope/resource"""
+    try:
+        claims = jwt.decode(ticket, JWT_SECRET_KEY, algorithms=['HS256'])
+    except jwt.ExpiredSignatureError:
+        return None, 'Ticket has expired'
+    except jwt.InvalidTokenError:
+        return None, 'Invalid ticket'
+    if claims.get('scope') != scope or claims.get('resource') != resource or 'username' not in claims:
+        return None, 'Invalid ticket'
+    if token_revocations.is_revoked(claims.get('sid')):
+        return None, 'Token has been revoked'
+    return claims, None
+
+def ticket_or_token_required(scope, resource_arg=None):
+    """token_required that also accepts ?ticket= minted for scope (and the route's resource_arg, if any)"""
+    def decorator(f):
+        protected = token_required(f)
+
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            ticket = request.args.get('ticket')
+            if not ticket or 'Authorization' in request.headers:
+                return protected(*args, **kwargs)
+
+            claims, error = verify_ticket(ticket, scope, kwargs[resource_arg] if resource_arg else None)
+            if claims is None:
+                return jsonify({'success': False, 'message': error}), 401
+            g.jwt_claims = claims
+            return f(claims['username'], *args, **kwargs)
+
+        return decorated
+    return decorator
+
+# ==================== END JWT VERIFICATION CACHE ====================
+
+def count_request():
+    start_background_tasks()
     with request_counter_lock:
         request_counter['total'] += 1
 
-@app.after_request
-def track_response(response):
-    """Middleware to track successful/failed requests"""
+def count_response(status_code):
     with request_counter_lock:
-        if response.status_code < 400:
+        if status_code < 400:
             request_counter['successful'] += 1
         else:
             request_counter['failed'] += 1
+
+@app.before_request
+def track_request():
+    """Middleware to track requests for monitoring"""
+    count_request()
+
+@app.after_request
+def track_response(response):
+    """Middleware to track successful/failed requests"""
+    count_response(response.status_code)
+
+    # Per-request auth overhead, visible in browser dev tools
+    auth_ms = g.get('auth_ms')
+    if auth_ms is not None:
+        response.headers.add('Server-Timing', f'auth;dur={auth_ms:.3f}')
     return response
 
+# ==================== RESPONSE PAYLOADS ====================
+# Shared by the Flask routes and the native handlers in asgi.py
+
+def build_data_payload(records, reedit_records):
+    """/api/data body: final entries from the main sheet plus the re-edit (Drive Links) entries"""
+    # Filter out Re-edit entries from main sheet (they should be in Drive Links sheet)
+    final_records = [
+        record for record in records
+        if record.get('Edit', '').lower() != 're-edit'
+    ]
+
+    # Combine final records and re-edit records
+    all_records = final_records + reedit_records
+
+    logger.info(f"Fetched {len(final_records)} final records and {len(reedit_records)} re-edit records, total: {len(all_records)}")
+
+    return {
+        "success": True,
+        "data": all_records,
+        "count": len(all_records),
+        "finalCount": len(final_records),
+        "reEditCount": len(reedit_records)
+    }
+
+def build_filters_payload(records):
+    """/api/filters body: unique content types, subcategories and subjects of the final entries"""
+    # Filter out Re-edit entries
+    filtered_records = [
+        record for record in records
+        if record.get('Edit', '').lower() != 're-edit'
+    ]
+
+    # Extract unique values from filtered records
+    types = list(set([r.get('Content Type', '') for r in filtered_records if r.get('Content Type')]))
+    subcategories = list(set([r.get('Sub category', '') for r in filtered_records if r.get('Sub category')]))
+    subjects = list(set([r.get('Subject', '') for r in filtered_records if r.get('Subject')]))
+
+    return {
+        "success": True,
+        "filters": {
+            "types": sorted(types),
+            "subcategories": sorted(subcategories),
+            "subjects": sorted(subjects)
+        }
+    }
+
+def build_leaderboard_payload(records, reedit_records):
+    """/api/leaderboard body: per-vertical totals and top contributors over final and re-edit entries"""
+    logger.info(f"Fetched {len(records)} final records and {len(reedit_records)} re-edit records")
+
+    # Group by vertical and calculate stats
+    vertical_stats = {}
+
+    # Process final entries
+    for record in records:
+        vertical = record.get('Vertical Name', '').strip()
+        if not vertical:
+            continue
+
+        if vertical not in vertical_stats:
+            vertical_stats[vertical] = {
+                'name': vertical,
+                'totalVideos': 0,
+                'finalVideos': 0,
+                'reEditVideos': 0,
+                'exams': set(),
+                'subjects': set(),
+                'finalContributors': {},  # Separate tracking for final videos
+                'reEditContributors': {}   # Separate tracking for re-edit videos
+            }
+
+        # Count total videos
+        vertical_stats[vertical]['totalVideos'] += 1
+
+        # Count by status
+        status = str(record.get('Edit', '')).strip().lower()
+        if status == 'final' or 'final' in status:
+            vertical_stats[vertical]['finalVideos'] += 1
+
+            # Track final contributors
+            email = record.get('Email', '').strip()
+            if email:
+                if email not in vertical_stats[vertical]['finalContributors']:
+                    vertical_stats[vertical]['finalContributors'][email] = 0
+                vertical_stats[vertical]['finalContributors'][email] += 1
+
+        elif status == 're-edit' or 'reedit' in status or 're-edit' in status:
+            vertical_stats[vertical]['reEditVideos'] += 1
+
+            # Track re-edit contributors from main sheet
+            email = record.get('Email', '').strip()
+            if email:
+                if email not in vertical_stats[vertical]['reEditContributors']:
+                    vertical_stats[vertical]['reEditContributors'][email] = 0
+                vertical_stats[vertical]['reEditContributors'][email] += 1
+
+        # Collect unique exams and subjects
+        exam = record.get('Exam Name', '').strip()
+        if exam:
+            vertical_stats[vertical]['exams'].add(exam)
+
+        subject = record.get('Subject', '').strip()
+        if subject:
+            vertical_stats[vertical]['subjects'].add(subject)
+
+    # Process re-edit entries from Drive Links sheet
+    for record in reedit_records:
+        vertical = record.get('Vertical Name', '').strip()
+        if not vertical:
+            continue
+
+        if vertical not in vertical_stats:
+            vertical_stats[vertical] = {
+                'name': vertical,
+                'totalVideos': 0,
+                'finalVideos': 0,
+                'reEditVideos': 0,
+                'exams': set(),
+                'subjects': set(),
+                'finalContributors': {},
+                'reEditContributors': {}
+            }
+
+        # Count re-edit videos (all entries in Drive Links sheet are re-edits)
+        vertical_stats[vertical]['totalVideos'] += 1
+        vertical_stats[vertical]['reEditVideos'] += 1
+
+        # Track re-edit contributors from Drive Links sheet
+        email = record.get('Email', '').strip()
+        if email:
+            if email not in vertical_stats[vertical]['reEditContributors']:
+                vertical_stats[vertical]['reEditContributors'][email] = 0
+            vertical_stats[vertical]['reEditContributors'][email] += 1
+
+        # Collect unique exams and subjects
+        exam = record.get('Exam Name', '').strip()
+        if exam:
+            vertical_stats[vertical]['exams'].add(exam)
+
+        subject = record.get('Subject', '').strip()
+        if subject:
+            vertical_stats[vertical]['subjects'].add(subject)
+
+    # Format results
+    leaderboard = []
+    for vertical, stats in vertical_stats.items():
+        # Get top 5 final contributors with earnings (₹50 per video)
+        top_final_contributors = sorted(
+            [{'email': email, 'count': count, 'earnings': count * 50} for email, count in stats['finalContributors'].items()],
+            key=lambda x: x['count'],
+            reverse=True
+        )[:5]
+
+        # Get top 5 re-edit contributors with earnings (₹50 per video)
+        top_reedit_contributors = sorted(
+            [{'email': email, 'count': count, 'earnings': count * 50} for email, count in stats['reEditContributors'].items()],
+            key=lambda x: x['count'],
+            reverse=True
+        )[:5]
+
+        leaderboard.append({
+            'name': vertical,
+            'totalVideos': stats['totalVideos'],
+            'finalVideos': stats['finalVideos'],
+            'reEditVideos': stats['reEditVideos'],
+            'examsCount': len(stats['exams']),
+            'subjectsCount': len(stats['subjects']),
+            'exams': list(stats['exams']),
+            'subjects': list(stats['subjects']),
+            'topFinalContributors': top_final_contributors,
+            'topReEditContributors': top_reedit_contributors
+        })
+
+    # Sort by total videos (descending)
+    leaderboard.sort(key=lambda x: x['totalVideos'], reverse=True)
+
+    # Calculate summary
+    summary = {
+        'totalVerticals': len(leaderboard),
+        'totalVideos': sum(v['totalVideos'] for v in leaderboard),
+        'totalFinalVideos': sum(v['finalVideos'] for v in leaderboard),
+        'totalReEditVideos': sum(v['reEditVideos'] for v in leaderboard)
+    }
+
+    return {
+        "success": True,
+        "leaderboard": leaderboard,
+        "summary": summary
+    }
+
 @app.route('/', methods=['GET', 'OPTIONS'])
 def home():
     """Home endpoint - also handles OPTIONS for CORS preflight"""
@@ -1068,35 +3972,37 @@ def health():
 @app.route('/health/detailed', methods=['GET'])
 def detailed_health():
     """Detailed health check with service status"""
+    # Check Google Sheets connectivity
+    try:
+        google_sheets = "healthy" if get_sheet_data() is not None else "degraded"
+    except Exception as e:
+        google_sheets = "unhealthy"
+        logger.error(f"Health check - Google Sheets failed: {e}")
+
+    health_status, status_code = build_detailed_health(google_sheets)
+    return jsonify(health_status), status_code
+
+def build_detailed_health(google_sheets):
+    """Detailed health body and status code, given the Google Sheets check result"""
     health_status = {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "services": {
-            "google_sheets": "unknown",
+            "google_sheets": google_sheets,
             "video_storage": "unknown"
         },
         "cache": {
             "sheets_cache": "enabled",
             "credentials_cache": "enabled",
-            "filters_cache": "enabled"
-        }
-    }
-    
-    # Check Google Sheets connectivity
-    try:
-        test_data = get_sheet_data()
-        if test_data is not None:
-            health_status["services"]["google_sheets"] = "healthy"
-        else:
-            health_status["services"]["google_sheets"] = "degraded"
-    except Exception as e:
-        health_status["services"]["google_sheets"] = "unhealthy"
-        logger.error(f"Health check - Google Sheets failed: {e}")
+            "filters_cache": "enabled"
+        }
+    }
     
     # Check video storage
     try:
         if os.path.exists(VIDEO_STORAGE_DIR) and os.access(VIDEO_STORAGE_DIR, os.W_OK):
             health_status["services"]["video_storage"] = "healthy"
+            health_status["storage_index"] = storage_index.stats()
         else:
             health_status["services"]["video_storage"] = "degraded"
     except Exception as e:
@@ -1111,29 +4017,34 @@ def detailed_health():
         health_status["status"] = "degraded"
     
     status_code = 200 if health_status["status"] == "healthy" else 503
-    return jsonify(health_status), status_code
+    return health_status, status_code
 
 @app.route('/metrics', methods=['GET'])
 def metrics():
     """Endpoint for monitoring metrics"""
+    return jsonify(build_metrics_payload()), 200
+
+def build_metrics_payload():
     with request_counter_lock:
         stats = request_counter.copy()
     
-    # Video storage stats
-    video_count = 0
-    total_size = 0
-    if os.path.exists(VIDEO_STORAGE_DIR):
-        for filename in os.listdir(VIDEO_STORAGE_DIR):
-            file_path = os.path.join(VIDEO_STORAGE_DIR, filename)
-            if os.path.isfile(file_path) and not filename.startswith('.'):
-                total_size += os.path.getsize(file_path)
-                video_count += 1
+    # Video storage stats (maintained incrementally by the shared storage index)
+    storage_index.refresh()
+    video_count, total_size = storage_index.totals()
     
-    # Downloads in progress
+    # Disk headroom for new uploads/downloads
+    try:
+        disk_stats = disk_admission.stats()
+        disk_stats["headroom_mb"] = round(disk_stats["headroom_bytes"] / (1024 * 1024), 2)
+    except Exception as e:
+        disk_stats = {"error": str(e)}
+
+    # Downloads in progress (finished records are expired by the sweeper)
     with downloads_lock:
-        downloads_count = len(video_downloads_in_progress)
+        downloads_count = count_active_downloads()
+        download_records = len(video_downloads_in_progress)
     
-    return jsonify({
+    return {
         "requests": {
             "total": stats['total'],
             "successful": stats['successful'],
@@ -1143,8 +4054,25 @@ def metrics():
         "videos": {
             "stored_locally": video_count,
             "total_size_mb": round(total_size / (1024 * 1024), 2),
-            "downloads_in_progress": downloads_count
+            "downloads_in_progress": downloads_count,
+            "download_records": download_records,
+            "download_record_retention_seconds": DOWNLOAD_RECORD_RETENTION_SECONDS
         },
+        "disk": disk_stats,
+        "retention": retention_engine.get_stats(),
+        "http_client": http_client.get_stats(),
+        "sheet_snapshot": sheet_snapshot_loader.get_stats(),
+        "events": dataset_events.get_stats(),
+        "catalogs": {name: response.get_stats() for name, response in catalog_responses.items()},
+        "auth": {
+            "token_verification": auth_timer.get_stats(),
+            "token_cache": token_cache.get_stats(),
+            "revoked_tokens": len(token_revocations),
+            "password_pool": password_pool.get_stats(),
+            "google_token_cache": google_token_cache.get_stats(),
+            "google_certs": google_auth_transport.get_stats() if google_auth_transport else None
+        },
+        "integrity": integrity_scrubber.get_stats(),
         "cache": {
             "enabled": True,
             "ttl_seconds": {
@@ -1154,15 +4082,16 @@ def metrics():
             }
         },
         "system": {
-            "thread_pool_max_workers": 10,
-            "video_queue_max_size": 50
+            "thread_pool_max_workers": EXECUTOR_WORKERS,
+            "video_queue_max_size": MAX_ACTIVE_DOWNLOADS
         }
-    }), 200
+    }
 
 @app.route('/cache/clear', methods=['POST'])
 def clear_cache():
     """Endpoint to manually clear all caches (admin use)"""
     try:
+        sheet_snapshot_loader.request_refresh()
         sheets_cache.clear()
         credentials_cache.clear()
         filters_cache.clear()
@@ -1184,31 +4113,13 @@ def clear_cache():
 def get_data(current_user):
     """Fetch all data from Google Sheets including Re-edit entries from Drive Links - PROTECTED"""
     try:
-        # Fetch both final entries and re-edit entries
-        records = get_sheet_data()
-        reedit_records = get_reedit_data()
+        # Fetch both final entries and re-edit entries (one snapshot)
+        records, reedit_records = get_sheet_and_reedit_data()
 
         if records is None:
             return jsonify({"error": "Failed to access sheet"}), 500
 
-        # Filter out Re-edit entries from main sheet (they should be in Drive Links sheet)
-        final_records = [
-            record for record in records
-            if record.get('Edit', '').lower() != 're-edit'
-        ]
-
-        # Combine final records and re-edit records
-        all_records = final_records + reedit_records
-
-        logger.info(f"Fetched {len(final_records)} final records and {len(reedit_records)} re-edit records, total: {len(all_records)}")
-
-        return jsonify({
-            "success": True,
-            "data": all_records,
-            "count": len(all_records),
-            "finalCount": len(final_records),
-            "reEditCount": len(reedit_records)
-        })
+        return jsonify(build_data_payload(records, reedit_records))
     except Exception as e:
         logger.error(f"Error in get_data: {e}")
         return jsonify({
@@ -1216,6 +4127,31 @@ def get_data(current_user):
             "error": str(e)
         }), 500
 
+@app.route('/api/events/ticket', methods=['GET'])
+@token_required
+def get_event_stream_url(current_user):
+    """Signed URL for /api/events, for EventSource which cannot send a bearer token - PROTECTED"""
+    ticket = generate_ticket(g.jwt_claims, 'events', None, SSE_TICKET_SECONDS)
+    return jsonify({
+        "success": True,
+        "url": f"/api/events?ticket={ticket}",
+        "expires_in": SSE_TICKET_SECONDS
+    }), 200
+
+@app.route('/api/events', methods=['GET'])
+@ticket_or_token_required('events')
+def dataset_event_stream(current_user):
+    """Server-Sent Events stream of dataset changes, so dashboards can stop polling - PROTECTED"""
+    # EventSource resends the last event id (the dataset version) when it reconnects
+    last_version = request.headers.get('Last-Event-ID') or request.args.get('since')
+    response = Response(
+        dataset_events.stream(last_version, SSE_MAX_STREAM_SECONDS, SSE_HEARTBEAT_SECONDS),
+        mimetype='text/event-stream'
+    )
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+    return response
+
 @app.route('/api/filters', methods=['GET'])
 @token_required
 def get_filters(current_user):
@@ -1225,25 +4161,7 @@ def get_filters(current_user):
         if records is None:
             return jsonify({"error": "Failed to access sheet"}), 500
 
-        # Filter out Re-edit entries
-        filtered_records = [
-            record for record in records
-            if record.get('Edit', '').lower() != 're-edit'
-        ]
-
-        # Extract unique values from filtered records
-        types = list(set([r.get('Content Type', '') for r in filtered_records if r.get('Content Type')]))
-        subcategories = list(set([r.get('Sub category', '') for r in filtered_records if r.get('Sub category')]))
-        subjects = list(set([r.get('Subject', '') for r in filtered_records if r.get('Subject')]))
-
-        return jsonify({
-            "success": True,
-            "filters": {
-                "types": sorted(types),
-                "subcategories": sorted(subcategories),
-                "subjects": sorted(subjects)
-            }
-        })
+        return jsonify(build_filters_payload(records))
     except Exception as e:
         return jsonify({
             "success": False,
@@ -1273,7 +4191,24 @@ def upload_video():
     - Uploads to Google Drive with shareable link (anyone with link can access)
     """
     local_path = None
+    reservation = None
     try:
+        # Reserve local space from Content-Length before request.files reads (and spools)
+        # the body. Without room the video still goes to Drive, just not to local storage;
+        # with no Drive either there is nowhere to put it, so reject before reading it
+        save_locally = True
+        if request.content_length:
+            reservation = disk_admission.reserve(request.content_length)
+            if reservation is None:
+                if get_drive_service() is None:
+                    logger.warning(f"Upload rejected: {INSUFFICIENT_DISK_SPACE_ERROR} ({request.content_length} bytes)")
+                    return jsonify({
+                        "success": False,
+                        "error": INSUFFICIENT_DISK_SPACE_ERROR
+                    }), 507
+                logger.warning(f"Skipping local save of upload: {INSUFFICIENT_DISK_SPACE_ERROR} ({request.content_length} bytes)")
+                save_locally = False
+
         # Check if file is present
         if 'video' not in request.files:
             logger.warning("Upload attempted without video file")
@@ -1320,7 +4255,10 @@ def upload_video():
         local_path = None
 
         # Save video to local uploaded_videos folder
-        success, local_path, save_error = save_video_locally(file_content, filename)
+        if save_locally:
+            success, local_path, save_error = save_video_locally(file_content, filename, reservation)
+        else:
+            success, local_path, save_error = False, None, INSUFFICIENT_DISK_SPACE_ERROR
         if success:
             logger.info(f"✓ Video saved locally: {local_path}")
         else:
@@ -1332,6 +4270,9 @@ def upload_video():
 
         if drive_link:
             logger.info(f"✓ Video uploaded to Google Drive: {filename} -> {drive_link}")
+            # The local copy is now only a cache and may be evicted by the retention engine
+            if local_path:
+                storage_index.confirm_drive(os.path.basename(local_path), file_id)
         else:
             logger.error(f"Failed to upload to Google Drive: {drive_error}")
 
@@ -1377,6 +4318,9 @@ def upload_video():
             error_response["message"] = "Error occurred but video is saved locally"
         
         return jsonify(error_response), 500
+    finally:
+        if reservation is not None:
+            disk_admission.release(reservation)
 
 @app.route('/api/video-info/<filename>', methods=['GET'])
 def get_video_info(filename):
@@ -1384,23 +4328,27 @@ def get_video_info(filename):
     try:
         # Sanitize filename
         safe_filename = secure_filename(filename)
-        video_path = os.path.join(VIDEO_STORAGE_DIR, safe_filename)
-        
-        if not os.path.exists(video_path):
-            return jsonify({
-                "success": False,
-                "error": "Video not found"
-            }), 404
-        
-        file_stats = os.stat(video_path)
+        entry = storage_index.get(safe_filename)
+
+        if entry is None:
+            # Not indexed yet (e.g. copied in by hand) - index it if it exists on disk
+            video_path = storage_index.locate(safe_filename) if StorageIndex.is_video_name(safe_filename) else None
+            if video_path is None:
+                return jsonify({
+                    "success": False,
+                    "error": "Video not found"
+                }), 404
+            entry = storage_index.add_path(video_path)
+
+        storage_index.touch(safe_filename)
         
         return jsonify({
             "success": True,
             "filename": safe_filename,
-            "size_bytes": file_stats.st_size,
-            "size_mb": round(file_stats.st_size / (1024 * 1024), 2),
-            "created": datetime.fromtimestamp(file_stats.st_ctime).isoformat(),
-            "modified": datetime.fromtimestamp(file_stats.st_mtime).isoformat()
+            "size_bytes": entry['size'],
+            "size_mb": round(entry['size'] / (1024 * 1024), 2),
+            "created": datetime.fromtimestamp(entry['ctime']).isoformat(),
+            "modified": datetime.fromtimestamp(entry['mtime']).isoformat()
         }), 200
         
     except Exception as e:
@@ -1410,44 +4358,258 @@ def get_video_info(filename):
             "error": str(e)
         }), 500
 
+STREAM_CHUNK_SIZE = 256 * 1024
+STREAM_CACHE_MAX_AGE_SECONDS = 3600
+
+def iter_file_range(file_obj, length, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield length bytes from the current position of file_obj in bounded chunks, then close it"""
+    try:
+        remaining = length
+        while remaining > 0:
+            chunk = file_obj.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file_obj.close()
+
+@app.route('/api/videos/stream-url/<filename>', methods=['GET'])
+@token_required
+def get_video_stream_url(current_user, filename):
+    """Signed URL for /api/videos/stream, for <video src> which cannot send a bearer token - PROTECTED"""
+    safe_filename = secure_filename(filename)
+    ticket = generate_ticket(g.jwt_claims, 'video-stream', safe_filename, VIDEO_STREAM_TICKET_SECONDS)
+    return jsonify({
+        "success": True,
+        "url": f"/api/videos/stream/{safe_filename}?ticket={ticket}",
+        "expires_in": VIDEO_STREAM_TICKET_SECONDS
+    }), 200
+
+@app.route('/api/videos/stream/<filename>', methods=['GET', 'HEAD'])
+@ticket_or_token_required('video-stream', 'filename')
+def stream_video(current_user, filename):
+    """
+    Stream a locally stored video with HTTP Range and conditional GET support - PROTECTED
+    (bearer token, or the ?ticket= of a URL from /api/videos/stream-url/<filename>).
+    - ETag / Last-Modified come from the storage index (no stat per request)
+    - The body is handed to the server's wsgi.file_wrapper positioned at the range start,
+      so gunicorn delivers exactly Content-Length bytes with sendfile() (zero-copy).
+      Servers without a file wrapper get the range in bounded chunks; the file is
+      never read into memory as a whole.
+    """
+    try:
+        safe_filename = secure_filename(filename)
+        entry = storage_index.get(safe_filename)
+
+        if entry is None:
+            return jsonify({
+                "success": False,
+                "error": "Video not found"
+            }), 404
+
+        size = entry['size']
+        etag = f"{size:x}-{int(entry['mtime'] * 1000000):x}"
+        last_modified = int(entry['mtime'])
+
+        headers = {
+            'Accept-Ranges': 'bytes',
+            'ETag': f'"{etag}"',
+            'Last-Modified': formatdate(last_modified, usegmt=True),
+            'Cache-Control': f'private, max-age={STREAM_CACHE_MAX_AGE_SECONDS}'
+        }
+
+        # Conditional GET: If-None-Match takes precedence over If-Modified-Since
+        if request.if_none_match:
+            if request.if_none_match.contains(etag) or request.if_none_match.star_tag:
+                return Response(status=304, headers=headers)
+        elif request.if_modified_since is not None:
+            if last_modified <= request.if_modified_since.replace(tzinfo=timezone.utc).timestamp():
+                return Response(status=304, headers=headers)
+
+        # Range: honoured only if If-Range (when present) still matches this version
+        start, stop, status = 0, size, 200
+        if request.range is not None:
+            if_range = request.if_range
+            if_range_matches = (
+                (if_range.etag is None and if_range.date is None)
+                or if_range.etag == etag
+                or (if_range.date is not None
+                    and last_modified <= if_range.date.replace(tzinfo=timezone.utc).timestamp())
+            )
+            if if_range_matches:
+                byte_range = request.range.range_for_length(size)
+                if byte_range is None:
+                    headers['Content-Range'] = f'bytes */{size}'
+                    return Response(status=416, headers=headers)
+                start, stop = byte_range
+                status = 206
+                headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+
+        length = stop - start
+        headers['Content-Length'] = str(length)
+
+        if request.method == 'HEAD':
+            return Response(status=status, headers=headers, mimetype=entry['content_type'])
+
+        try:
+            file_obj = open(storage_index.path_for(safe_filename), 'rb')
+        except FileNotFoundError:
+            # Moved into its shard (video_manager.py migrate-shards) since it was indexed
+            moved_path = storage_index.locate(safe_filename)
+            if moved_path is None:
+                # Evicted or quarantined by another worker; adopt its index update
+                storage_index.refresh()
+                return jsonify({
+                    "success": False,
+                    "error": "Video not found"
+                }), 404
+            storage_index.add_path(moved_path)
+            file_obj = open(moved_path, 'rb')
+        file_obj.seek(start)
+
+        file_wrapper = request.environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            body = file_wrapper(file_obj, STREAM_CHUNK_SIZE)
+        else:
+            body = iter_file_range(file_obj, length)
+
+        storage_index.touch(safe_filename)
+
+        response = Response(body, status=status, headers=headers, mimetype=entry['content_type'], direct_passthrough=True)
+        response.content_length = length
+        return response
+
+    except FileNotFoundError:
+        # Deleted behind the index's back; drop the stale entry
+        storage_index.remove([secure_filename(filename)])
+        return jsonify({
+            "success": False,
+            "error": "Video not found"
+        }), 404
+    except Exception as e:
+        logger.error(f"Error streaming video: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+VIDEO_LIST_DEFAULT_LIMIT = 100
+VIDEO_LIST_MAX_LIMIT = 1000
+
+def encode_list_cursor(sort, order, after):
+    """Opaque cursor for the next page of /api/videos/list"""
+    payload = json.dumps([sort, order, after[0], after[1]]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+def decode_list_cursor(cursor, sort, order):
+    """Return the (sort_key, filename) position encoded in cursor, or raise ValueError"""
+    try:
+        cursor_sort, cursor_order, sort_key, filename = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort or cursor_order != order:
+        raise ValueError("Cursor does not match the requested sort order")
+    # The position is compared against the index's sort keys, so the types must match
+    key_types = str if sort == 'name' else (int, float)
+    if not isinstance(filename, str) or isinstance(sort_key, bool) or not isinstance(sort_key, key_types):
+        raise ValueError("Invalid cursor")
+    return (sort_key, filename)
+
 @app.route('/api/videos/list', methods=['GET'])
 def list_videos():
-    """List all locally stored videos"""
+    """
+    List locally stored videos (served from the storage index).
+    Without limit or cursor every matching video is returned, newest first, as before
+    pagination existed. Query parameters:
+    - sort: ctime (default), mtime, size or name; order: desc (default) or asc
+    - limit: page size (max 1000; 100 when only a cursor is given); cursor: next_cursor from the previous page
+    - prefix: filename prefix; content_type: e.g. video/mp4 or video/*
+    - summary=true: return only the count and total size of matching videos
+    """
     try:
-        videos = []
-        
-        if not os.path.exists(VIDEO_STORAGE_DIR):
+        sort = request.args.get('sort', 'ctime')
+        order = request.args.get('order', 'desc')
+        prefix = request.args.get('prefix') or None
+        content_type = request.args.get('content_type') or None
+
+        if sort not in StorageIndex.SORT_FIELDS:
+            return jsonify({
+                "success": False,
+                "error": f"sort must be one of: {', '.join(StorageIndex.SORT_FIELDS)}"
+            }), 400
+        if order not in ('asc', 'desc'):
+            return jsonify({
+                "success": False,
+                "error": "order must be 'asc' or 'desc'"
+            }), 400
+
+        cursor = request.args.get('cursor')
+        limit = None
+        if 'limit' in request.args or cursor:
+            try:
+                limit = int(request.args.get('limit', VIDEO_LIST_DEFAULT_LIMIT))
+            except ValueError:
+                return jsonify({
+                    "success": False,
+                    "error": "limit must be an integer"
+                }), 400
+            limit = max(1, min(limit, VIDEO_LIST_MAX_LIMIT))
+
+        # Include videos other workers indexed since this one last looked
+        storage_index.refresh()
+        match_count, match_bytes = storage_index.summary(prefix=prefix, content_type=content_type)
+        summary = {
+            "total_count": match_count,
+            "total_size_bytes": match_bytes,
+            "total_size_mb": round(match_bytes / (1024 * 1024), 2)
+        }
+
+        if request.args.get('summary', '').lower() in ('1', 'true', 'yes'):
             return jsonify({
                 "success": True,
-                "videos": [],
-                "count": 0
+                **summary
             }), 200
-        
-        for filename in os.listdir(VIDEO_STORAGE_DIR):
-            file_path = os.path.join(VIDEO_STORAGE_DIR, filename)
-            
-            # Skip directories and hidden files
-            if os.path.isdir(file_path) or filename.startswith('.'):
-                continue
-            
-            file_stats = os.stat(file_path)
-            
-            videos.append({
+
+        after = None
+        if cursor:
+            try:
+                after = decode_list_cursor(cursor, sort, order)
+            except ValueError as e:
+                return jsonify({
+                    "success": False,
+                    "error": str(e)
+                }), 400
+
+        items, next_after = storage_index.page(
+            sort=sort,
+            descending=(order == 'desc'),
+            after=after,
+            limit=limit,
+            prefix=prefix,
+            content_type=content_type
+        )
+
+        videos = [
+            {
                 "filename": filename,
-                "size_bytes": file_stats.st_size,
-                "size_mb": round(file_stats.st_size / (1024 * 1024), 2),
-                "created": datetime.fromtimestamp(file_stats.st_ctime).isoformat(),
-                "modified": datetime.fromtimestamp(file_stats.st_mtime).isoformat()
-            })
-        
-        # Sort by creation time, newest first
-        videos.sort(key=lambda x: x['created'], reverse=True)
+                "size_bytes": entry['size'],
+                "size_mb": round(entry['size'] / (1024 * 1024), 2),
+                "content_type": entry['content_type'],
+                "created": datetime.fromtimestamp(entry['ctime']).isoformat(),
+                "modified": datetime.fromtimestamp(entry['mtime']).isoformat()
+            }
+            for _, filename, entry in items
+        ]
         
         return jsonify({
             "success": True,
             "videos": videos,
             "count": len(videos),
-            "total_size_mb": round(sum(v['size_mb'] for v in videos), 2)
+            **summary,
+            "sort": sort,
+            "order": order,
+            "next_cursor": encode_list_cursor(sort, order, next_after) if next_after else None
         }), 200
         
     except Exception as e:
@@ -1459,17 +4621,9 @@ def list_videos():
 
 @app.route('/api/videos/storage-stats', methods=['GET'])
 def get_storage_stats():
-    """Get storage statistics for locally stored videos"""
+    """Get storage statistics for locally stored videos (O(1) from the storage index)"""
     try:
-        total_size = 0
-        video_count = 0
-        
-        if os.path.exists(VIDEO_STORAGE_DIR):
-            for filename in os.listdir(VIDEO_STORAGE_DIR):
-                file_path = os.path.join(VIDEO_STORAGE_DIR, filename)
-                if os.path.isfile(file_path) and not filename.startswith('.'):
-                    total_size += os.path.getsize(file_path)
-                    video_count += 1
+        video_count, total_size = storage_index.totals()
         
         return jsonify({
             "success": True,
@@ -1477,7 +4631,8 @@ def get_storage_stats():
             "total_size_bytes": total_size,
             "total_size_mb": round(total_size / (1024 * 1024), 2),
             "total_size_gb": round(total_size / (1024 * 1024 * 1024), 2),
-            "storage_path": VIDEO_STORAGE_DIR
+            "storage_path": VIDEO_STORAGE_DIR,
+            "last_reconciled": storage_index.stats()['last_reconciled']
         }), 200
         
     except Exception as e:
@@ -1498,13 +4653,16 @@ def async_youtube_download(youtube_url, content_type, download_id):
         with downloads_lock:
             video_downloads_in_progress[download_id]['status'] = 'downloading'
         
-        # Download the video
-        success, local_path, video_info, error = download_youtube_video(youtube_url, content_type)
+        # Download the video (queued jobs wait for disk space held by in-flight ones)
+        success, local_path, video_info, error = download_youtube_video(
+            youtube_url, content_type, space_wait_seconds=DOWNLOAD_SPACE_WAIT_SECONDS
+        )
         
         if not success:
             with downloads_lock:
                 video_downloads_in_progress[download_id]['status'] = 'failed'
                 video_downloads_in_progress[download_id]['error'] = error
+                video_downloads_in_progress[download_id]['finished_ts'] = time.time()
             logger.error(f"Download {download_id} failed: {error}")
             return
         
@@ -1521,6 +4679,7 @@ def async_youtube_download(youtube_url, content_type, download_id):
             video_downloads_in_progress[download_id]['file_size_mb'] = round(file_size_mb, 2)
             video_downloads_in_progress[download_id]['video_info'] = video_info
             video_downloads_in_progress[download_id]['completed_at'] = datetime.utcnow().isoformat()
+            video_downloads_in_progress[download_id]['finished_ts'] = time.time()
         
         logger.info(f"Async download {download_id} completed successfully")
         
@@ -1531,6 +4690,37 @@ def async_youtube_download(youtube_url, content_type, download_id):
         with downloads_lock:
             video_downloads_in_progress[download_id]['status'] = 'failed'
             video_downloads_in_progress[download_id]['error'] = str(e)
+            video_downloads_in_progress[download_id]['finished_ts'] = time.time()
+
+def count_active_downloads():
+    """Count queued/downloading records. Caller must hold downloads_lock."""
+    return sum(
+        1 for data in video_downloads_in_progress.values()
+        if data.get('status') in ACTIVE_DOWNLOAD_STATUSES
+    )
+
+def sweep_finished_downloads(now=None):
+    """
+    Expire completed/failed download records older than DOWNLOAD_RECORD_RETENTION_SECONDS.
+    Returns the number of records removed.
+    """
+    cutoff = (now if now is not None else time.time()) - DOWNLOAD_RECORD_RETENTION_SECONDS
+
+    with downloads_lock:
+        expired_ids = [
+            did for did, data in video_downloads_in_progress.items()
+            if data.get('status') in FINISHED_DOWNLOAD_STATUSES
+            and data.get('finished_ts', 0) <= cutoff
+        ]
+        for did in expired_ids:
+            del video_downloads_in_progress[did]
+
+    if expired_ids:
+        logger.info(f"Expired {len(expired_ids)} finished download records")
+
+    return len(expired_ids)
+
+register_background_task('download-record-sweeper', sweep_finished_downloads, DOWNLOAD_SWEEP_INTERVAL_SECONDS)
 
 @app.route('/api/download-youtube', methods=['POST'])
 def download_youtube():
@@ -1567,13 +4757,14 @@ def download_youtube():
             # Generate unique download ID
             download_id = hashlib.md5(f"{youtube_url}{time.time()}".encode()).hexdigest()
             
-            # Check if queue is full
+            # Check if queue is full (only queued/downloading jobs take a slot)
             with downloads_lock:
-                if len(video_downloads_in_progress) >= 50:
+                active_downloads = count_active_downloads()
+                if active_downloads >= MAX_ACTIVE_DOWNLOADS:
                     return jsonify({
                         "success": False,
                         "error": "Download queue is full. Please try again later.",
-                        "queue_size": len(video_downloads_in_progress)
+                        "queue_size": active_downloads
                     }), 503
                 
                 # Initialize download status
@@ -1606,6 +4797,12 @@ def download_youtube():
         # Synchronous mode - wait for completion (original behavior)
         success, local_path, video_info, error = download_youtube_video(youtube_url, content_type)
         
+        if error == INSUFFICIENT_DISK_SPACE_ERROR:
+            return jsonify({
+                "success": False,
+                "error": error
+            }), 507
+
         if not success:
             return jsonify({
                 "success": False,
@@ -1669,7 +4866,8 @@ def get_download_status(download_id):
 @app.route('/api/download-youtube/cleanup', methods=['POST'])
 def cleanup_completed_downloads():
     """
-    Clean up completed download records from memory
+    Clean up completed download records from memory immediately.
+    Finished records also expire on their own after DOWNLOAD_RECORD_RETENTION_SECONDS.
     """
     try:
         cleaned = 0
@@ -1720,15 +4918,13 @@ def add_row(current_user):
             logger.info("Using Apps Script webhook to add row")
             try:
                 # Send data to Apps Script webhook
-                response = requests.post(apps_script_url, json=data, timeout=10)
+                response = http_client.post(apps_script_url, json=data)
 
                 if response.status_code == 200:
                     result = response.json()
 
                     # Clear cache after adding row
-                    cache_key = f'sheet_data_{SHEET_ID}'
-                    sheets_cache.delete(cache_key)
-                    filters_cache.clear()
+                    invalidate_sheet_cache('add')
                     logger.info(f"Added new row via Apps Script and cleared cache")
 
                     return jsonify(result), 200
@@ -1801,9 +4997,7 @@ def add_row(current_user):
             logger.info(f"Added re-edit entry to re-edit sheet (gid={REEDIT_GID})")
 
             # Clear cache
-            cache_key = f'sheet_data_{SHEET_ID}'
-            sheets_cache.delete(cache_key)
-            filters_cache.clear()
+            invalidate_sheet_cache('add', dataset='reedit')
 
             return jsonify({
                 "success": True,
@@ -1834,9 +5028,7 @@ def add_row(current_user):
         worksheet.append_row(row_data)
 
         # Clear sheets cache after adding new row
-        cache_key = f'sheet_data_{SHEET_ID}'
-        sheets_cache.delete(cache_key)
-        filters_cache.clear()  # Clear filters cache as well
+        invalidate_sheet_cache('add')
         logger.info(f"Added Final entry to main sheet (gid=0) via direct API and cleared cache")
 
         return jsonify({
@@ -1889,9 +5081,7 @@ def update_row(row_id):
             worksheet.update_cell(actual_row, col_idx, value)
         
         # Clear sheets cache after updating row
-        cache_key = f'sheet_data_{SHEET_ID}'
-        sheets_cache.delete(cache_key)
-        filters_cache.clear()  # Clear filters cache as well
+        invalidate_sheet_cache('update', row=row_id, reconcile=True)
         logger.info(f"Updated row {row_id} and cleared sheet cache")
 
         return jsonify({
@@ -1925,9 +5115,7 @@ def delete_row(row_id):
         worksheet.delete_rows(actual_row)
         
         # Clear sheets cache after deleting row
-        cache_key = f'sheet_data_{SHEET_ID}'
-        sheets_cache.delete(cache_key)
-        filters_cache.clear()  # Clear filters cache as well
+        invalidate_sheet_cache('delete', row=row_id, reconcile=True)
         logger.info(f"Deleted row {row_id} and cleared sheet cache")
 
         return jsonify({
@@ -1944,580 +5132,92 @@ def delete_row(row_id):
             "error": str(e)
         }), 500
 
+# ==================== STATIC CATALOGS ====================
+
+CATALOG_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'catalogs.json')
+CATALOG_CACHE_MAX_AGE_SECONDS = int(os.getenv('CATALOG_CACHE_MAX_AGE_SECONDS', 86400))
+
+class PrecompiledResponse:
+    """
+    A JSON response that never changes while the process runs.
+    - Serialized once, with the same bytes jsonify would produce, plus a gzip copy
+    - Strong ETag from the data file version and a body digest; the gzip copy gets its own tag
+    - If-None-Match answers 304, so a client revalidating after max-age gets no body
+    - Serving is a header lookup and a write; nothing is built per request
+    """
+    def __init__(self, name, payload, version):
+        self.name = name
+        self.body = (app.json.dumps(payload, separators=(',', ':')) + '\n').encode('utf-8')
+        self.gzip_body = gzip.compress(self.body, compresslevel=9, mtime=0)
+        digest = hashlib.sha256(self.body).hexdigest()[:16]
+        self.etag = f"{name}-v{version}-{digest}"
+        self.gzip_etag = f"{self.etag}-gz"
+        self.cache_control = f'private, max-age={CATALOG_CACHE_MAX_AGE_SECONDS}'
+        self.lock = threading.Lock()
+        self.served = 0
+        self.served_gzip = 0
+        self.not_modified = 0
+
+    def respond(self):
+        use_gzip = request.accept_encodings['gzip'] > 0
+        headers = {
+            'ETag': f'"{self.gzip_etag if use_gzip else self.etag}"',
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+
+        # Either representation's tag proves the client already has this version
+        if_none_match = request.if_none_match
+        if if_none_match and (if_none_match.contains(self.etag) or if_none_match.contains(self.gzip_etag) or if_none_match.star_tag):
+            with self.lock:
+                self.not_modified += 1
+            return Response(status=304, headers=headers)
+
+        with self.lock:
+            self.served += 1
+            if use_gzip:
+                self.served_gzip += 1
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
+            return Response(self.gzip_body, status=200, headers=headers, mimetype='application/json')
+        return Response(self.body, status=200, headers=headers, mimetype='application/json')
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "etag": self.etag,
+                "bytes": len(self.body),
+                "gzip_bytes": len(self.gzip_body),
+                "served": self.served,
+                "served_gzip": self.served_gzip,
+                "not_modified": self.not_modified
+            }
+
+def load_catalog_responses(path=CATALOG_DATA_PATH):
+    """Read the catalog data file and precompile one response per catalog"""
+    with open(path, 'r', encoding='utf-8') as f:
+        catalogs = json.load(f)
+    version = catalogs['version']
+    return {
+        'categories': PrecompiledResponse('categories', {"success": True, "categories": catalogs['categories']}, version),
+        'exams': PrecompiledResponse('exams', {"success": True, "exams": catalogs['exams']}, version)
+    }
+
+catalog_responses = load_catalog_responses()
+
+# ==================== END STATIC CATALOGS ====================
+
 @app.route('/api/categories', methods=['GET'])
 @token_required
 def get_categories(current_user):
-    """Get predefined categories and subcategories - PROTECTED"""
-    try:
-        categories = {
-            "Exam Pattern": [
-                "Bank",
-                "SSC",
-                "Teaching",
-                "State Exams",
-                "UPSC",
-                "Railway",
-                "Other"
-            ],
-            "Syllabus Overview": [
-                "Bank",
-                "SSC",
-                "Teaching",
-                "State Exams",
-                "UPSC",
-                "Railway",
-                "Other"
-            ],
-            "Preparation Strategy": [
-                "Bank",
-                "SSC",
-                "Teaching",
-                "State Exams",
-                "UPSC",
-                "Railway",
-                "Other"
-            ],
-            "Study Plan": [
-                "30 Days Plan",
-                "60 Days Plan",
-                "90 Days Plan",
-                "6 Months Plan",
-                "1 Year Plan",
-                "Subject-wise Plan",
-                "Other"
-            ],
-            "Conceptual Insights": [
-                "Bank",
-                "SSC",
-                "Teaching",
-                "State Exams",
-                "Other"
-            ],
-            "Tips & Tricks / Shortcuts": [
-                "Bank",
-                "SSC",
-                "Teaching",
-                "State Exams",
-                "Other"
-            ],
-            "PYQs / Practice Questions": [
-                "Bank",
-                "SSC",
-                "Teaching",
-                "State Exams",
-                "Other"
-            ],
-            "Science / GK Facts": [
-                "General Science",
-                "Current Affairs",
-                "Static GK",
-                "History",
-                "Geography",
-                "Other"
-            ],
-            "Motivational Shorts": [
-                "Success Stories",
-                "Daily Motivation",
-                "Study Tips",
-                "Time Management",
-                "Stress Management",
-                "Other"
-            ],
-            "Classroom Moments": [
-                "Teacher Highlights",
-                "Student Interactions",
-                "Funny Moments",
-                "Teaching Methods",
-                "Other"
-            ],
-            "Exam Life Situations": [
-                "Exam Day Stories",
-                "Preparation Journey",
-                "Result Day",
-                "Student Life",
-                "Relatable Content",
-                "Other"
-            ]
-        }
-
-        return jsonify({
-            "success": True,
-            "categories": categories
-        })
-    except Exception as e:
-        error_msg = str(e)
-        try:
-            logger.error(f"Error in get_categories: {error_msg}")
-        except:
-            print(f"Error in get_categories: {error_msg}")
-        return jsonify({
-            "success": False,
-            "error": error_msg
-        }), 500
+    """Get predefined categories and subcategories (data/catalogs.json) - PROTECTED"""
+    return catalog_responses['categories'].respond()
 
 @app.route('/api/exams', methods=['GET'])
 @token_required
 def get_exams(current_user):
-    """Get exam details with subjects - PROTECTED"""
-    try:
-        exams = {
-            "Bank Pre": {
-                "exams": [
-                    "SBI Clerk",
-                    "SBI PO",
-                    "IBPS CLERK",
-                    "IBPS PO",
-                    "LIC AAO",
-                    "RRB PO",
-                    "RRB Clerk"
-                ],
-                "subjects": [
-                    "Reasoning",
-                    "Quants",
-                    "English",
-                    "General Awareness",
-                    "Current Affairs",
-                    "Hindi",
-                    "Computer",
-                    "Other"
-                ]
-            },
-            "Bank Post": {
-                "exams": [
-                    "JAIIB",
-                    "CAIIB",
-                    "IIBF CERTIFICATION COURSE",
-                    "BANK PROMOTION EXAMS"
-                ],
-                "subjects": [
-                    "AFM",
-                    "RBWM",
-                    "IEIFS",
-                    "PPB",
-                    "ABM",
-                    "ABFM",
-                    "BFM",
-                    "BRBL",
-                    "CAIIB Elective Subjects",
-                    "CCP + AML",
-                    "Foreign Exchange",
-                    "Prevention of Cyber Crime",
-                    "KYC + IBC + MSME",
-                    "General Banking",
-                    "Computer Knowledge",
-                    "Banking Law",
-                    "Other"
-                ]
-            },
-            "SSC": {
-                "exams": [
-                    "GD",
-                    "MTS",
-                    "CHSL",
-                    "CGL",
-                    "Delhi Police",
-                    "CPO",
-                    "Steno",
-                    "Selection Post"
-                ],
-                "subjects": [
-                    "Other",
-                    "Current Affairs",
-                    "English",
-                    "GK/GS",
-                    "Maths",
-                    "Reasoning",
-                    "Science",
-                    "Shorthand"
-                ]
-            },
-            "Railway": {
-                "exams": [
-                    "RRB NTPC",
-                    "ALP",
-                    "Group D",
-                    "RPF"
-                ],
-                "subjects": [
-                    "Other",
-                    "Current Affairs",
-                    "GK/GS",
-                    "Maths",
-                    "Reasoning",
-                    "Science"
-                ]
-            },
-            "Police": {
-                "exams": [
-                    "UP Police",
-                    "UP Homeguard",
-                    "UP SI"
-                ],
-                "subjects": [
-                    "Other",
-                    "Current Affairs",
-                    "English",
-                    "GK/GS",
-                    "Maths",
-                    "Reasoning",
-                    "Science",
-                    "Hindi"
-                ]
-            },
-            "teaching": {
-                "exams": [
-                    "CTET",
-                    "LT Grade",
-                    "Bihar STET",
-                    "EMRS",
-                    "UP GIC",
-                    "NVS",
-                    "KVS",
-                    "HTET",
-                    "BPSC TRE 4.0",
-                    "UP TET",
-                    "REET",
-                    "DSSSB",
-                    "TGT",
-                    "PGT",
-                    "PRT",
-                    "TET Exams",
-                    "AWES",
-                    "SET Exams",
-                    "Super TET",
-                    "RPSC Teaching Exam",
-                    "Sainik School Exams",
-                    "West Bengal SSC Teacher Recruitment"
-                ],
-                "subjects": [
-                    "Other",
-                    "English",
-                    "Hindi",
-                    "Maths",
-                    "Sanskrit",
-                    "CDP",
-                    "EVS",
-                    "General Studies",
-                    "Commerce",
-                    "Urdu",
-                    "Social Studies",
-                    "Science",
-                    "Home Science",
-                    "Music",
-                    "Arts",
-                    "Social Science",
-                    "Physical Education",
-                    "Fine Arts",
-                    "Physics",
-                    "Chemistry",
-                    "Biology",
-                    "Zoology",
-                    "History",
-                    "Geography",
-                    "Political Science",
-                    "Sociology",
-                    "Economics",
-                    "Philosophy",
-                    "Psychology",
-                    "Botany",
-                    "Computer Science",
-                    "GA",
-                    "Teaching Aptitude",
-                    "Reasoning",
-                    "Polity",
-                    "Mathematics",
-                    "Current Affairs",
-                    "General Science"
-                ]
-            },
-            "ugc": {
-                "exams": [
-                    "Paper 1",
-                    "Paper 2",
-                    "SET / SLET",
-                    "CSIR NET"
-                ],
-                "subjects": [
-                    "Other",
-                    "General Paper",
-                    "Political Science",
-                    "Philosophy",
-                    "Psychology",
-                    "Sociology",
-                    "History",
-                    "Commerce",
-                    "Education",
-                    "Home Science",
-                    "Physical Education",
-                    "Law",
-                    "Music",
-                    "Sanskrit",
-                    "Geography",
-                    "Ayurveda",
-                    "Biology",
-                    "Hindi",
-                    "Environmental Sciences",
-                    "Computer Science and Applications",
-                    "Library and Information Science",
-                    "Urdu",
-                    "English",
-                    "Chemical Sciences",
-                    "Earth Sciences",
-                    "Life Sciences",
-                    "Mathematical Sciences",
-                    "Physical Sciences",
-                    "General Aptitude"
-                ]
-            },
-            "bihar": {
-                "exams": [
-                    "BPSC AEDO",
-                    "BSSC CGL-4",
-                    "Bihar Jeevika",
-                    "Bihar SI Daroga",
-                    "BSSC STENO",
-                    "BSSC Inter level",
-                    "BSSC Karyalay parichari",
-                    "Bihar Police driver"
-                ],
-                "subjects": [
-                    "Hindi",
-                    "Maths",
-                    "GK/GS",
-                    "Reasoning",
-                    "English",
-                    "Science",
-                    "Current Affairs",
-                    "Subject Knowledge",
-                    "Computer",
-                    "Static GK",
-                    "Other"
-                ]
-            },
-            "Punjab": {
-                "exams": [
-                    "PSSSB", 
-                    "Punjab police constable", 
-                    "High court", 
-                    "ETT/NTT", 
-                    "PSTET", 
-                    "Master Cadre", 
-                    "Punjab PCS", 
-                    "SSC", 
-                    "Railways"
-                ],
-                "subjects": [
-                    "Static & Current Affairs",
-                    "General Knowledge",
-                    "Basic Computer Knowledge",
-                    "Logical Reasoning",
-                    "Quantitative Aptitude",
-                    "Numerical Aptitude",
-                    "General English",
-                    "Punjabi Language",
-                    "Punjab GK",
-                    "General Awareness",
-                    "Arithmetic",
-                    "Teaching Aptitude",
-                    "Pedagogy",
-                    "Information & Communication Technology (ICT)",
-                    "Hindi Language",
-                    "English Language",
-                    "Mathematics",
-                    "General Science",
-                    "Social Science",
-                    "Environmental Studies",
-                    "Science",
-                    "General Studies",
-                    "Civil Services Aptitude Test (CSAT)",
-                    "Reasoning",
-                    "Other"
-                ]
-            },
-            "bengal": {
-                "exams": [
-                    "WBSSC GROUP C & D",
-                    "SSC MTS",
-                    "RRB NTPC",
-                    "WBP",
-                    "Banking",
-                    "WBCS"
-                ],
-                "subjects": [
-                    "Current Affairs",
-                    "History",
-                    "Polity",
-                    "Mathematics",
-                    "Gk",
-                    "Gs",
-                    "English",
-                    "General Studies",
-                    "Static Gk",
-                    "Reasoning",
-                    "Banking Awareness",
-                    "Geography",
-                    "Other"
-                ]
-            },
-            "Odia": {
-                "exams": [
-                    "Bed Entrance Exam",
-                    "LTR MAINS ARTS OSSC CGL",
-                    "OSSC PEO",
-                    "SSD Sevak Sevika",
-                    "Police Constable",
-                    "RI AMIN MAINS",
-                    "RRB NTPC",
-                    "RRB Group D",
-                    "RRb PO",
-                    "IBPS Clerk",
-                    "OPSC"
-                ],
-                "subjects": [
-                    "Current Affairs",
-                    "Reasoning",
-                    "English",
-                    "GK/GS",
-                    "Geography",
-                    "History",
-                    "Polity",
-                    "Pedagogy",
-                    "Computer",
-                    "Physics",
-                    "Chemistry",
-                    "Mathematics",
-                    "Economics",
-                    "Other"
-                ]
-            },
-            "Tamil": {
-                "exams": [
-                    "TNPSC",
-                    "TET",
-                    "NTPC",
-                    "TNUSRB Si",
-                    "PC. IB",
-                    "RPF",
-                    "RRB JE",
-                    "RRB GR D"
-                ],
-                "subjects": [
-                    "Current Affairs",
-                    "English",
-                    "Maths",
-                    "Geography",
-                    "Science",
-                    "Psychology",
-                    "GK",
-                    "Reasoning",
-                    "Biology",
-                    "Polity",
-                    "History",
-                    "GS",
-                    "Other"
-                ]
-            },
-            "Telugu": {
-                "exams": [
-                    "NTPC",
-                    "Group-D",
-                    "RRB Junior Engineer(CBT-1 Only)",
-                    "MTS",
-                    "CHSL",
-                    "GD",
-                    "CGL",
-                    "Bank PO",
-                    "Bank Clerk",
-                    "APPSC & TGPSC"
-                ],
-                "subjects": [
-                    "Mathematics",
-                    "Reasoning",
-                    "Polity",
-                    "Economy",
-                    "History",
-                    "Geography",
-                    "Current Affairs",
-                    "Computer",
-                    "Arithmetic",
-                    "English",
-                    "Banking/Financial Awareness",
-                    "Credit Co-Operative",
-                    "Science & Tech",
-                    "Telangana Movement (for Telangana Exams only)",
-                    "General Science (Physics + Chemistry + Biology)",
-                    "Teaching Aptitude",
-                    "Pedagogy",
-                    "ICT",
-                    "POCSO",
-                    "Administrative Aptitude",
-                    "Other"
-                ]
-            },
-            "Agriculture": {
-                "exams": [
-                    "IBPS SO AFO",
-                    "NABARD GRADE A",
-                    "FCI AG III Technical",
-                    "Haryana ADO/HDO",
-                    "Punjab ADO/HDO",
-                    "APSC ADO",
-                    "FSSAI CFSO/TO",
-                    "MP FSO",
-                    "CUET PG Agriculture",
-                    "UPCATET PG",
-                    "NSC Trainee",
-                    "IFFCO AGT",
-                    "KRIBHCO FRT",
-                    "Bihar Agriculture Coordinator",
-                    "BPSC BAO/SDAO",
-                    "BHO/SHDO",
-                    "Bihar Jeevika Bharti",
-                    "UPSSSC AGTA",
-                    "Cane Supervisor",
-                    "MP ESB",
-                    "RPSC Agriculture Supervisor",
-                    "DDA SO Horticulture",
-                    "DSSSB SO Horticulture",
-                    "NHB SHO",
-                    "CCI JCE",
-                    "CWC JTA",
-                    "BSSC Field Assistant"
-                ],
-                "subjects": [
-                    "Agronomy",
-                    "Genetics & Plant Breeding",
-                    "Entomology",
-                    "Soil Science",
-                    "Agri. Current Affairs",
-                    "Horticulture",
-                    "Allied Agriculture",
-                    "Animal Husbandry",
-                    "Plant Pathology",
-                    "Food Science & Technology",
-                    "Other"
-                ]
-            },
-            "Spoken English": {
-                "exams": ["All"],
-                "subjects": ["English"]
-            }
-        }
-
-        return jsonify({
-            "success": True,
-            "exams": exams
-        })
-    except Exception as e:
-        error_msg = str(e)
-        try:
-            logger.error(f"Error in get_exams: {error_msg}")
-        except:
-            print(f"Error in get_exams: {error_msg}")
-        return jsonify({
-            "success": False,
-            "error": error_msg
-        }), 500
+    """Get exam details with subjects (data/catalogs.json) - PROTECTED"""
+    return catalog_responses['exams'].respond()
 
 @app.route('/api/ticket', methods=['POST'])
 def raise_ticket():
@@ -2598,18 +5298,98 @@ def raise_ticket():
             'error': str(e)
         }), 500
 
+class CertCachingTransport:
+    """
+    google.auth transport wrapper that reuses one HTTP session for every call and
+    caches successful GET responses (Google's signing certs) for as long as their
+    Cache-Control max-age allows. Only one thread refreshes an expired entry.
+    """
+    def __init__(self, transport):
+        self.transport = transport
+        self.cache = {}  # url -> (response, expires_at)
+        self.lock = threading.Lock()
+        self.fetch_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def max_age(headers):
+        match = re.search(r'max-age=(\d+)', headers.get('cache-control', '') or '')
+        return int(match.group(1)) if match else 0
+
+    def _cached(self, url, now):
+        with self.lock:
+            item = self.cache.get(url)
+            if item is not None and item[1] > now:
+                self.hits += 1
+                return item[0]
+        return None
+
+    def __call__(self, url, method='GET', body=None, headers=None, timeout=None, **kwargs):
+        if timeout is not None:
+            kwargs['timeout'] = timeout
+        if method != 'GET' or body is not None:
+            return self.transport(url, method=method, body=body, headers=headers, **kwargs)
+
+        response = self._cached(url, time.time())
+        if response is not None:
+            return response
+
+        with self.fetch_lock:
+            # Another thread may have refreshed it while we waited
+            response = self._cached(url, time.time())
+            if response is not None:
+                return response
+
+            response = self.transport(url, method=method, headers=headers, **kwargs)
+            with self.lock:
+                self.misses += 1
+                max_age = self.max_age(response.headers)
+                if response.status == 200 and max_age > 0:
+                    self.cache[url] = (response, time.time() + max_age)
+            return response
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "cached_urls": len(self.cache),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+GOOGLE_TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get('GOOGLE_TOKEN_CACHE_MAX_ENTRIES', 1000))
+
+_google_request = None
+
+def google_request_transport(url, method='GET', body=None, headers=None, **kwargs):
+    """google.auth's requests transport, created on first use to keep google.auth out of cold starts"""
+    global _google_request
+    if _google_request is None:
+        _google_request = google_requests.Request()
+    return _google_request(url, method=method, body=body, headers=headers, **kwargs)
+
+# One session for all Google ID-token verifications; signing certs are cached per Cache-Control
+google_auth_transport = CertCachingTransport(google_request_transport) if GOOGLE_API_AVAILABLE else None
+# sha256(ID token) -> verified claims, served until the ID token's own exp
+google_token_cache = TokenCache(GOOGLE_TOKEN_CACHE_MAX_ENTRIES)
+
+def verify_google_id_token(token):
+    """Verify a Google ID token's signature and audience, reusing recent verifications"""
+    key = hashlib.sha256(token.encode('utf-8')).hexdigest()
+    idinfo = google_token_cache.get(key)
+    if idinfo is None:
+        idinfo = id_token.verify_oauth2_token(token, google_auth_transport, GOOGLE_CLIENT_ID)
+        google_token_cache.put(key, idinfo)
+    return idinfo
+
 def verify_google_token(token):
     """
     Verify Google OAuth token and check domain restrictions
     Returns (success, user_data, error_message)
     """
     try:
-        # Verify the token with Google
-        idinfo = id_token.verify_oauth2_token(
-            token, 
-            google_requests.Request(), 
-            GOOGLE_CLIENT_ID
-        )
+        # Verify the token with Google (certs and recent verifications are cached)
+        idinfo = verify_google_id_token(token)
         
         # Verify issuer
         if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
@@ -2768,15 +5548,18 @@ def signup():
             return jsonify({'success': False, 'message': 'Invalid email format'}), 400
 
         # Check if user already exists
-        users = get_credentials_data()
-        for user in users:
-            if user['username'].lower() == username.lower():
-                return jsonify({'success': False, 'message': 'Username already exists'}), 409
-            if user['email'].lower() == email.lower():
-                return jsonify({'success': False, 'message': 'Email already registered'}), 409
+        credentials = get_credentials_index()
+        if credentials.find_by_username(username):
+            return jsonify({'success': False, 'message': 'Username already exists'}), 409
+        if credentials.find_by_email(email):
+            return jsonify({'success': False, 'message': 'Email already registered'}), 409
 
         # Hash password
-        password_hash = hash_password(password)
+        try:
+            password_hash = hash_password(password)
+        except PasswordPoolSaturated as e:
+            logger.warning(f"Signup rejected for {username}: password hashing pool saturated")
+            return password_pool_busy(e)
 
         # Write to sheet
         result = write_to_credentials_sheet(username, email, password_hash)
@@ -2899,17 +5682,23 @@ def verify_token(current_user):
         'username': current_user
     }), 200
 
+@app.route('/api/auth/logout', methods=['POST'])
+@token_required
+def logout(current_user):
+    """Revoke the token used for this request"""
+    revoked = revoke_token(g.jwt_token, g.jwt_claims)
+    logger.info(f"Logout: {current_user} (token revoked: {revoked})")
+    return jsonify({
+        'success': True,
+        'message': 'Logged out',
+        'revoked': revoked
+    }), 200
+
 @app.route('/api/auth/me', methods=['GET'])
 @token_required
 def get_current_user(current_user):
     """Get current user info"""
-    users = get_credentials_data()
-
-    user = None
-    for u in users:
-        if u['username'] == current_user:
-            user = u
-            break
+    user = get_credentials_index().find_by_username(current_user)
 
     if not user:
         return jsonify({'success': False, 'message': 'User not found'}), 404
@@ -2961,9 +5750,8 @@ def health_check():
 def get_leaderboard(current_user):
     """Get leaderboard data grouped by vertical - PROTECTED - includes both Final entries and Re-edit (Drive Links) entries"""
     try:
-        # Fetch both final entries and re-edit entries
-        records = get_sheet_data()
-        reedit_records = get_reedit_data()
+        # Fetch both final entries and re-edit entries (one snapshot)
+        records, reedit_records = get_sheet_and_reedit_data()
 
         if records is None:
             return jsonify({
@@ -2971,147 +5759,7 @@ def get_leaderboard(current_user):
                 "error": "Failed to access sheet"
             }), 500
 
-        logger.info(f"Fetched {len(records)} final records and {len(reedit_records)} re-edit records")
-
-        # Group by vertical and calculate stats
-        vertical_stats = {}
-
-        # Process final entries
-        for record in records:
-            vertical = record.get('Vertical Name', '').strip()
-            if not vertical:
-                continue
-
-            if vertical not in vertical_stats:
-                vertical_stats[vertical] = {
-                    'name': vertical,
-                    'totalVideos': 0,
-                    'finalVideos': 0,
-                    'reEditVideos': 0,
-                    'exams': set(),
-                    'subjects': set(),
-                    'finalContributors': {},  # Separate tracking for final videos
-                    'reEditContributors': {}   # Separate tracking for re-edit videos
-                }
-
-            # Count total videos
-            vertical_stats[vertical]['totalVideos'] += 1
-
-            # Count by status
-            status = str(record.get('Edit', '')).strip().lower()
-            if status == 'final' or 'final' in status:
-                vertical_stats[vertical]['finalVideos'] += 1
-
-                # Track final contributors
-                email = record.get('Email', '').strip()
-                if email:
-                    if email not in vertical_stats[vertical]['finalContributors']:
-                        vertical_stats[vertical]['finalContributors'][email] = 0
-                    vertical_stats[vertical]['finalContributors'][email] += 1
-
-            elif status == 're-edit' or 'reedit' in status or 're-edit' in status:
-                vertical_stats[vertical]['reEditVideos'] += 1
-
-                # Track re-edit contributors from main sheet
-                email = record.get('Email', '').strip()
-                if email:
-                    if email not in vertical_stats[vertical]['reEditContributors']:
-                        vertical_stats[vertical]['reEditContributors'][email] = 0
-                    vertical_stats[vertical]['reEditContributors'][email] += 1
-
-            # Collect unique exams and subjects
-            exam = record.get('Exam Name', '').strip()
-            if exam:
-                vertical_stats[vertical]['exams'].add(exam)
-
-            subject = record.get('Subject', '').strip()
-            if subject:
-                vertical_stats[vertical]['subjects'].add(subject)
-
-        # Process re-edit entries from Drive Links sheet
-        for record in reedit_records:
-            vertical = record.get('Vertical Name', '').strip()
-            if not vertical:
-                continue
-
-            if vertical not in vertical_stats:
-                vertical_stats[vertical] = {
-                    'name': vertical,
-                    'totalVideos': 0,
-                    'finalVideos': 0,
-                    'reEditVideos': 0,
-                    'exams': set(),
-                    'subjects': set(),
-                    'finalContributors': {},
-                    'reEditContributors': {}
-                }
-
-            # Count re-edit videos (all entries in Drive Links sheet are re-edits)
-            vertical_stats[vertical]['totalVideos'] += 1
-            vertical_stats[vertical]['reEditVideos'] += 1
-
-            # Track re-edit contributors from Drive Links sheet
-            email = record.get('Email', '').strip()
-            if email:
-                if email not in vertical_stats[vertical]['reEditContributors']:
-                    vertical_stats[vertical]['reEditContributors'][email] = 0
-                vertical_stats[vertical]['reEditContributors'][email] += 1
-
-            # Collect unique exams and subjects
-            exam = record.get('Exam Name', '').strip()
-            if exam:
-                vertical_stats[vertical]['exams'].add(exam)
-
-            subject = record.get('Subject', '').strip()
-            if subject:
-                vertical_stats[vertical]['subjects'].add(subject)
-
-        # Format results
-        leaderboard = []
-        for vertical, stats in vertical_stats.items():
-            # Get top 5 final contributors with earnings (₹50 per video)
-            top_final_contributors = sorted(
-                [{'email': email, 'count': count, 'earnings': count * 50} for email, count in stats['finalContributors'].items()],
-                key=lambda x: x['count'],
-                reverse=True
-            )[:5]
-
-            # Get top 5 re-edit contributors with earnings (₹50 per video)
-            top_reedit_contributors = sorted(
-                [{'email': email, 'count': count, 'earnings': count * 50} for email, count in stats['reEditContributors'].items()],
-                key=lambda x: x['count'],
-                reverse=True
-            )[:5]
-
-            leaderboard.append({
-                'name': vertical,
-                'totalVideos': stats['totalVideos'],
-                'finalVideos': stats['finalVideos'],
-                'reEditVideos': stats['reEditVideos'],
-                'examsCount': len(stats['exams']),
-                'subjectsCount': len(stats['subjects']),
-                'exams': list(stats['exams']),
-                'subjects': list(stats['subjects']),
-                'topFinalContributors': top_final_contributors,
-                'topReEditContributors': top_reedit_contributors
-            })
-
-        # Sort by total videos (descending)
-        leaderboard.sort(key=lambda x: x['totalVideos'], reverse=True)
-
-        # Calculate summary
-        summary = {
-            'totalVerticals': len(leaderboard),
-            'totalVideos': sum(v['totalVideos'] for v in leaderboard),
-            'totalFinalVideos': sum(v['finalVideos'] for v in leaderboard),
-            'totalReEditVideos': sum(v['reEditVideos'] for v in leaderboard)
-        }
-
-        return jsonify({
-            "success": True,
-            "leaderboard": leaderboard,
-            "summary": summary
-        })
+        return jsonify(build_leaderboard_payload(records, reedit_records))
 
     except Exception as e:
         logger.error(f"Error fetching leaderboard: {e}")
@@ -0,0 +1,275 @@
+"""
+ASGI entry point for the Adda Education Dashboard API
+
+The read-heavy endpoints are served by native asyncio handlers:
+    GET /api/data, /api/filters, /api/leaderboard   (JWT protected)
+    GET /health, /health/detailed, /metrics
+Cached data and cached tokens are answered straight from the event loop, and a cache
+miss fetches the gviz exports with httpx.AsyncClient, so idle and waiting dashboard
+connections don't each hold an OS thread. Blocking work (JWT decodes, the shared
+revocation file, storage-index reads for /metrics and /health/detailed) runs in a thread. Every other route (writes, auth, videos, CORS preflights, /api/events) is
+handed to the Flask app through asgiref's WsgiToAsgi and runs in its thread pool.
+
+Parsing, caching, auth and the response bodies all come from app.py, so both entry
+points return the same bytes for the same data.
+
+Usage:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000 --workers 4
+"""
+
+import asyncio
+from datetime import datetime
+
+import httpx
+from asgiref.wsgi import WsgiToAsgi
+
+import app as api
+
+logger = api.logger
+
+flask_application = WsgiToAsgi(api.app)
+
+class AsyncSheetReader:
+    """
+    Async counterpart of get_sheet_and_reedit_data() for one event loop.
+    - Cache hits never leave the loop
+    - Misses are single-flight: one coroutine refreshes while the others wait on the lock
+    - The batchGet loader (service account) is synchronous, so it runs in a thread; that
+      is one thread per refresh, not one per request
+    - Without a service account, the missing gviz exports are fetched concurrently
+    """
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.client = None
+        self.refresh_lock = None
+        self.refreshes = 0
+        self.gviz_fetches = 0
+        self.gviz_errors = 0
+
+    def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=True)
+            self.refresh_lock = asyncio.Lock()
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def cached(self):
+        entries = api.sheets_cache.get_many([api.SHEET_DATA_CACHE_KEY, api.REEDIT_DATA_CACHE_KEY])
+        if entries is None:
+            return None
+        return entries[api.SHEET_DATA_CACHE_KEY], entries[api.REEDIT_DATA_CACHE_KEY]
+
+    async def gviz_records(self, gid, label):
+        """Records from one gviz export, or None if it failed"""
+        self.gviz_fetches += 1
+        try:
+            response = await self.client.get(api.gviz_url(gid))
+            if response.status_code == 200:
+                records = api.parse_gviz_records(response.text, label)
+            else:
+                print(f"Error fetching {label} data: {response.status_code} - {response.text}")
+                records = None
+        except Exception as e:
+            logger.error(f"Error accessing {label} sheet: {e}")
+            records = None
+        if records is None:
+            self.gviz_errors += 1
+        return records
+
+    async def sheet_and_reedit_data(self):
+        """Return (main records, re-edit records); main is None if the sheet can't be read"""
+        cached = self.cached()
+        if cached is not None:
+            return cached
+
+        self.start()
+        async with self.refresh_lock:
+            # Another coroutine may have refreshed while this one waited
+            cached = self.cached()
+            if cached is not None:
+                return cached
+            self.refreshes += 1
+
+            # One batchGet refreshes every tab; gviz below is the fallback without a service account
+            if await asyncio.to_thread(api.sheet_snapshot_loader.load):
+                cached = self.cached()
+                if cached is not None:
+                    return cached
+
+            records = api.sheets_cache.get(api.SHEET_DATA_CACHE_KEY)
+            reedit_records = api.sheets_cache.get(api.REEDIT_DATA_CACHE_KEY)
+            fetches = {}
+            if records is None:
+                fetches['main'] = self.gviz_records(0, 'sheet')
+            if reedit_records is None:
+                fetches['reedit'] = self.gviz_records(api.REEDIT_GID, 'Re-edit')
+            results = dict(zip(fetches, await asyncio.gather(*fetches.values())))
+
+            if results.get('main') is not None:
+                records = results['main']
+                api.sheets_cache.set(api.SHEET_DATA_CACHE_KEY, records)
+                api.dataset_events.observe('main', records)
+            if results.get('reedit') is not None:
+                reedit_records = results['reedit']
+                api.sheets_cache.set(api.REEDIT_DATA_CACHE_KEY, reedit_records)
+                api.dataset_events.observe('reedit', reedit_records)
+            return records, reedit_records if reedit_records is not None else []
+
+    def get_stats(self):
+        return {
+            "refreshes": self.refreshes,
+            "gviz_fetches": self.gviz_fetches,
+            "gviz_errors": self.gviz_errors
+        }
+
+connect_timeout, read_timeout = api.HTTP_HOST_TIMEOUTS['docs.google.com']
+sheet_reader = AsyncSheetReader(httpx.Timeout(read_timeout, connect=connect_timeout))
+
+# ==================== NATIVE HANDLERS ====================
+# Each returns (status code, JSON-serializable body)
+
+def authenticated_in_memory(authorization):
+    """True when authenticate_request needs neither a JWT decode nor a revocation-file read"""
+    if authorization is None:
+        return True
+    try:
+        token = authorization.split(' ')[1]
+    except IndexError:
+        return True
+    return api.token_cache.peek(token) and not api.token_revocations.check_due()
+
+def protected(handler):
+    """
+    Async version of token_required: the handler gets the username, the response gets
+    Server-Timing. Cached tokens are checked on the loop; a cache miss or a due re-read
+    of the shared revocation file runs in a thread.
+    """
+    async def run(scope, headers):
+        authorization = headers.get('authorization')
+        if authenticated_in_memory(authorization):
+            token, claims, error, auth_ms = api.authenticate_request(authorization)
+        else:
+            token, claims, error, auth_ms = await asyncio.to_thread(api.authenticate_request, authorization)
+        if auth_ms is not None:
+            scope['server_timing'] = f'auth;dur={auth_ms:.3f}'
+        if claims is None:
+            return 401, {'success': False, 'message': error}
+        return await handler(claims['username'])
+    return run
+
+@protected
+async def get_data(current_user):
+    try:
+        records, reedit_records = await sheet_reader.sheet_and_reedit_data()
+        if records is None:
+            return 500, {"error": "Failed to access sheet"}
+        return 200, api.build_data_payload(records, reedit_records)
+    except Exception as e:
+        logger.error(f"Error in get_data: {e}")
+        return 500, {"success": False, "error": str(e)}
+
+@protected
+async def get_filters(current_user):
+    try:
+        records, _ = await sheet_reader.sheet_and_reedit_data()
+        if records is None:
+            return 500, {"error": "Failed to access sheet"}
+        return 200, api.build_filters_payload(records)
+    except Exception as e:
+        return 500, {"success": False, "error": str(e)}
+
+@protected
+async def get_leaderboard(current_user):
+    try:
+        records, reedit_records = await sheet_reader.sheet_and_reedit_data()
+        if records is None:
+            return 500, {"success": False, "error": "Failed to access sheet"}
+        return 200, api.build_leaderboard_payload(records, reedit_records)
+    except Exception as e:
+        logger.error(f"Error fetching leaderboard: {e}")
+        return 500, {"success": False, "error": str(e)}
+
+async def health(scope, headers):
+    return 200, {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
+
+async def detailed_health(scope, headers):
+    # Check Google Sheets connectivity
+    try:
+        records, _ = await sheet_reader.sheet_and_reedit_data()
+        google_sheets = "healthy" if records is not None else "degraded"
+    except Exception as e:
+        google_sheets = "unhealthy"
+        logger.error(f"Health check - Google Sheets failed: {e}")
+    # Storage stats read the shared index from disk, which must not stall the loop
+    health_status, status_code = await asyncio.to_thread(api.build_detailed_health, google_sheets)
+    return status_code, health_status
+
+async def metrics(scope, headers):
+    payload = await asyncio.to_thread(api.build_metrics_payload)
+    payload["asgi"] = sheet_reader.get_stats()
+    return 200, payload
+
+NATIVE_ROUTES = {
+    '/api/data': get_data,
+    '/api/filters': get_filters,
+    '/api/leaderboard': get_leaderboard,
+    '/health': health,
+    '/health/detailed': detailed_health,
+    '/metrics': metrics,
+}
+
+# ==================== ASGI APPLICATION ====================
+
+def encode_json(payload):
+    """Same bytes as Flask's jsonify (compact, sorted keys, trailing newline)"""
+    return (api.app.json.dumps(payload, separators=(',', ':')) + '\n').encode('utf-8')
+
+async def serve_native(handler, scope, send):
+    headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+    api.count_request()
+    try:
+        status, payload = await handler(scope, headers)
+    except Exception as e:
+        logger.error(f"Unhandled error in {scope['path']}: {e}")
+        status, payload = 500, {"success": False, "error": "Internal server error"}
+    api.count_response(status)
+
+    body = encode_json(payload)
+    response_headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode('latin-1'))
+    ]
+    for name, value in api.cors_headers(headers.get('origin')).items():
+        response_headers.append((name.lower().encode('latin-1'), value.encode('latin-1')))
+    if 'server_timing' in scope:
+        response_headers.append((b'server-timing', scope['server_timing'].encode('latin-1')))
+
+    await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            sheet_reader.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await sheet_reader.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    if scope['type'] == 'http' and scope['method'] == 'GET':
+        handler = NATIVE_ROUTES.get(scope['path'])
+        if handler is not None:
+            await serve_native(handler, dict(scope), send)
+            return
+
+    await flask_application(scope, receive, send)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Authentication throughput benchmark
+
+Measures password hashing throughput under concurrency, in process and through
+signup (the only endpoint that hashes; login is domain-based and never calls bcrypt).
+
+Usage:
+    python benchmark_auth.py pool [concurrency] [requests]    # in-process bcrypt pool
+    python benchmark_auth.py signup [concurrency] [requests]  # HTTP, creates bench_* users!
+
+Environment:
+    BASE_URL       - server to benchmark (default http://localhost:5000)
+    BCRYPT_ROUNDS  - cost factor used by the in-process pool benchmark
+"""
+
+import os
+import sys
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = os.environ.get('BASE_URL', 'http://localhost:5000')
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run_concurrently(operation, concurrency, total):
+    """Run operation() total times on concurrency threads; returns (elapsed, latencies_ms, outcomes)"""
+    latencies = []
+    outcomes = {}
+    lock = threading.Lock()
+
+    def one(_):
+        started = time.perf_counter()
+        try:
+            outcome = operation()
+        except Exception as e:
+            outcome = type(e).__name__
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed_ms)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(total)))
+    return time.perf_counter() - started, latencies, outcomes
+
+def print_report(name, concurrency, elapsed, latencies, outcomes):
+    print(f"\n📊 {name} - concurrency {concurrency}, {len(latencies)} operations")
+    print("=" * 60)
+    print(f"Throughput: {len(latencies) / elapsed:.1f} ops/s ({elapsed:.2f}s total)")
+    print(f"Latency p50: {percentile(latencies, 0.50):.1f} ms")
+    print(f"Latency p95: {percentile(latencies, 0.95):.1f} ms")
+    print(f"Latency p99: {percentile(latencies, 0.99):.1f} ms")
+    print("Outcomes:")
+    for outcome, count in sorted(outcomes.items(), key=lambda item: str(item[0])):
+        print(f"  {outcome}: {count}")
+
+def benchmark_pool(concurrency, total):
+    """Hash passwords through the app's bounded bcrypt pool"""
+    from app import hash_password, password_pool, PasswordPoolSaturated, BCRYPT_ROUNDS
+
+    def operation():
+        try:
+            hash_password('benchmark-password')
+            return 'hashed'
+        except PasswordPoolSaturated:
+            return 'rejected (503)'
+
+    print(f"bcrypt rounds: {BCRYPT_ROUNDS}, pool workers: {password_pool.workers}, max pending: {password_pool.max_pending}")
+    elapsed, latencies, outcomes = run_concurrently(operation, concurrency, total)
+    print_report("bcrypt pool", concurrency, elapsed, latencies, outcomes)
+
+def benchmark_signup(concurrency, total):
+    """POST to the signup endpoint of a running server (hashes through the bcrypt pool)"""
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    def operation():
+        name = f"bench_{uuid.uuid4().hex[:12]}"
+        body = {
+            'username': name,
+            'email': f'{name}@adda247.com',
+            'password': 'benchmark-password',
+            'confirmPassword': 'benchmark-password'
+        }
+        response = session.post(f"{BASE_URL}/api/auth/signup", json=body, timeout=30)
+        return response.status_code
+
+    elapsed, latencies, outcomes = run_concurrently(operation, concurrency, total)
+    print_report(f"POST /api/auth/signup ({BASE_URL})", concurrency, elapsed, latencies, outcomes)
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('pool', 'signup'):
+        print(__doc__)
+        return
+
+    mode = sys.argv[1]
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    total = int(sys.argv[3]) if len(sys.argv) > 3 else concurrency * 4
+
+    if mode == 'pool':
+        benchmark_pool(concurrency, total)
+    else:
+        benchmark_signup(concurrency, total)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Worker concurrency benchmark
+
+Measures how many long-lived connections one gunicorn worker can hold while still
+answering short requests. Opens N Server-Sent Event streams (/api/events, each one
+occupies a request slot for its whole lifetime, like a slow upstream call would) and
+then times GET /health while they stay open.
+
+Usage:
+    python benchmark_workers.py compare [streams] [requests]   # local gunicorn, 1 worker per class
+    python benchmark_workers.py http [streams] [requests]      # against BASE_URL
+
+Environment:
+    BASE_URL  - server to benchmark in http mode (default http://localhost:5000)
+    TOKEN     - JWT for /api/events (default: one generated with the app's secret)
+
+compare starts `gunicorn --config gunicorn_config.py --workers 1` for sync, gthread
+and (if installed) gevent, so the numbers are per worker process.
+"""
+
+import os
+import sys
+import time
+import socket
+import threading
+import subprocess
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = os.environ.get('BASE_URL', 'http://localhost:5000')
+STREAM_CONNECT_TIMEOUT = 5  # seconds a stream may take to deliver its first event
+HEALTH_TIMEOUT = 10
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def get_token():
+    token = os.environ.get('TOKEN')
+    if token:
+        return token
+    from app import generate_token
+    return generate_token('benchmark', 'benchmark@adda247.com')
+
+def open_streams(base_url, token, count, release):
+    """Open count SSE streams; each reports how it was answered and then stays open until release is set"""
+    import requests
+
+    outcomes = {}
+    lock = threading.Lock()
+    ready = threading.Barrier(count + 1, timeout=STREAM_CONNECT_TIMEOUT * 4)
+
+    def hold():
+        outcome = 'timeout'
+        try:
+            response = requests.get(
+                f"{base_url}/api/events",
+                params={'token': token},
+                stream=True,
+                timeout=(STREAM_CONNECT_TIMEOUT, STREAM_CONNECT_TIMEOUT)
+            )
+            outcome = f"HTTP {response.status_code}"
+            if response.status_code == 200:
+                # Every stream starts with a retry: line, sent as soon as a worker picks it up
+                for line in response.iter_lines(decode_unicode=True):
+                    if line:
+                        outcome = 'open' if line.startswith('retry:') else line
+                        break
+        except Exception as e:
+            response = None
+            outcome = type(e).__name__
+        with lock:
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        try:
+            ready.wait()
+        except threading.BrokenBarrierError:
+            pass
+        release.wait()
+        if response is not None:
+            response.close()
+
+    threads = [threading.Thread(target=hold, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    try:
+        ready.wait()
+    except threading.BrokenBarrierError:
+        pass
+    return threads, outcomes
+
+def time_health(base_url, concurrency, total):
+    import requests
+
+    latencies = []
+    outcomes = {}
+    lock = threading.Lock()
+
+    def one(_):
+        started = time.perf_counter()
+        try:
+            outcome = requests.get(f"{base_url}/health", timeout=HEALTH_TIMEOUT).status_code
+        except Exception as e:
+            outcome = type(e).__name__
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            latencies.append(elapsed_ms)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return time.perf_counter() - started, latencies, outcomes
+
+def run(name, base_url, token, streams, total):
+    release = threading.Event()
+    started = time.perf_counter()
+    threads, stream_outcomes = open_streams(base_url, token, streams, release)
+    open_seconds = time.perf_counter() - started
+    try:
+        elapsed, latencies, outcomes = time_health(base_url, min(16, total), total)
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+    held = stream_outcomes.get('open', 0)
+    print(f"\n📊 {name} - {streams} streams, then {total} x GET /health")
+    print("=" * 60)
+    print(f"Streams held open: {held}/{streams} (opened in {open_seconds:.2f}s)")
+    for outcome, count in sorted(stream_outcomes.items()):
+        print(f"  {outcome}: {count}")
+    print(f"/health while held: {len(latencies) / elapsed:.1f} req/s, p50 {percentile(latencies, 0.50):.1f} ms, p95 {percentile(latencies, 0.95):.1f} ms")
+    for outcome, count in sorted(outcomes.items(), key=lambda item: str(item[0])):
+        print(f"  {outcome}: {count}")
+    return held, outcomes.get(200, 0)
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_gunicorn(worker_class, port, streams):
+    env = dict(
+        os.environ,
+        GUNICORN_WORKER_CLASS=worker_class,
+        # Let the server, not the app's SSE cap, be the limit being measured
+        SSE_MAX_CONNECTIONS=str(streams * 2),
+        SSE_MAX_STREAM_SECONDS='120'
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn_config.py', '--workers', '1',
+         '--bind', f'127.0.0.1:{port}', '--pid', f'/tmp/benchmark_{worker_class}.pid', 'app:app'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    import requests
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except Exception:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"gunicorn ({worker_class}) did not start")
+
+def compare(streams, total):
+    token = get_token()
+    classes = ['sync', 'gthread']
+    if importlib.util.find_spec('gevent') is not None:
+        classes.append('gevent')
+    else:
+        print("gevent not installed, skipping it (pip install -r requirements-gevent.txt)")
+
+    results = []
+    for worker_class in classes:
+        port = free_port()
+        process = start_gunicorn(worker_class, port, streams)
+        try:
+            results.append((worker_class,) + run(f"{worker_class} (1 worker)", f"http://127.0.0.1:{port}", token, streams, total))
+        finally:
+            # Streams end at their next heartbeat, so a graceful stop can take a while
+            process.terminate()
+            try:
+                process.wait(timeout=45)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    print(f"\n{'worker class':<14}{'streams held':>14}{'/health ok':>12}")
+    for worker_class, held, ok in results:
+        print(f"{worker_class:<14}{f'{held}/{streams}':>14}{f'{ok}/{total}':>12}")
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('compare', 'http'):
+        print(__doc__)
+        return
+
+    mode = sys.argv[1]
+    streams = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    total = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    if mode == 'compare':
+        compare(streams, total)
+    else:
+        run(BASE_URL, BASE_URL, get_token(), streams, total)
+
+if __name__ == '__main__':
+    main()
@@ -10,8 +10,24 @@ backlog = 2048
 
 # Worker processes
 workers = multiprocessing.cpu_count() * 2 + 1  # Recommended formula
-worker_class = 'sync'  # or 'gevent' for async (requires gevent package)
-worker_connections = 1000
+
+# Worker class (GUNICORN_WORKER_CLASS):
+#   'gthread' (default) - `threads` OS threads per worker
+#   'gevent'            - up to `worker_connections` greenlets per worker; most requests
+#                         wait on Google, so far more of them fit per worker
+#                         (pip install -r requirements-gevent.txt)
+#   'sync'              - one request at a time per worker
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+if worker_class == 'gevent':
+    try:
+        # Patch before app.py is imported (preload_app), so its locks, threads and
+        # sockets are created cooperative; the workers then inherit them
+        from gevent import monkey
+        monkey.patch_all()
+    except ImportError:
+        print("gevent is not installed, falling back to gthread workers")
+        worker_class = 'gthread'
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))  # gevent only
 max_requests = 1000  # Restart workers after this many requests (prevents memory leaks)
 max_requests_jitter = 100  # Add randomness to prevent all workers restarting at once
 timeout = 120  # Worker timeout (important for video downloads)
@@ -24,7 +40,8 @@ proc_name = 'adda_education_api'
 accesslog = os.path.join(os.path.dirname(__file__), 'logs', 'gunicorn_access.log')
 errorlog = os.path.join(os.path.dirname(__file__), 'logs', 'gunicorn_error.log')
 loglevel = 'info'
-access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
+# Path without the query string (%(U)s, not %(r)s): stream URLs carry signed tickets
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
 
 # Server mechanics
 daemon = False  # Set to True to run as daemon
@@ -49,7 +66,15 @@ def on_reload(server):
     print("Reloading workers...")
 
 def when_ready(server):
-    """Called just after the server is started."""
+    """Called just after the server is started (in the master, before workers are forked)."""
+    if preload_app:
+        # Warm the sheet caches once here so every worker inherits them copy-on-write,
+        # and keep the shared snapshot fresh so workers don't each go to Google
+        from app import start_master_sheet_refresh
+        try:
+            start_master_sheet_refresh()
+        except Exception as e:
+            print(f"Sheet cache warm-up failed, workers will fetch on demand: {e}")
     print("Server is ready. Spawning workers")
 
 def worker_int(worker):
@@ -67,7 +92,9 @@ preload_app = True
 reload = os.getenv('FLASK_ENV') == 'development'
 
 # Thread settings
-threads = 4  # Number of threads per worker
+# Number of threads per worker, gthread only. gunicorn silently switches sync workers with
+# threads > 1 to gthread, so sync gets 1 (app.py derives the same value for its pools)
+threads = 1 if worker_class == 'sync' else int(os.getenv('GUNICORN_THREADS', 4))
 
 # Security
 limit_request_line = 4096
@@ -80,10 +107,11 @@ Gunicorn Configuration Loaded
 ===========================================
 Workers: {}
 Worker Class: {}
+Concurrency per Worker: {}
 Max Requests per Worker: {}
 Timeout: {}s
 Binding: {}
 ===========================================
-""".format(workers, worker_class, max_requests, timeout, bind))
+""".format(workers, worker_class, worker_connections if worker_class == 'gevent' else threads, max_requests, timeout, bind))
 
 
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Test script for the ASGI entry point (asgi.py): native handlers must return the same
+responses as the Flask routes, refresh the sheet once for many concurrent requests and
+hand everything else to Flask. Runs in-process; gviz is served by an httpx mock.
+"""
+
+import sys
+import json
+import asyncio
+from datetime import datetime
+
+# Test configuration
+TESTS_PASSED = 0
+TESTS_FAILED = 0
+
+def print_test(name, passed, message=""):
+    global TESTS_PASSED, TESTS_FAILED
+
+    if passed:
+        TESTS_PASSED += 1
+        print(f"✓ {name}")
+        if message:
+            print(f"  {message}")
+    else:
+        TESTS_FAILED += 1
+        print(f"✗ {name}")
+        if message:
+            print(f"  ERROR: {message}")
+
+MAIN_ROWS = [
+    ['1', 'Banking', 'Final', 'a@adda247.com', 'IBPS PO', 'Reasoning', 'Short'],
+    ['2', 'Banking', 'Final', 'b@adda247.com', 'SBI Clerk', 'English', 'Short'],
+    ['3', 'SSC', 'Re-edit', 'a@adda247.com', 'SSC CGL', 'Maths', 'Long'],
+]
+REEDIT_ROWS = [
+    ['1', 'SSC', 'Re-edit', 'c@adda247.com', 'SSC CHSL', 'GK', 'Short'],
+]
+HEADERS = ['Sr no.', 'Vertical Name', 'Edit', 'Email', 'Exam Name', 'Subject', 'Content Type']
+
+def gviz_text(rows):
+    table = {
+        'cols': [{'id': chr(65 + i), 'label': label} for i, label in enumerate(HEADERS)],
+        'rows': [{'c': [{'v': value} for value in row]} for row in rows]
+    }
+    return f"/*O_o*/\ngoogle.visualization.Query.setResponse({json.dumps({'status': 'ok', 'table': table})});"
+
+def sample_records():
+    import app
+    return app.build_sheet_records(HEADERS, MAIN_ROWS), app.build_sheet_records(HEADERS, REEDIT_ROWS)
+
+class NoServiceAccountLoader:
+    def load(self):
+        return False
+
+def asgi_client():
+    import httpx
+    import asgi
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi.application), base_url='http://testserver')
+
+def test_parity():
+    """Test that native handlers answer exactly like the Flask routes"""
+    print("\n=== Testing Native Handler Parity ===\n")
+
+    import app
+
+    records, reedit_records = sample_records()
+    app.sheets_cache.set_many({app.SHEET_DATA_CACHE_KEY: records, app.REEDIT_DATA_CACHE_KEY: reedit_records})
+    token = app.generate_token('asgi_user', 'asgi_user@adda247.com')
+    headers = {'Authorization': f'Bearer {token}', 'Origin': 'https://shortssprint.vercel.app'}
+    flask_client = app.app.test_client()
+
+    async def run():
+        async with asgi_client() as client:
+            for path in ('/api/data', '/api/filters', '/api/leaderboard'):
+                native = await client.get(path, headers=headers)
+                flask = flask_client.get(path, headers=headers)
+                print_test(f"GET {path} matches Flask byte for byte", native.status_code == flask.status_code and native.content == flask.data)
+
+            native = await client.get('/api/data', headers=headers)
+            print_test("Native responses carry the CORS headers", native.headers.get('access-control-allow-origin') == 'https://shortssprint.vercel.app')
+            print_test("Native responses report auth time", native.headers.get('server-timing', '').startswith('auth;dur='))
+
+            missing = await client.get('/api/data')
+            flask_missing = flask_client.get('/api/data')
+            print_test("Missing token rejected like Flask", missing.status_code == 401 and missing.json() == flask_missing.get_json())
+
+            health = await client.get('/health')
+            print_test("GET /health served natively", health.status_code == 200 and health.json()['status'] == 'healthy')
+            metrics = await client.get('/metrics')
+            print_test("GET /metrics includes the async reader stats", metrics.status_code == 200 and 'asgi' in metrics.json())
+
+    try:
+        asyncio.run(run())
+    finally:
+        app.sheets_cache.clear()
+
+def test_single_flight_refresh():
+    """Test that a cold cache is refreshed once for many concurrent requests"""
+    print("\n=== Testing Async Cache Refresh ===\n")
+
+    import httpx
+    import app
+    import asgi
+
+    fetched = []
+    async def gviz(request):
+        fetched.append(request.url.params.get('gid'))
+        await asyncio.sleep(0.05)
+        rows = MAIN_ROWS if request.url.params.get('gid') == '0' else REEDIT_ROWS
+        return httpx.Response(200, text=gviz_text(rows))
+
+    original_loader = app.sheet_snapshot_loader
+    app.sheet_snapshot_loader = NoServiceAccountLoader()
+    app.sheets_cache.clear()
+    token = app.generate_token('asgi_user', 'asgi_user@adda247.com')
+    headers = {'Authorization': f'Bearer {token}'}
+
+    async def run():
+        asgi.sheet_reader.client = httpx.AsyncClient(transport=httpx.MockTransport(gviz))
+        asgi.sheet_reader.refresh_lock = asyncio.Lock()
+        try:
+            async with asgi_client() as client:
+                responses = await asyncio.gather(*[client.get('/api/leaderboard', headers=headers) for _ in range(50)])
+                print_test("50 concurrent cold requests all succeed", all(r.status_code == 200 for r in responses))
+                print_test("Each gviz tab fetched once", sorted(fetched) == sorted(['0', str(app.REEDIT_GID)]), f"Fetched: {fetched}")
+                data = await client.get('/api/data', headers=headers)
+                print_test("Fetched records are parsed and cached like the sync path", data.json()['count'] == 3 and len(fetched) == 2)
+        finally:
+            await asgi.sheet_reader.close()
+
+    try:
+        asyncio.run(run())
+        records, reedit_records = sample_records()
+        print_test("Cache holds the same records the sync parser builds", app.sheets_cache.get(app.SHEET_DATA_CACHE_KEY) == records and app.sheets_cache.get(app.REEDIT_DATA_CACHE_KEY) == reedit_records)
+    finally:
+        app.sheet_snapshot_loader = original_loader
+        app.sheets_cache.clear()
+        asgi.sheet_reader.refresh_lock = None
+
+def test_delegation():
+    """Test that everything else goes through Flask"""
+    print("\n=== Testing WSGI Delegation ===\n")
+
+    import app
+
+    token = app.generate_token('asgi_user', 'asgi_user@adda247.com')
+
+    async def run():
+        async with asgi_client() as client:
+            verify = await client.get('/api/auth/verify', headers={'Authorization': f'Bearer {token}'})
+            print_test("Flask-only routes are delegated", verify.status_code == 200 and verify.json()['username'] == 'asgi_user')
+            preflight = await client.options('/api/data', headers={
+                'Origin': 'http://localhost:5173',
+                'Access-Control-Request-Method': 'GET'
+            })
+            print_test("CORS preflight for a native route is answered by Flask", preflight.headers.get('access-control-allow-origin') == 'http://localhost:5173')
+            missing = await client.get('/api/does-not-exist')
+            flask_missing = app.app.test_client().get('/api/does-not-exist')
+            print_test("Unknown routes are answered by Flask", missing.status_code == flask_missing.status_code and missing.json() == flask_missing.get_json())
+
+    asyncio.run(run())
+
+def test_blocking_work_off_loop():
+    """Test that JWT decodes and disk reads run in threads, not on the event loop"""
+    print("\n=== Testing Event Loop Offloading ===\n")
+
+    import os
+    import tempfile
+    import threading
+    import app
+
+    calls = {}
+
+    def recording(name, func):
+        def wrapper(*args):
+            calls.setdefault(name, []).append(threading.current_thread() is threading.main_thread())
+            return func(*args)
+        return wrapper
+
+    records, reedit_records = sample_records()
+    app.sheets_cache.set_many({app.SHEET_DATA_CACHE_KEY: records, app.REEDIT_DATA_CACHE_KEY: reedit_records})
+    original = (app.authenticate_request, app.build_metrics_payload, app.build_detailed_health, app.token_revocations)
+    app.token_revocations = app.TokenRevocationList(os.path.join(tempfile.mkdtemp(), 'revoked.json'), check_interval=60)
+    app.authenticate_request = recording('auth', app.authenticate_request)
+    app.build_metrics_payload = recording('metrics', app.build_metrics_payload)
+    app.build_detailed_health = recording('health', app.build_detailed_health)
+    token = app.generate_token('loop_user', 'loop_user@adda247.com')
+    headers = {'Authorization': f'Bearer {token}'}
+
+    async def run():
+        async with asgi_client() as client:
+            first = await client.get('/api/data', headers=headers)
+            second = await client.get('/api/data', headers=headers)
+            print_test("Both requests authenticated", first.status_code == 200 and second.status_code == 200)
+            print_test("Uncached token is verified in a thread", calls['auth'][0] is False, f"On loop: {calls['auth']}")
+            print_test("Cached token is verified on the loop", calls['auth'][1] is True, f"On loop: {calls['auth']}")
+            await client.get('/metrics')
+            detailed = await client.get('/health/detailed')
+            flask_detailed = app.app.test_client().get('/health/detailed')
+            print_test("Metrics and detailed health read storage in a thread", calls['metrics'] == [False] and calls['health'][0] is False, f"Calls: {calls}")
+            print_test("GET /health/detailed answers like Flask", detailed.status_code == flask_detailed.status_code and detailed.json()['status'] == flask_detailed.get_json()['status'],
+                       f"Status: {detailed.status_code} vs {flask_detailed.status_code}")
+
+    try:
+        asyncio.run(run())
+    finally:
+        app.authenticate_request, app.build_metrics_payload, app.build_detailed_health, app.token_revocations = original
+        app.sheets_cache.clear()
+
+def print_summary():
+    """Print test summary"""
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+    print(f"✓ Passed: {TESTS_PASSED}")
+    print(f"✗ Failed: {TESTS_FAILED}")
+    print(f"Total: {TESTS_PASSED + TESTS_FAILED}")
+    print("="*60)
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("ASGI ENTRY POINT TEST SUITE")
+    print("="*60)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    test_parity()
+    test_single_flight_refresh()
+    test_delegation()
+    test_blocking_work_off_loop()
+
+    print_summary()
+
+    # Exit with appropriate code
+    sys.exit(0 if TESTS_FAILED == 0 else 1)
+
+if __name__ == '__main__':
+    main()
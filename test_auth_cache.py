@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Test script for the authentication fast paths (JWT verification cache, revocation,
+bounded bcrypt pool, Google ID-token verification cache, credentials index).
+Runs in-process against the Flask test client; no server or Google access needed.
+"""
+
+import os
+import sys
+import time
+import tempfile
+from datetime import datetime
+
+# Test configuration
+TESTS_PASSED = 0
+TESTS_FAILED = 0
+
+def print_test(name, passed, message=""):
+    global TESTS_PASSED, TESTS_FAILED
+
+    if passed:
+        TESTS_PASSED += 1
+        print(f"✓ {name}")
+        if message:
+            print(f"  {message}")
+    else:
+        TESTS_FAILED += 1
+        print(f"✗ {name}")
+        if message:
+            print(f"  ERROR: {message}")
+
+def test_token_cache():
+    """Test LRU bounds and exp handling of the verified-token cache"""
+    print("\n=== Testing Token Cache ===\n")
+
+    from app import TokenCache
+
+    cache = TokenCache(max_entries=2)
+    now = time.time()
+    cache.put('a', {'username': 'a', 'exp': now + 60})
+    cache.put('b', {'username': 'b', 'exp': now + 60})
+    cache.get('a')
+    cache.put('c', {'username': 'c', 'exp': now + 60})
+    print_test("Evicts the least recently used token", cache.get('b') is None and cache.get('a') is not None)
+    print_test("Never serves a token past its exp", cache.get('c', now=now + 61) is None)
+    print_test("Counts hits and misses", cache.get_stats()['hits'] >= 2 and cache.get_stats()['evictions'] == 1)
+
+def revoke_in_process(path, worker):
+    """One simulated gunicorn worker revoking tokens into the shared file"""
+    from app import TokenRevocationList
+    revocations = TokenRevocationList(path)
+    for i in range(20):
+        revocations.revoke(f'w{worker}-{i}', time.time() + 3600)
+
+def test_token_required():
+    """Test the decorator end to end: caching, revocation and timing"""
+    print("\n=== Testing token_required ===\n")
+
+    import jwt
+    import app
+
+    client = app.app.test_client()
+    original_revocations = app.token_revocations
+    app.token_revocations = app.TokenRevocationList(os.path.join(tempfile.mkdtemp(), 'revoked.json'))
+    try:
+        token = app.generate_token('cache_user', 'cache_user@adda247.com')
+        headers = {'Authorization': f'Bearer {token}'}
+
+        hits_before = app.token_cache.get_stats()['hits']
+        first = client.get('/api/auth/verify', headers=headers)
+        second = client.get('/api/auth/verify', headers=headers)
+        print_test("Valid token accepted", first.status_code == 200 and second.get_json()['username'] == 'cache_user')
+        print_test("Repeat verification served from cache", app.token_cache.get_stats()['hits'] > hits_before)
+        print_test("Server-Timing header reports auth time", second.headers.get('Server-Timing', '').startswith('auth;dur='))
+
+        forged = jwt.encode({'username': 'x', 'exp': time.time() + 60}, 'wrong-secret', algorithm='HS256')
+        print_test("Bad signature rejected", client.get('/api/auth/verify', headers={'Authorization': f'Bearer {forged}'}).status_code == 401)
+
+        expired = jwt.encode({'username': 'x', 'exp': time.time() - 1}, app.JWT_SECRET_KEY, algorithm='HS256')
+        response = client.get('/api/auth/verify', headers={'Authorization': f'Bearer {expired}'})
+        print_test("Expired token rejected", response.status_code == 401 and response.get_json()['message'] == 'Token has expired')
+
+        logout = client.post('/api/auth/logout', headers=headers)
+        print_test("Logout revokes the token", logout.status_code == 200 and logout.get_json()['revoked'])
+        after = client.get('/api/auth/verify', headers=headers)
+        print_test("Revoked token rejected even though it was cached", after.status_code == 401, f"Message: {after.get_json().get('message')}")
+
+        other_worker = app.TokenRevocationList(app.token_revocations.path)
+        claims = jwt.decode(token, app.JWT_SECRET_KEY, algorithms=['HS256'])
+        print_test("Revocation visible to other processes via the shared file", other_worker.is_revoked(claims['jti']))
+
+        import multiprocessing
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=revoke_in_process, args=(app.token_revocations.path, worker))
+            for worker in range(4)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        merged = app.TokenRevocationList(app.token_revocations.path)
+        missing = [f'w{worker}-{i}' for worker in range(4) for i in range(20) if not merged.is_revoked(f'w{worker}-{i}')]
+        print_test("Concurrent revocations in different workers are all kept", not missing and merged.is_revoked(claims['jti']),
+                   f"Lost: {len(missing)}" if missing else "")
+
+        auth_stats = client.get('/metrics').get_json()['auth']
+        print_test("/metrics reports auth timing", auth_stats['token_verification']['verifications'] >= 5, f"Stats: {auth_stats['token_verification']}")
+    finally:
+        app.token_revocations = original_revocations
+
+def test_password_pool():
+    """Test that the bcrypt pool bounds concurrency and rejects fast when full"""
+    print("\n=== Testing Password Hashing Pool ===\n")
+
+    import threading
+    import app
+    from app import PasswordHasherPool, PasswordPoolSaturated
+
+    pool = PasswordHasherPool(workers=1, max_pending=1)
+    release = threading.Event()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(pool.run(release.wait, 5))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+
+    started = time.perf_counter()
+    try:
+        pool.run(lambda: None)
+        rejected = False
+    except PasswordPoolSaturated:
+        rejected = True
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print_test("Rejects immediately when workers and queue are full", rejected and elapsed_ms < 50, f"Rejected in {elapsed_ms:.2f} ms")
+
+    release.set()
+    for thread in threads:
+        thread.join()
+    print_test("Queued jobs complete", results == [True, True])
+    print_test("Accepts work again once drained", pool.run(lambda: 'ok') == 'ok')
+    stats = pool.get_stats()
+    print_test("Pool stats", stats['completed'] == 3 and stats['rejected'] == 1 and stats['in_flight'] == 0, f"Stats: {stats}")
+
+    hashed = app.hash_password('secret-pass')
+    print_test("hash_password uses the configured cost factor", hashed.startswith(f"$2b${app.BCRYPT_ROUNDS:02d}$"))
+    print_test("verify_password round-trips", app.verify_password('secret-pass', hashed) and not app.verify_password('nope', hashed))
+
+    with app.app.test_request_context('/api/auth/signup', method='POST'):
+        response = app.app.make_response(app.app.handle_user_exception(PasswordPoolSaturated("full")))
+    print_test("A saturated pool answers 503 with Retry-After on any route",
+               response.status_code == 503 and response.headers.get('Retry-After') == '1', f"Status: {response.status_code}")
+
+def test_google_verification_cache():
+    """Test the cert-caching transport and the verified ID-token cache"""
+    print("\n=== Testing Google ID-Token Verification Cache ===\n")
+
+    import app
+    from app import CertCachingTransport
+
+    class FakeResponse:
+        def __init__(self, headers):
+            self.status = 200
+            self.headers = headers
+            self.data = b'{"kid": "cert"}'
+
+    calls = []
+    def fake_transport(url, method='GET', body=None, headers=None, **kwargs):
+        calls.append(url)
+        return FakeResponse({'cache-control': 'public, max-age=19000, must-revalidate, no-transform'})
+
+    transport = CertCachingTransport(fake_transport)
+    first = transport('https://www.googleapis.com/oauth2/v1/certs')
+    second = transport('https://www.googleapis.com/oauth2/v1/certs')
+    print_test("Certs fetched once while max-age is fresh", len(calls) == 1 and first is second)
+    transport.cache['https://www.googleapis.com/oauth2/v1/certs'] = (first, time.time() - 1)
+    transport('https://www.googleapis.com/oauth2/v1/certs')
+    print_test("Certs re-fetched after max-age", len(calls) == 2)
+    transport('https://example.com/token', method='POST', body=b'x')
+    transport('https://example.com/token', method='POST', body=b'x')
+    print_test("Non-GET requests are never cached", len(calls) == 4)
+
+    verifications = []
+    original_verify = app.id_token.verify_oauth2_token
+    def fake_verify(token, request, audience):
+        verifications.append(token)
+        return {'iss': 'accounts.google.com', 'email': 'someone@adda247.com', 'email_verified': True, 'exp': time.time() + 3600}
+    app.id_token.verify_oauth2_token = fake_verify
+    try:
+        ok1, user1, _ = app.verify_google_token('google-id-token')
+        ok2, user2, _ = app.verify_google_token('google-id-token')
+        print_test("Repeat login with the same ID token skips verification", ok1 and ok2 and len(verifications) == 1 and user1 == user2)
+        app.verify_google_token('another-id-token')
+        print_test("Different ID tokens are verified separately", len(verifications) == 2)
+    finally:
+        app.id_token.verify_oauth2_token = original_verify
+
+def test_credentials_index():
+    """Test O(1) credential lookups used by signup and /api/auth/me"""
+    print("\n=== Testing Credentials Index ===\n")
+
+    import app
+    from app import CredentialsIndex
+
+    index = CredentialsIndex([
+        {'username': 'Alice', 'email': 'Alice@adda247.com', 'password': 'h1'},
+        {'username': 'alice', 'email': 'other@adda247.com', 'password': 'h2'},
+        {'username': 'bob', 'email': 'bob@studyiq.com', 'password': 'h3'}
+    ])
+    print_test("Case-insensitive username lookup keeps the first match", index.find_by_username('ALICE')['password'] == 'h1')
+    print_test("Case-insensitive email lookup", index.find_by_email('bob@STUDYIQ.com')['username'] == 'bob')
+
+    users_before = index.users
+    index.add({'username': 'carol', 'email': 'carol@adda247.com', 'password': 'h4'})
+    print_test("Added users are indexed in place", index.find_by_email('CAROL@adda247.com')['username'] == 'carol' and len(index) == 4)
+    print_test("Existing user lists are not mutated", len(users_before) == 3)
+
+    client = app.app.test_client()
+    app.credentials_cache.set(app.CREDENTIALS_CACHE_KEY, index)
+    try:
+        token = app.generate_token('bob', 'bob@studyiq.com')
+        me = client.get('/api/auth/me', headers={'Authorization': f'Bearer {token}'})
+        print_test("/api/auth/me resolves the user from the index", me.status_code == 200 and me.get_json()['user']['email'] == 'bob@studyiq.com')
+
+        signup = client.post('/api/auth/signup', json={
+            'username': 'BOB', 'email': 'new@adda247.com', 'password': 'secret1', 'confirmPassword': 'secret1'
+        })
+        print_test("Signup rejects a case-variant duplicate username", signup.status_code == 409)
+        signup = client.post('/api/auth/signup', json={
+            'username': 'newbie', 'email': 'Carol@Adda247.com', 'password': 'secret1', 'confirmPassword': 'secret1'
+        })
+        print_test("Signup rejects a case-variant duplicate email", signup.status_code == 409 and 'Email' in signup.get_json()['message'])
+    finally:
+        app.credentials_cache.delete(app.CREDENTIALS_CACHE_KEY)
+
+def print_summary():
+    """Print test summary"""
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+    print(f"✓ Passed: {TESTS_PASSED}")
+    print(f"✗ Failed: {TESTS_FAILED}")
+    print(f"Total: {TESTS_PASSED + TESTS_FAILED}")
+    print("="*60)
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("AUTH CACHE TEST SUITE")
+    print("="*60)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    test_token_cache()
+    test_token_required()
+    test_password_pool()
+    test_google_verification_cache()
+    test_credentials_index()
+
+    print_summary()
+
+    # Exit with appropriate code
+    sys.exit(0 if TESTS_FAILED == 0 else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script for the precompiled catalog responses (/api/categories, /api/exams).
+Checks that the bodies match what jsonify would build from data/catalogs.json, that
+gzip is negotiated from Accept-Encoding, that If-None-Match revalidates with a 304
+and that the routes stay protected.
+"""
+
+import os
+import sys
+import json
+import gzip
+import tempfile
+from datetime import datetime
+
+# Test configuration
+TESTS_PASSED = 0
+TESTS_FAILED = 0
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def print_test(name, passed, message=""):
+    global TESTS_PASSED, TESTS_FAILED
+
+    if passed:
+        TESTS_PASSED += 1
+        print(f"✓ {name}")
+        if message:
+            print(f"  {message}")
+    else:
+        TESTS_FAILED += 1
+        print(f"✗ {name}")
+        if message:
+            print(f"  ERROR: {message}")
+
+def auth_headers(**extra):
+    import app
+    token = app.generate_token('catalog_user', 'catalog_user@adda247.com')
+    headers = {'Authorization': f'Bearer {token}'}
+    headers.update(extra)
+    return headers
+
+def test_catalog_bodies():
+    """Test that the precompiled bodies are the jsonify output for the data file"""
+    print("\n=== Testing Catalog Bodies ===\n")
+
+    import app
+
+    with open(os.path.join(ROOT, 'data', 'catalogs.json'), 'r', encoding='utf-8') as f:
+        catalogs = json.load(f)
+    print_test("Data file is versioned", isinstance(catalogs.get('version'), int), f"Version: {catalogs.get('version')}")
+
+    client = app.app.test_client()
+    with app.app.test_request_context():
+        for name in ('categories', 'exams'):
+            response = client.get(f'/api/{name}', headers=auth_headers())
+            expected = app.jsonify({"success": True, name: catalogs[name]}).get_data()
+            print_test(f"GET /api/{name} returns the jsonify bytes", response.status_code == 200 and response.data == expected)
+            print_test(f"GET /api/{name} is JSON with a length", response.mimetype == 'application/json' and response.content_length == len(expected))
+
+    missing = client.get('/api/exams')
+    print_test("Missing token is still rejected", missing.status_code == 401 and missing.get_json()['success'] is False)
+
+def test_caching_headers():
+    """Test ETag, Cache-Control and conditional GET"""
+    print("\n=== Testing Caching Headers ===\n")
+
+    import app
+
+    client = app.app.test_client()
+    response = client.get('/api/categories', headers=auth_headers())
+    etag = response.headers.get('ETag', '')
+    print_test("Strong ETag is sent", etag.startswith('"categories-v') and not etag.startswith('W/'), f"ETag: {etag}")
+    print_test("Long private Cache-Control", response.headers.get('Cache-Control') == f'private, max-age={app.CATALOG_CACHE_MAX_AGE_SECONDS}')
+    print_test("Vary: Accept-Encoding", 'Accept-Encoding' in response.headers.get('Vary', ''))
+
+    revalidated = client.get('/api/categories', headers=auth_headers(**{'If-None-Match': etag}))
+    print_test("Matching If-None-Match answers 304 without a body", revalidated.status_code == 304 and revalidated.data == b'')
+    print_test("304 repeats the ETag", revalidated.headers.get('ETag') == etag)
+
+    gzip_etag = client.get('/api/categories', headers=auth_headers(**{'Accept-Encoding': 'gzip'})).headers['ETag']
+    crossed = client.get('/api/categories', headers=auth_headers(**{'If-None-Match': gzip_etag}))
+    print_test("Either representation's ETag revalidates", crossed.status_code == 304)
+
+    stale = client.get('/api/categories', headers=auth_headers(**{'If-None-Match': '"categories-v0-0000000000000000"'}))
+    print_test("Stale ETag gets the full body", stale.status_code == 200 and stale.data == response.data)
+
+    other = client.get('/api/exams', headers=auth_headers(**{'If-None-Match': etag}))
+    print_test("ETags are per catalog", other.status_code == 200)
+
+    unauthorized = client.get('/api/categories', headers={'If-None-Match': etag})
+    print_test("304 is never given without a token", unauthorized.status_code == 401)
+
+def test_gzip_negotiation():
+    """Test that the gzip copy is served only when accepted"""
+    print("\n=== Testing Compression ===\n")
+
+    import app
+
+    client = app.app.test_client()
+    plain = client.get('/api/exams', headers=auth_headers())
+    compressed = client.get('/api/exams', headers=auth_headers(**{'Accept-Encoding': 'gzip, deflate, br'}))
+    print_test("gzip served when accepted", compressed.headers.get('Content-Encoding') == 'gzip')
+    print_test("gzip body decompresses to the plain body", gzip.decompress(compressed.data) == plain.data,
+               f"{len(plain.data)} bytes -> {len(compressed.data)} bytes")
+    print_test("gzip representation has its own ETag", compressed.headers['ETag'] != plain.headers['ETag'])
+
+    refused = client.get('/api/exams', headers=auth_headers(**{'Accept-Encoding': 'gzip;q=0, identity'}))
+    print_test("gzip;q=0 gets the plain body", 'Content-Encoding' not in refused.headers and refused.data == plain.data)
+
+def test_versioning():
+    """Test that a new data file version changes the ETags"""
+    print("\n=== Testing Versioning ===\n")
+
+    import app
+
+    with open(app.CATALOG_DATA_PATH, 'r', encoding='utf-8') as f:
+        catalogs = json.load(f)
+    catalogs['version'] += 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'catalogs.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(catalogs, f)
+        bumped = app.load_catalog_responses(path)
+
+    current = app.catalog_responses
+    print_test("Version bump changes the ETag", bumped['exams'].etag != current['exams'].etag, f"{current['exams'].etag} -> {bumped['exams'].etag}")
+    print_test("Same data keeps the same body", bumped['exams'].body == current['exams'].body)
+
+    with open(os.path.join(ROOT, 'vercel.json'), 'r') as f:
+        vercel = json.load(f)
+    include_files = vercel['builds'][0].get('config', {}).get('includeFiles', [])
+    print_test("vercel.json ships the data directory", 'data/**' in include_files, f"includeFiles: {include_files}")
+
+    stats = app.app.test_client().get('/metrics').get_json()['catalogs']
+    print_test("Metrics report catalog stats", stats['exams']['not_modified'] >= 0 and stats['exams']['gzip_bytes'] < stats['exams']['bytes'])
+
+def print_summary():
+    """Print test summary"""
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+    print(f"✓ Passed: {TESTS_PASSED}")
+    print(f"✗ Failed: {TESTS_FAILED}")
+    print(f"Total: {TESTS_PASSED + TESTS_FAILED}")
+    print("="*60)
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("CATALOG RESPONSE TEST SUITE")
+    print("="*60)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    test_catalog_bodies()
+    test_caching_headers()
+    test_gzip_negotiation()
+    test_versioning()
+
+    print_summary()
+
+    # Exit with appropriate code
+    sys.exit(0 if TESTS_FAILED == 0 else 1)
+
+if __name__ == '__main__':
+    main()
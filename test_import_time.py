@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Import-time regression test for serverless cold starts.
+Imports the Vercel entry point (api/index.py) in fresh interpreters with -X importtime
+and checks that:
+- the cold import stays within IMPORT_TIME_BUDGET_MS (best of IMPORT_TIME_RUNS)
+- heavy dependencies (gspread, googleapiclient, yt_dlp, bcrypt, jwt, ...) are not
+  imported until the subsystem that needs them is used
+
+Environment:
+    IMPORT_TIME_BUDGET_MS - cold import budget in milliseconds (default 300)
+    IMPORT_TIME_RUNS      - interpreters to start; the fastest one is compared (default 3)
+"""
+
+import os
+import sys
+import json
+import subprocess
+from datetime import datetime
+
+# Test configuration
+TESTS_PASSED = 0
+TESTS_FAILED = 0
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+IMPORT_TIME_BUDGET_MS = float(os.environ.get('IMPORT_TIME_BUDGET_MS', 300))
+IMPORT_TIME_RUNS = int(os.environ.get('IMPORT_TIME_RUNS', 3))
+
+# Loaded on first use only; none of these may be imported by a cold start
+DEFERRED_MODULES = [
+    'gspread',
+    'googleapiclient',
+    'google_auth_httplib2',
+    'httplib2',
+    'google.oauth2.service_account',
+    'google.oauth2.id_token',
+    'google.auth.transport.requests',
+    'yt_dlp',
+    'bcrypt',
+    'jwt',
+]
+
+def print_test(name, passed, message=""):
+    global TESTS_PASSED, TESTS_FAILED
+
+    if passed:
+        TESTS_PASSED += 1
+        print(f"✓ {name}")
+        if message:
+            print(f"  {message}")
+    else:
+        TESTS_FAILED += 1
+        print(f"✗ {name}")
+        if message:
+            print(f"  ERROR: {message}")
+
+def run_python(code, importtime=False):
+    """Run code in a fresh interpreter as on Vercel; returns (stdout, stderr)"""
+    env = dict(os.environ, VERCEL='1')
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return result.stdout, result.stderr
+
+def parse_importtime(stderr):
+    """-X importtime output -> {module: cumulative microseconds}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules[name.strip()] = int(cumulative.strip())
+    return modules
+
+IMPORT_ENTRY_POINT = "import sys; sys.path.insert(0, 'api'); import index"
+
+def test_cold_import_budget():
+    """Test the cold import of the serverless entry point against the budget"""
+    print("\n=== Testing Cold Import Budget ===\n")
+
+    timings = []
+    modules = {}
+    for _ in range(IMPORT_TIME_RUNS):
+        _, stderr = run_python(IMPORT_ENTRY_POINT, importtime=True)
+        modules = parse_importtime(stderr)
+        timings.append(modules['index'] / 1000)
+
+    best = min(timings)
+    print_test(
+        f"api/index.py imports within {IMPORT_TIME_BUDGET_MS:.0f} ms",
+        best <= IMPORT_TIME_BUDGET_MS,
+        f"Best of {len(timings)}: {best:.1f} ms (runs: {', '.join(f'{t:.0f}' for t in timings)} ms)"
+    )
+
+    loaded = [name for name in DEFERRED_MODULES if name in modules]
+    print_test("Heavy dependencies are not imported at startup", not loaded, f"Imported eagerly: {loaded}" if loaded else "")
+
+    slowest = sorted(((us, name) for name, us in modules.items() if '.' not in name and name not in ('index', 'app')), reverse=True)[:5]
+    print("  Largest top-level imports: " + ", ".join(f"{name} {us / 1000:.0f} ms" for us, name in slowest))
+
+def test_light_requests_stay_light():
+    """Test that health checks don't pull in the heavy subsystems"""
+    print("\n=== Testing Lazy Loading ===\n")
+
+    stdout, _ = run_python(
+        "import sys, json\n"
+        "sys.path.insert(0, 'api')\n"
+        "import index\n"
+        "client = index.app.test_client()\n"
+        "statuses = [client.get(path).status_code for path in ('/health', '/api/test', '/')]\n"
+        f"print(json.dumps({{'statuses': statuses, 'loaded': [m for m in {DEFERRED_MODULES!r} if m in sys.modules]}}))"
+    )
+    result = json.loads(stdout.strip().splitlines()[-1])
+    print_test("/health, /api/test and / answer", result['statuses'] == [200, 200, 200], f"Statuses: {result['statuses']}")
+    print_test("They don't import any heavy dependency", not result['loaded'], f"Imported: {result['loaded']}" if result['loaded'] else "")
+
+    stdout, _ = run_python(
+        "import sys, json, app\n"
+        "token = app.generate_token('lazy', 'lazy@adda247.com')\n"
+        "claims, _, error = app.verify_jwt(token)\n"
+        "salt = app.bcrypt.gensalt(rounds=4)\n"
+        "print(json.dumps({'user': claims and claims['username'], 'jwt': 'jwt' in sys.modules, "
+        "'bcrypt': 'bcrypt' in sys.modules, 'gspread': 'gspread' in sys.modules}))"
+    )
+    result = json.loads(stdout.strip().splitlines()[-1])
+    print_test("jwt loads on first token operation", result['user'] == 'lazy' and result['jwt'])
+    print_test("bcrypt loads on first use", result['bcrypt'])
+    print_test("Unused subsystems stay unloaded", not result['gspread'])
+
+def print_summary():
+    """Print test summary"""
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+    print(f"✓ Passed: {TESTS_PASSED}")
+    print(f"✗ Failed: {TESTS_FAILED}")
+    print(f"Total: {TESTS_PASSED + TESTS_FAILED}")
+    print("="*60)
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("IMPORT TIME TEST SUITE")
+    print("="*60)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    test_cold_import_budget()
+    test_light_requests_stay_light()
+
+    print_summary()
+
+    # Exit with appropriate code
+    sys.exit(0 if TESTS_FAILED == 0 else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,753 @@
+#!/usr/bin/env python3
+"""
+Test script for the Google Sheets data path (HTTP client, sheet fetching and caching).
+Runs in-process against local stand-ins for Google; no network access needed.
+"""
+
+import sys
+import time
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Test configuration
+TESTS_PASSED = 0
+TESTS_FAILED = 0
+
+def print_test(name, passed, message=""):
+    global TESTS_PASSED, TESTS_FAILED
+
+    if passed:
+        TESTS_PASSED += 1
+        print(f"✓ {name}")
+        if message:
+            print(f"  {message}")
+    else:
+        TESTS_FAILED += 1
+        print(f"✗ {name}")
+        if message:
+            print(f"  ERROR: {message}")
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Minimal HTTP/1.1 server that keeps connections open"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def test_http_client():
+    """Test keep-alive reuse, per-host timeouts and reuse statistics"""
+    print("\n=== Testing Pooled HTTP Client ===\n")
+
+    from app import PooledHTTPClient
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = PooledHTTPClient(4, {'127.0.0.1': (1, 2)}, (3, 4))
+        url = f'http://127.0.0.1:{server.server_port}/'
+        for _ in range(10):
+            client.get(url)
+
+        stats = client.get_stats()
+        host = stats['hosts'].get('127.0.0.1', {})
+        print_test("Sequential requests reuse one connection", host.get('connections_opened') == 1 and host.get('requests') == 10, f"Stats: {host}")
+        print_test("Reuse rate reported", host.get('reuse_rate') == '90.00%')
+        print_test("Per-host timeout", client.timeout_for(url) == (1, 2))
+        print_test("Default timeout for other hosts", client.timeout_for('https://example.com/') == (3, 4))
+
+        client.reset()
+        print_test("Reset drops pooled connections", client.get_stats()['hosts'] == {})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+class FakeSpreadsheet:
+    """Stands in for a gspread Spreadsheet; counts Sheets API round trips"""
+    def __init__(self, tabs):
+        self.tabs = tabs  # gid -> (title, rows)
+        self.batch_calls = []
+        self.fail = False
+
+    def fetch_sheet_metadata(self, params=None):
+        return {'sheets': [{'properties': {'sheetId': int(gid), 'title': title}} for gid, (title, _) in self.tabs.items()]}
+
+    def read(self, a1):
+        """Resolve 'Title' or 'Title'!A<row>:<col> the way the values API does"""
+        sheet, _, cells = a1.partition('!')
+        by_title = {"'" + title.replace("'", "''") + "'": rows for title, rows in self.tabs.values()}
+        rows = by_title[sheet]
+        if not cells:
+            return rows
+        start, end = cells.split(':')
+        width = sum((ord(c) - ord('A') + 1) * 26 ** i for i, c in enumerate(reversed(end)))
+        return [row[:width] for row in rows[int(start[1:]) - 1:]]
+
+    def values_batch_get(self, ranges, params=None):
+        self.batch_calls.append(ranges)
+        if self.fail:
+            raise RuntimeError('quota exceeded')
+        return {'valueRanges': [{'range': r, 'values': self.read(r)} for r in ranges]}
+
+    def values_get(self, a1, params=None):
+        self.batch_calls.append([a1])
+        return {'range': a1, 'values': self.read(a1)}
+
+class FakeClient:
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+def test_sheet_snapshot():
+    """Test that one batchGet fills the main, re-edit and credentials caches together"""
+    print("\n=== Testing Sheet Snapshot (batchGet) ===\n")
+
+    import app
+
+    spreadsheet = FakeSpreadsheet({
+        '0': ('Final', [
+            ['Sr no.', 'Vertical Name', 'Email', 'Edit'],
+            ["'1", 'Banking', 'a@adda247.com', 'Final'],
+            [],
+            [2, 'SSC', 'b@adda247.com']
+        ]),
+        app.REEDIT_GID: ("Drive Links", [
+            ['Sr no.', 'Vertical Name', 'Email'],
+            [1, 'Teaching', 'c@adda247.com']
+        ]),
+        app.CREDENTIALS_GID: ("Users' Creds", [
+            ['Username', 'Email', 'Password', 'Created'],
+            ['alice', 'alice@adda247.com', 'hash1'],
+            ['', 'nobody@adda247.com', 'hash2', 'x']
+        ]),
+        app.TICKETS_GID: ('Tickets', [
+            ['Ticket ID', 'Status'],
+            ['T-1', 'Open'],
+            ['', '']
+        ])
+    })
+
+    original_client = app.get_gspread_client
+    original_drive = app.get_drive_service
+    original_loader = app.sheet_snapshot_loader
+    app.get_gspread_client = lambda: FakeClient(spreadsheet)
+    app.get_drive_service = lambda: None
+    app.sheet_snapshot_loader = app.SheetSnapshotLoader(
+        app.SHEET_ID, '0', app.REEDIT_GID, app.CREDENTIALS_GID, retry_seconds=60
+    )
+    app.sheets_cache.clear()
+    app.credentials_cache.clear()
+    try:
+        records, reedit_records = app.get_sheet_and_reedit_data()
+        print_test("Cold load is a single batchGet for the three tabs read", len(spreadsheet.batch_calls) == 1 and len(spreadsheet.batch_calls[0]) == 3, f"Calls: {spreadsheet.batch_calls}")
+        print_test("Main tab parsed like the gviz reader", [r['Sr no.'] for r in records] == ['1', 2] and records[1]['Edit'] == '', f"Records: {records}")
+        print_test("Re-edit tab parsed", [r['Vertical Name'] for r in reedit_records] == ['Teaching'])
+
+        index = app.get_credentials_index()
+        print_test("Credentials served from the same batch", index.find_by_username('ALICE')['password'] == 'hash1' and len(index) == 1)
+        print_test("Tickets tab is not fetched", not any('Tickets' in r for r in spreadsheet.batch_calls[0]))
+        print_test("Tab titles with quotes are escaped in ranges", "'Users'' Creds'" in spreadsheet.batch_calls[0])
+        print_test("Warm reads make no further API calls", app.get_sheet_data() is records and len(spreadsheet.batch_calls) == 1)
+
+        app.sheets_cache.delete(app.SHEET_DATA_CACHE_KEY)
+        barrier = threading.Barrier(8)
+        results = []
+        def cold_reader():
+            barrier.wait()
+            results.append(app.get_sheet_and_reedit_data())
+        threads = [threading.Thread(target=cold_reader) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print_test("Concurrent cold loads share one fetch", len(spreadsheet.batch_calls) == 2, f"batchGet calls: {len(spreadsheet.batch_calls)}")
+        print_test("Readers see main and re-edit from the same snapshot", all(r[0] is results[0][0] and r[1] is results[0][1] for r in results))
+
+        spreadsheet.fail = True
+        app.sheets_cache.clear()
+        print_test("Failed batchGet reports unavailable", app.sheet_snapshot_loader.load() is False)
+        print_test("Failures back off instead of retrying every call", app.sheet_snapshot_loader.load() is False and len(spreadsheet.batch_calls) == 3)
+        stats = app.sheet_snapshot_loader.get_stats()
+        print_test("Loader stats", stats['loads'] == 2 and stats['failures'] == 1 and stats['tabs']['0'] == 'Final', f"Stats: {stats}")
+    finally:
+        app.get_gspread_client = original_client
+        app.get_drive_service = original_drive
+        app.sheet_snapshot_loader = original_loader
+        app.sheets_cache.clear()
+        app.credentials_cache.clear()
+
+def test_main_sheet_sync():
+    """Test incremental tail reads and fingerprint reconciles of the main tab"""
+    print("\n=== Testing Main Sheet Delta Sync ===\n")
+
+    import app
+
+    main_rows = [['Sr no.', 'Vertical Name', 'Email']] + [[i, 'Banking', f'u{i}@adda247.com'] for i in range(1, 101)]
+    spreadsheet = FakeSpreadsheet({
+        '0': ('Final', main_rows),
+        app.REEDIT_GID: ('Drive Links', [['Sr no.', 'Vertical Name', 'Email']]),
+        app.CREDENTIALS_GID: ('Creds', [['Username', 'Email', 'Password', 'Created']]),
+        app.TICKETS_GID: ('Tickets', [['Ticket ID', 'Status']])
+    })
+
+    original_client = app.get_gspread_client
+    original_drive = app.get_drive_service
+    app.get_gspread_client = lambda: FakeClient(spreadsheet)
+    app.get_drive_service = lambda: None
+    loader = app.SheetSnapshotLoader(app.SHEET_ID, '0', app.REEDIT_GID, app.CREDENTIALS_GID, retry_seconds=0, reconcile_seconds=3600)
+    sync = loader.main_sync
+    app.sheets_cache.clear()
+    try:
+        loader.load()
+        print_test("First load is a full read", sync.get_stats()['full_syncs'] == 1 and len(app.sheets_cache.get(app.SHEET_DATA_CACHE_KEY)) == 100)
+
+        main_rows.append([101, 'SSC', 'u101@adda247.com'])
+        main_rows.append([102, 'SSC', 'u102@adda247.com'])
+        loader.load()
+        tail = spreadsheet.batch_calls[-1][0]
+        records = app.sheets_cache.get(app.SHEET_DATA_CACHE_KEY)
+        print_test("Refresh reads only the tail from the anchor row", tail == "'Final'!A101:C", f"Range: {tail}")
+        print_test("Appended rows applied", len(records) == 102 and records[-1]['Email'] == 'u102@adda247.com' and sync.get_stats()['rows_appended'] == 2)
+
+        loader.load()
+        print_test("No-op refresh appends nothing", sync.get_stats()['tail_syncs'] == 2 and len(app.sheets_cache.get(app.SHEET_DATA_CACHE_KEY)) == 102)
+
+        del main_rows[50]
+        loader.load()
+        stats = sync.get_stats()
+        records = app.sheets_cache.get(app.SHEET_DATA_CACHE_KEY)
+        print_test("Deleted row detected through the anchor fingerprint", stats['anchor_mismatches'] == 1 and stats['full_syncs'] == 2 and len(records) == 101, f"Stats: {stats}")
+
+        previous = records
+        main_rows[10] = [10, 'Teaching', 'edited@adda247.com']
+        sync.request_reconcile()
+        loader.load()
+        records = app.sheets_cache.get(app.SHEET_DATA_CACHE_KEY)
+        print_test("Requested reconcile picks up an in-place edit", records[9]['Email'] == 'edited@adda247.com')
+        print_test("Unchanged rows keep their parsed records", records[0] is previous[0] and records[-1] is previous[-1])
+        print_test("Previously published list is left untouched", previous[9]['Email'] == 'u10@adda247.com')
+        print_test("Reconcile counts changed rows only", sync.get_stats()['rows_changed'] == 100 + 53 + 1, f"Stats: {sync.get_stats()}")
+
+        main_rows[0] = ['Sr no.', 'Vertical Name', 'Email', 'Exam Name']
+        sync.reconciled_at = 0
+        loader.load()
+        records = app.sheets_cache.get(app.SHEET_DATA_CACHE_KEY)
+        print_test("Periodic reconcile rebuilds records after a header change", 'Exam Name' in records[0] and sync.get_stats()['full_syncs'] == 4)
+    finally:
+        app.get_gspread_client = original_client
+        app.get_drive_service = original_drive
+        app.sheets_cache.clear()
+        app.credentials_cache.clear()
+
+class FakeDriveService:
+    """Stands in for the Drive v3 service; files().get(...).execute() returns version metadata"""
+    def __init__(self):
+        self.version = '100'
+        self.calls = 0
+        self.fail = False
+        self.delay = 0
+
+    def files(self):
+        return self
+
+    def get(self, fileId, fields, supportsAllDrives=False):
+        return self
+
+    def execute(self):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError('drive unavailable')
+        return {'version': self.version, 'modifiedTime': f'2026-01-01T00:00:{self.version[-2:]}Z'}
+
+def test_change_detection():
+    """Test that unchanged spreadsheets are served from the last snapshot"""
+    print("\n=== Testing Drive Change Detection ===\n")
+
+    import app
+
+    main_rows = [['Sr no.', 'Vertical Name', 'Email'], [1, 'Banking', 'a@adda247.com']]
+    spreadsheet = FakeSpreadsheet({
+        '0': ('Final', main_rows),
+        app.REEDIT_GID: ('Drive Links', [['Sr no.', 'Vertical Name', 'Email'], [1, 'SSC', 'b@adda247.com']]),
+        app.CREDENTIALS_GID: ('Creds', [['Username', 'Email', 'Password', 'Created'], ['alice', 'alice@adda247.com', 'h', '']]),
+        app.TICKETS_GID: ('Tickets', [['Ticket ID', 'Status']])
+    })
+    drive = FakeDriveService()
+
+    original_client = app.get_gspread_client
+    original_drive = app.get_drive_service
+    original_loader = app.sheet_snapshot_loader
+    app.get_gspread_client = lambda: FakeClient(spreadsheet)
+    app.get_drive_service = lambda: drive
+    loader = app.sheet_snapshot_loader = app.SheetSnapshotLoader(
+        app.SHEET_ID, '0', app.REEDIT_GID, app.CREDENTIALS_GID,
+        retry_seconds=0, reconcile_seconds=3600, max_skip_seconds=3600
+    )
+    app.sheets_cache.clear()
+    app.credentials_cache.clear()
+    try:
+        records, _ = app.get_sheet_and_reedit_data()
+        print_test("First load fetches the sheet", len(spreadsheet.batch_calls) == 1 and drive.calls == 1)
+
+        app.sheets_cache.clear()
+        app.credentials_cache.clear()
+        again, reedit = app.get_sheet_and_reedit_data()
+        print_test("Expired cache with unchanged version skips the fetch", len(spreadsheet.batch_calls) == 1 and drive.calls == 2)
+        print_test("Last snapshot is served again", again is records and reedit[0]['Vertical Name'] == 'SSC')
+        print_test("Credentials are re-published too", app.credentials_cache.get(app.CREDENTIALS_CACHE_KEY) is not None)
+
+        main_rows.append([2, 'Teaching', 'c@adda247.com'])
+        drive.version = '101'
+        app.sheets_cache.clear()
+        records, _ = app.get_sheet_and_reedit_data()
+        print_test("Changed version triggers a fetch", len(spreadsheet.batch_calls) == 2 and len(records) == 2)
+
+        app.invalidate_sheet_cache('add')
+        app.get_sheet_data()
+        print_test("Writes through the API fetch even before Drive reports them", len(spreadsheet.batch_calls) == 3)
+
+        loader.fetched_at = 0
+        app.sheets_cache.clear()
+        app.get_sheet_data()
+        print_test("Fetches at least every max_skip_seconds", len(spreadsheet.batch_calls) == 4)
+
+        drive.fail = True
+        app.sheets_cache.clear()
+        app.get_sheet_data()
+        print_test("Falls back to fetching when the Drive check fails", len(spreadsheet.batch_calls) == 5)
+
+        stats = loader.get_stats()
+        print_test("Stats count skipped refreshes", stats['unchanged_skips'] == 1 and stats['version_checks_failed'] == 1, f"Stats: {stats}")
+    finally:
+        app.get_gspread_client = original_client
+        app.get_drive_service = original_drive
+        app.sheet_snapshot_loader = original_loader
+        app.sheets_cache.clear()
+        app.credentials_cache.clear()
+
+def test_dataset_events():
+    """Test dataset change notifications and the SSE endpoint"""
+    print("\n=== Testing Dataset Change Events (SSE) ===\n")
+
+    import time
+    import app
+    from app import DatasetEventBroker
+
+    broker = DatasetEventBroker(max_connections=1, max_diff_rows=2)
+    records = [{'Sr no.': 1, 'Email': 'a@adda247.com'}]
+    print_test("First observation publishes a version", broker.observe('main', records) and broker.version is not None)
+    version = broker.version
+    print_test("Unchanged records publish nothing", not broker.observe('main', [dict(records[0])]) and broker.sequence == 1)
+    broker.observe('main', records + [{'Sr no.': 2}], {'appended_rows': [3, 4, 5], 'removed_rows': 0})
+    diff = broker.events[-1][2]['diff']
+    print_test("Large row diffs are reduced to counts", diff == {'appended_count': 3, 'removed_rows': 0}, f"Diff: {diff}")
+
+    other = DatasetEventBroker(max_connections=1)
+    other.observe('main', records + [{'Sr no.': 2}])
+    print_test("Version is content-derived, so workers agree", other.version == broker.version and broker.version != version)
+
+    stream = broker.stream(last_version=version, max_seconds=2, heartbeat_seconds=0.1)
+    print_test("Stream starts with a retry hint", next(stream).startswith('retry:'))
+    catch_up = next(stream)
+    print_test("Reconnecting client with an old version is told the current one", 'event: dataset' in catch_up and broker.version in catch_up)
+
+    busy = list(broker.stream())
+    print_test("Streams beyond the per-worker cap get a busy event", any('event: busy' in chunk for chunk in busy) and broker.get_stats()['streams_rejected'] == 1)
+
+    print_test("Idle stream sends heartbeats", next(stream) == ": keep-alive\n\n")
+    threading.Timer(0.05, broker.publish, args=('write', {'action': 'update', 'row': 7})).start()
+    chunk = next(stream)
+    while chunk.startswith(':'):
+        chunk = next(stream)
+    print_test("Published events reach the subscriber", 'event: write' in chunk and '"row": 7' in chunk, chunk.strip())
+    stream.close()
+    print_test("Closing a stream frees its slot", broker.get_stats()['connections'] == 0)
+
+    # End to end through Flask, with short streams
+    client = app.app.test_client()
+    original = (app.SSE_MAX_STREAM_SECONDS, app.SSE_HEARTBEAT_SECONDS, app.dataset_events, app.executor)
+    app.SSE_MAX_STREAM_SECONDS, app.SSE_HEARTBEAT_SECONDS = 0.5, 0.1
+    app.dataset_events = DatasetEventBroker(max_connections=2)
+    app.executor = None  # no eager refresh against the real sheet
+    try:
+        print_test("Stream requires a token", client.get('/api/events').status_code == 401)
+        token = app.generate_token('sse_user', 'sse_user@adda247.com')
+        print_test("Session token is not accepted in the query string", client.get(f'/api/events?token={token}').status_code == 401)
+        print_test("Ticket URL requires a token", client.get('/api/events/ticket').status_code == 401)
+        ticket_response = client.get('/api/events/ticket', headers={'Authorization': f'Bearer {token}'}).get_json()
+        url = ticket_response['url']
+        print_test("Ticket URL is short-lived", url.startswith('/api/events?ticket=') and ticket_response['expires_in'] == app.SSE_TICKET_SECONDS)
+        ticket = url.split('ticket=', 1)[1]
+        print_test("Events ticket is not a session token", client.get('/api/data', headers={'Authorization': f'Bearer {ticket}'}).status_code == 401)
+        video_ticket = app.generate_ticket(app.verify_jwt(token)[0], 'video-stream', 'a.mp4', 60)
+        print_test("Tickets for other scopes are rejected", client.get(f'/api/events?ticket={video_ticket}').status_code == 401)
+        threading.Timer(0.1, app.invalidate_sheet_cache, args=('delete',), kwargs={'row': 4, 'reconcile': False}).start()
+        started = time.perf_counter()
+        response = client.get(url)
+        body = response.get_data(as_text=True)
+        elapsed = time.perf_counter() - started
+        print_test("EventSource-style ?ticket= accepted", response.status_code == 200 and response.mimetype == 'text/event-stream')
+        print_test("Writes through the API are pushed", 'event: write' in body and '"action": "delete"' in body, body.replace('\n', ' | ')[:200])
+        print_test("Streams end after SSE_MAX_STREAM_SECONDS", elapsed < 2, f"{elapsed:.2f}s")
+        print_test("/metrics reports event streams", client.get('/metrics').get_json()['events']['events_published'] >= 1)
+    finally:
+        app.SSE_MAX_STREAM_SECONDS, app.SSE_HEARTBEAT_SECONDS, app.dataset_events, app.executor = original
+
+    # The watcher re-checks the sheet only while this worker has subscribers
+    loads = []
+    original = app.dataset_events
+    app.dataset_events = DatasetEventBroker(max_connections=1)
+    app.sheet_snapshot_loader.load = lambda: loads.append(1) or True
+    try:
+        app.watch_dataset_changes()
+        print_test("Watcher is idle without subscribers", loads == [])
+        stream = app.dataset_events.stream(max_seconds=1, heartbeat_seconds=0.1)
+        next(stream)
+        app.watch_dataset_changes()
+        print_test("Watcher re-checks the sheet while a stream is open", loads == [1])
+        stream.close()
+    finally:
+        app.dataset_events = original
+        del app.sheet_snapshot_loader.load
+
+def test_warm_start_snapshot():
+    """Test that a new process serves from the saved snapshot, then validates it"""
+    print("\n=== Testing Warm-Start Snapshot ===\n")
+
+    import os
+    import gzip
+    import json
+    import stat
+    import tempfile
+    import app
+
+    main_rows = [['Sr no.', 'Vertical Name', 'Email']] + [[i, 'Banking', f'u{i}@adda247.com'] for i in range(1, 21)]
+    spreadsheet = FakeSpreadsheet({
+        '0': ('Final', main_rows),
+        app.REEDIT_GID: ('Drive Links', [['Sr no.', 'Vertical Name', 'Email'], [1, 'SSC', 'b@adda247.com']]),
+        app.CREDENTIALS_GID: ('Creds', [['Username', 'Email', 'Password', 'Created'], ['alice', 'alice@adda247.com', 'h', '']]),
+        app.TICKETS_GID: ('Tickets', [['Ticket ID', 'Status'], ['T-1', 'Open']])
+    })
+    drive = FakeDriveService()
+    path = os.path.join(tempfile.mkdtemp(), 'cache', 'sheet_snapshot.json.gz')
+
+    def new_loader(max_age_seconds=None):
+        return app.SheetSnapshotLoader(
+            app.SHEET_ID, '0', app.REEDIT_GID, app.CREDENTIALS_GID,
+            retry_seconds=0, reconcile_seconds=3600, max_skip_seconds=3600,
+            store=app.SheetSnapshotStore(path), max_age_seconds=max_age_seconds
+        )
+
+    original = (app.get_gspread_client, app.get_drive_service, app.sheet_snapshot_loader, app.executor)
+    app.get_gspread_client = lambda: FakeClient(spreadsheet)
+    app.get_drive_service = lambda: drive
+    app.executor = None  # save synchronously
+    app.sheets_cache.clear()
+    app.credentials_cache.clear()
+    try:
+        app.sheet_snapshot_loader = new_loader()
+        app.sheet_snapshot_loader.load()
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+        print_test("Snapshot written after a fetch", os.path.exists(path) and mode == 0o600, f"Mode: {oct(mode)}")
+
+        # A fresh worker: empty caches, new loader, same snapshot file
+        app.sheets_cache.clear()
+        app.credentials_cache.clear()
+        calls_before = len(spreadsheet.batch_calls)
+        app.sheet_snapshot_loader = loader = new_loader()
+        print_test("Snapshot restored", loader.restore() and loader.validation_pending)
+        records, reedit = app.get_sheet_and_reedit_data()
+        print_test("First request served without contacting Google", len(records) == 20 and reedit[0]['Vertical Name'] == 'SSC' and len(spreadsheet.batch_calls) == calls_before)
+        print_test("Credentials restored", app.get_credentials_index().find_by_email('ALICE@adda247.com') is not None)
+
+        loader.validate()
+        print_test("Validation of a current snapshot costs only the Drive check", not loader.validation_pending and len(spreadsheet.batch_calls) == calls_before and loader.get_stats()['unchanged_skips'] == 1)
+
+        main_rows.append([21, 'SSC', 'u21@adda247.com'])
+        drive.version = '101'
+        app.sheets_cache.clear()
+        app.sheet_snapshot_loader = loader = new_loader()
+        loader.restore()
+        loader.validate()
+        records = app.sheets_cache.get(app.SHEET_DATA_CACHE_KEY)
+        print_test("Stale snapshot is refreshed with a tail read", spreadsheet.batch_calls[-1][0] == "'Final'!A21:C" and len(records) == 21, f"Range: {spreadsheet.batch_calls[-1][0]}")
+
+        saved_at = loader.store.load()['saved_at']
+        os.utime(path, (saved_at - 100, saved_at - 100))
+        app.sheets_cache.clear()
+        old_loader = new_loader(max_age_seconds=3600)
+        print_test("Restored snapshot keeps its own validation time", old_loader.restore() and old_loader.published_at == saved_at - 100, f"published_at: {old_loader.published_at}")
+        app.sheets_cache.clear()
+        state = dict(loader.store.load(), saved_at=saved_at - 7200)
+        with gzip.open(path, 'wt') as f:
+            json.dump(state, f)
+        print_test("Snapshot older than max_age_seconds is not served", new_loader(max_age_seconds=3600).restore() is False and app.sheets_cache.get(app.SHEET_DATA_CACHE_KEY) is None)
+
+        with open(path, 'wb') as f:
+            f.write(b'not gzip')
+        print_test("Unreadable snapshot is ignored", new_loader().restore() is False)
+    finally:
+        app.get_gspread_client, app.get_drive_service, app.sheet_snapshot_loader, app.executor = original
+        app.sheets_cache.clear()
+        app.credentials_cache.clear()
+
+def test_master_warm_up():
+    """Test the gunicorn master warm-up, fork safety and snapshot adoption by workers"""
+    print("\n=== Testing Master Warm-Up (preload_app) ===\n")
+
+    import os
+    import json
+    import time
+    import tempfile
+    import app
+
+    main_rows = [['Sr no.', 'Vertical Name', 'Email']] + [[i, 'Banking', f'u{i}@adda247.com'] for i in range(1, 11)]
+    spreadsheet = FakeSpreadsheet({
+        '0': ('Final', main_rows),
+        app.REEDIT_GID: ('Drive Links', [['Sr no.', 'Vertical Name', 'Email'], [1, 'SSC', 'b@adda247.com']]),
+        app.CREDENTIALS_GID: ('Creds', [['Username', 'Email', 'Password', 'Created'], ['alice', 'alice@adda247.com', 'h', '']]),
+        app.TICKETS_GID: ('Tickets', [['Ticket ID', 'Status']])
+    })
+    drive = FakeDriveService()
+    path = os.path.join(tempfile.mkdtemp(), 'sheet_snapshot.json.gz')
+
+    def new_loader():
+        return app.SheetSnapshotLoader(
+            app.SHEET_ID, '0', app.REEDIT_GID, app.CREDENTIALS_GID,
+            retry_seconds=0, reconcile_seconds=3600, max_skip_seconds=3600,
+            store=app.SheetSnapshotStore(path), adopt_seconds=120
+        )
+
+    original = (app.get_gspread_client, app.get_drive_service, app.sheet_snapshot_loader, app.SHEET_MASTER_REFRESH_SECONDS)
+    app.get_gspread_client = lambda: FakeClient(spreadsheet)
+    app.get_drive_service = lambda: drive
+    app.SHEET_MASTER_REFRESH_SECONDS = 3600
+    app.sheets_cache.clear()
+    app.credentials_cache.clear()
+    try:
+        app.sheet_snapshot_loader = master = new_loader()
+        app.start_master_sheet_refresh()
+        print_test("Warm-up fills the caches in the master", app.sheets_cache.get(app.SHEET_DATA_CACHE_KEY) is not None and app.credentials_cache.get(app.CREDENTIALS_CACHE_KEY) is not None)
+        print_test("Warm-up writes the snapshot synchronously", os.path.exists(path))
+
+        # Fork while a refresh holds the guard: the fork has to wait for it
+        master.spreadsheet = object()
+        threading.Thread(target=lambda: (app._sheet_fork_guard.acquire(), time.sleep(0.3), app._sheet_fork_guard.release())).start()
+        time.sleep(0.05)
+        read_fd, write_fd = os.pipe()
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            calls = len(spreadsheet.batch_calls)
+            records, _ = app.get_sheet_and_reedit_data()
+            result = {
+                'records': len(records),
+                'upstream_calls': len(spreadsheet.batch_calls) - calls,
+                'client_reset': app.sheet_snapshot_loader.spreadsheet is None and app._gspread_client_instance is None,
+                'guard_free': app._sheet_fork_guard.acquire(timeout=1)
+            }
+            os.write(write_fd, json.dumps(result).encode())
+            os._exit(0)
+        fork_ms = (time.perf_counter() - started) * 1000
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd) as f:
+            child = json.loads(f.read())
+        print_test("Fork waits for an in-flight master refresh", fork_ms >= 200, f"Fork took {fork_ms:.0f} ms")
+        print_test("Worker serves inherited caches without going upstream", child['records'] == 10 and child['upstream_calls'] == 0, f"Child: {child}")
+        print_test("Worker drops the master's Google clients and fork guard", child['client_reset'] and child['guard_free'])
+        print_test("Parent keeps its own state", master.spreadsheet is not None)
+        master.spreadsheet = None
+
+        # Fork while a refresh waits on Google: the fork must not wait for the network
+        drive.delay = 0.5
+        skips = master.get_stats()['unchanged_skips']
+        refresh = threading.Thread(target=app.refresh_sheet_snapshot)
+        refresh.start()
+        time.sleep(0.1)
+        read_fd, write_fd = os.pipe()
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            loader = app.sheet_snapshot_loader
+            result = {'load_lock_free': loader.load_lock.acquire(timeout=1), 'guard': loader.publish_guard is app.nullcontext}
+            os.write(write_fd, json.dumps(result).encode())
+            os._exit(0)
+        fork_ms = (time.perf_counter() - started) * 1000
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd) as f:
+            child = json.loads(f.read())
+        refresh.join()
+        drive.delay = 0
+        print_test("Fork does not wait for a refresh's Drive call", fork_ms < 200 and master.get_stats()['unchanged_skips'] == skips + 1, f"Fork took {fork_ms:.0f} ms")
+        print_test("Worker gets a usable loader lock and no publish guard", child['load_lock_free'] and child['guard'], f"Child: {child}")
+
+        # A worker whose cache expired adopts the snapshot the master just validated
+        worker = new_loader()
+        worker.restore()
+        time.sleep(0.01)
+        app.sheet_snapshot_loader = master
+        app.refresh_sheet_snapshot()
+        print_test("The master does not adopt its own snapshot", master.get_stats()['adopted_snapshots'] == 0)
+        # Same process here, so drop what the master just republished
+        app.sheets_cache.clear()
+        batch_calls, drive_calls = len(spreadsheet.batch_calls), drive.calls
+        app.sheet_snapshot_loader = worker
+        records, _ = app.get_sheet_and_reedit_data()
+        print_test("Worker adopts the master-validated snapshot", len(records) == 10 and worker.get_stats()['adopted_snapshots'] == 1)
+        print_test("Adoption makes no Google calls", len(spreadsheet.batch_calls) == batch_calls and drive.calls == drive_calls)
+
+        worker.request_refresh()
+        app.sheets_cache.clear()
+        app.get_sheet_and_reedit_data()
+        print_test("Writes through this worker bypass adoption", drive.calls == drive_calls + 1)
+    finally:
+        app.get_gspread_client, app.get_drive_service, app.sheet_snapshot_loader, app.SHEET_MASTER_REFRESH_SECONDS = original
+        app.sheets_cache.clear()
+        app.credentials_cache.clear()
+
+def test_client_concurrency():
+    """Test that the shared Google clients and the executor are safe for threaded workers"""
+    print("\n=== Testing Client Concurrency ===\n")
+
+    import os
+    import time
+    import app
+    from google.auth.credentials import AnonymousCredentials
+
+    created = []
+    checks = []
+
+    class CountingClient:
+        def __init__(self, healthy=True):
+            self.healthy = healthy
+
+        def open_by_key(self, key):
+            checks.append(key)
+            time.sleep(0.05)
+            if not self.healthy:
+                raise RuntimeError("stale session")
+
+    def create():
+        time.sleep(0.1)
+        created.append(1)
+        return CountingClient()
+
+    original = (app._create_gspread_client, app._gspread_client_instance, app._gspread_client_checked_at)
+    app._create_gspread_client = create
+    app._gspread_client_instance = None
+    try:
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(app.get_gspread_client())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print_test("Concurrent first calls build one gspread client", len(created) == 1 and len({id(c) for c in clients}) == 1)
+
+        for _ in range(5):
+            app.get_gspread_client()
+        print_test("Recently checked client is reused without a round trip", checks == [])
+
+        app._gspread_client_checked_at = 0
+        started = time.perf_counter()
+        threads = [threading.Thread(target=app.get_gspread_client) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print_test("Only one thread re-checks a stale client", len(checks) == 1, f"{len(checks)} checks in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+        app._gspread_client_instance = CountingClient(healthy=False)
+        app._gspread_client_checked_at = 0
+        replacement = app.get_gspread_client()
+        print_test("A client that fails its check is rebuilt", replacement.healthy and len(created) == 2)
+    finally:
+        app._create_gspread_client, app._gspread_client_instance, app._gspread_client_checked_at = original
+
+    service = app.build_drive_service(AnonymousCredentials())
+    main_http = service.files().get(fileId='a').http
+    print_test("Drive requests on one thread reuse its connection", service.files().get(fileId='b').http is main_http)
+    other = []
+    thread = threading.Thread(target=lambda: other.append(service.files().get(fileId='c').http))
+    thread.start()
+    thread.join()
+    print_test("Each thread gets its own Drive connection (httplib2 is not thread-safe)", other[0] is not main_http)
+
+    if app.executor is not None and hasattr(os, 'fork'):
+        parent_executor = app.executor
+        release = threading.Event()
+        parent_executor.submit(release.wait, 5)
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            ok = app.executor is not parent_executor and app.executor.submit(lambda: 42).result(timeout=5) == 42
+            os.write(write_fd, b'1' if ok else b'0')
+            os._exit(0)
+        os.close(write_fd)
+        os.waitpid(pid, 0)
+        with os.fdopen(read_fd) as f:
+            child_ok = f.read() == '1'
+        release.set()
+        print_test("Forked workers get a fresh executor", child_ok and app.executor is parent_executor)
+
+    # Sync workers are single-threaded; the config and app.py agree without touching the environment
+    import json
+    import subprocess
+    code = "import os, json, gunicorn_config, app; print(json.dumps([gunicorn_config.threads, os.environ['GUNICORN_THREADS'], app.WORKER_CONCURRENCY]))"
+    env = dict(os.environ, GUNICORN_WORKER_CLASS='sync', GUNICORN_THREADS='8')
+    result = subprocess.run([sys.executable, '-c', code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env=env, capture_output=True, text=True, timeout=60)
+    values = json.loads(result.stdout.strip().splitlines()[-1]) if result.returncode == 0 else None
+    print_test("Sync workers run one thread without rewriting GUNICORN_THREADS", values == [1, '8', 1], f"Values: {values} {result.stderr[-300:]}")
+
+def print_summary():
+    """Print test summary"""
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+    print(f"✓ Passed: {TESTS_PASSED}")
+    print(f"✗ Failed: {TESTS_FAILED}")
+    print(f"Total: {TESTS_PASSED + TESTS_FAILED}")
+    print("="*60)
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("SHEET DATA TEST SUITE")
+    print("="*60)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    test_http_client()
+    test_sheet_snapshot()
+    test_main_sheet_sync()
+    test_change_detection()
+    test_dataset_events()
+    test_warm_start_snapshot()
+    test_master_warm_up()
+    test_client_concurrency()
+
+    print_summary()
+
+    # Exit with appropriate code
+    sys.exit(0 if TESTS_FAILED == 0 else 1)
+
+if __name__ == '__main__':
+    main()
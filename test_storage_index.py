@@ -0,0 +1,712 @@
+#!/usr/bin/env python3
+"""
+Test script for the local video storage index and retention engine.
+Runs against a temporary directory, so it never touches uploaded_videos/.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+# Test configuration
+TESTS_PASSED = 0
+TESTS_FAILED = 0
+
+def print_test(name, passed, message=""):
+    global TESTS_PASSED, TESTS_FAILED
+
+    if passed:
+        TESTS_PASSED += 1
+        print(f"✓ {name}")
+        if message:
+            print(f"  {message}")
+    else:
+        TESTS_FAILED += 1
+        print(f"✗ {name}")
+        if message:
+            print(f"  ERROR: {message}")
+
+def write_file(directory, name, size, mtime=None):
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+def test_index_updates():
+    """Test incremental add/remove and O(1) totals"""
+    print("\n=== Testing Incremental Index Updates ===\n")
+
+    from app import StorageIndex
+
+    storage_dir = tempfile.mkdtemp()
+    try:
+        index = StorageIndex(storage_dir, os.path.join(storage_dir, '.storage_index.json'))
+
+        index.add_path(write_file(storage_dir, 'a.mp4', 100))
+        index.add_path(write_file(storage_dir, 'b.mp4', 50))
+        print_test("Totals after adds", index.totals() == (2, 150), f"Totals: {index.totals()}")
+
+        index.add_path(write_file(storage_dir, 'a.mp4', 10))
+        print_test("Re-indexing a file replaces its size", index.totals() == (2, 60), f"Totals: {index.totals()}")
+
+        index.remove(['b.mp4', 'missing.mp4'])
+        print_test("Totals after remove", index.totals() == (1, 10), f"Totals: {index.totals()}")
+
+        index.confirm_drive('a.mp4', 'drive123')
+        print_test("Drive confirmation recorded", index.get('a.mp4').get('drive_file_id') == 'drive123')
+    finally:
+        shutil.rmtree(storage_dir)
+
+def test_reconcile_and_persist():
+    """Test scandir reconciliation and on-disk persistence"""
+    print("\n=== Testing Reconcile and Persistence ===\n")
+
+    from app import StorageIndex
+
+    storage_dir = tempfile.mkdtemp()
+    try:
+        index_path = os.path.join(storage_dir, '.storage_index.json')
+        index = StorageIndex(storage_dir, index_path)
+
+        write_file(storage_dir, 'one.mp4', 10)
+        write_file(storage_dir, 'two.mp4', 20)
+        write_file(storage_dir, 'partial.mp4.tmp', 5)
+        write_file(storage_dir, '.hidden', 5)
+        index.add_path(write_file(storage_dir, 'gone.mp4', 30))
+        index.confirm_drive('gone.mp4', 'x')
+        os.remove(os.path.join(storage_dir, 'gone.mp4'))
+
+        index.reconcile()
+        names = sorted(name for name, _ in index.snapshot())
+        print_test("Reconcile picks up new files and drops deleted ones", names == ['one.mp4', 'two.mp4'], f"Indexed: {names}")
+        print_test("Reconcile skips hidden and .tmp files", index.totals() == (2, 30), f"Totals: {index.totals()}")
+        print_test("Index persisted to disk", os.path.exists(index_path))
+
+        index.confirm_drive('one.mp4', 'drive1')
+        index.flush()
+        reloaded = StorageIndex(storage_dir, index_path)
+        print_test("Persisted index loads", reloaded.load())
+        print_test(
+            "Reloaded index keeps totals and Drive confirmations",
+            reloaded.totals() == (2, 30) and reloaded.get('one.mp4').get('drive_file_id') == 'drive1'
+        )
+    finally:
+        shutil.rmtree(storage_dir)
+
+def test_sharded_layout():
+    """Test that new videos land in shard directories and are found by name"""
+    print("\n=== Testing Sharded Layout ===\n")
+
+    from app import StorageIndex
+
+    storage_dir = tempfile.mkdtemp()
+    try:
+        index_path = os.path.join(storage_dir, '.storage_index.json')
+        index = StorageIndex(storage_dir, index_path)
+
+        path = index.new_path('sharded.mp4')
+        relative = os.path.relpath(path, storage_dir)
+        print_test("New videos go one shard level deep", len(relative.split(os.sep)) == 2, f"Path: {relative}")
+        with open(path, 'wb') as f:
+            f.write(b'x' * 40)
+        index.add_path(path)
+        print_test("Index resolves the sharded path by name", index.path_for('sharded.mp4') == path)
+
+        flat_path = write_file(storage_dir, 'legacy.mp4', 60)
+        index.reconcile()
+        print_test("Reconcile walks shards and the flat layout", index.totals() == (2, 100), f"Totals: {index.totals()}")
+
+        index.confirm_drive('legacy.mp4', 'drive-legacy')
+        moved_path = os.path.join(storage_dir, StorageIndex.shard_relpath('legacy.mp4'))
+        os.makedirs(os.path.dirname(moved_path), exist_ok=True)
+        os.rename(flat_path, moved_path)
+        print_test("Moved file can be located by name", index.locate('legacy.mp4') == moved_path)
+
+        index.reconcile()
+        entry = index.get('legacy.mp4')
+        print_test(
+            "Reconcile follows a moved file and keeps its Drive confirmation",
+            index.path_for('legacy.mp4') == moved_path and entry.get('drive_file_id') == 'drive-legacy'
+        )
+    finally:
+        shutil.rmtree(storage_dir)
+
+def add_videos_in_process(storage_dir, worker, count):
+    """One simulated gunicorn worker: its own index instance, adding and confirming videos"""
+    from app import StorageIndex
+    index = StorageIndex(storage_dir, os.path.join(storage_dir, '.storage_index.json'))
+    index.load()
+    for i in range(count):
+        name = f'w{worker}_{i}.mp4'
+        index.add_path(write_file(storage_dir, name, 10), sha256=f'hash-{name}')
+        index.confirm_drive(name, f'drive-{name}')
+
+def test_shared_index():
+    """Test that worker processes merge their changes into one index file"""
+    print("\n=== Testing Shared Index Across Workers ===\n")
+
+    import subprocess
+    import multiprocessing
+    from app import StorageIndex
+
+    storage_dir = tempfile.mkdtemp()
+    try:
+        index_path = os.path.join(storage_dir, '.storage_index.json')
+        worker_a = StorageIndex(storage_dir, index_path)
+        worker_b = StorageIndex(storage_dir, index_path)
+
+        worker_a.add_path(write_file(storage_dir, 'upload.mp4', 100), sha256='ingest-hash')
+        worker_b.add_path(write_file(storage_dir, 'other.mp4', 50))
+        worker_b.confirm_drive('upload.mp4', 'drive-upload')
+        print_test("A stale worker's write keeps the other worker's entries", worker_b.totals() == (2, 150), f"Totals: {worker_b.totals()}")
+
+        worker_a.reconcile()
+        entry = worker_a.get('upload.mp4')
+        print_test(
+            "Reconcile keeps the ingest hash and another worker's Drive id",
+            entry.get('sha256') == 'ingest-hash' and entry.get('drive_file_id') == 'drive-upload',
+            f"Entry: {entry}"
+        )
+
+        worker_b.refresh()
+        worker_a.touch('other.mp4')
+        print_test("Access times are batched until flush", worker_b.refresh() is False)
+        worker_a.flush()
+        print_test("Flushed access time reaches the other worker", worker_b.refresh() and worker_b.get('other.mp4').get('last_access'))
+
+        worker_a.remove(['other.mp4'])
+        os.remove(os.path.join(storage_dir, 'other.mp4'))
+        print_test("Lookup miss adopts the other worker's additions", worker_b.get('upload.mp4') is not None)
+        worker_b.refresh()
+        print_test("Removals reach the other worker", worker_b.get('other.mp4') is None and worker_b.totals() == (1, 100))
+
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=add_videos_in_process, args=(storage_dir, worker, 15)) for worker in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        merged = StorageIndex(storage_dir, index_path)
+        merged.load()
+        confirmed = [name for name, entry in merged.snapshot() if entry.get('drive_file_id') == f'drive-{name}' and entry.get('sha256') == f'hash-{name}']
+        print_test("Concurrent worker processes lose no entries or fields", merged.totals()[0] == 61 and len(confirmed) == 60,
+                   f"Indexed: {merged.totals()[0]}, confirmed with hash: {len(confirmed)}")
+
+        app_index = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploaded_videos', '.storage_index.json')
+        before = os.stat(app_index).st_mtime_ns if os.path.exists(app_index) else None
+        subprocess.run([sys.executable, '-c', 'import app'], cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, timeout=120)
+        after = os.stat(app_index).st_mtime_ns if os.path.exists(app_index) else None
+        print_test("Importing app.py does not write the index", before == after)
+    finally:
+        shutil.rmtree(storage_dir)
+
+def test_index_journal():
+    """Test that changes reach other workers as journal deltas, without reloading the index"""
+    print("\n=== Testing Index Journal ===\n")
+
+    import json
+    from app import StorageIndex
+
+    storage_dir = tempfile.mkdtemp()
+    try:
+        index_path = os.path.join(storage_dir, '.storage_index.json')
+        worker_a = StorageIndex(storage_dir, index_path)
+        worker_b = StorageIndex(storage_dir, index_path)
+
+        worker_a.add_path(write_file(storage_dir, 'first.mp4', 10))
+        worker_b.refresh()
+        snapshot_state = os.stat(index_path).st_mtime_ns
+
+        rebuilds = []
+        original_rebuild = worker_b._rebuild_views
+        worker_b._rebuild_views = lambda: rebuilds.append(1) or original_rebuild()
+        worker_a.add_path(write_file(storage_dir, 'second.mp4', 20))
+        worker_a.confirm_drive('first.mp4', 'drive-first')
+        worker_a.remove(['second.mp4'])
+        print_test("Changes are appended to the journal, not rewritten into the index",
+                   os.stat(index_path).st_mtime_ns == snapshot_state and os.path.getsize(worker_a.journal_path) > 0)
+        print_test("Other worker applies the journal records", worker_b.refresh() and worker_b.totals() == (1, 10)
+                   and worker_b.get('first.mp4').get('drive_file_id') == 'drive-first')
+        print_test("Journal records are applied without re-sorting the views", rebuilds == [], f"Rebuilds: {len(rebuilds)}")
+        print_test("Nothing new in the journal: refresh is a no-op", worker_b.refresh() is False)
+
+        # A record torn by a writer that died mid-append is never applied, and the next writer drops it
+        with open(worker_a.journal_path, 'ab') as f:
+            f.write(b'{"seq": 99, "put": {"torn.mp4"')
+        print_test("Partial record is not applied", worker_b.refresh() is False and worker_b.get('torn.mp4') is None)
+        worker_a.add_path(write_file(storage_dir, 'third.mp4', 30))
+        worker_b.refresh()
+        print_test("Next change replaces the partial record", worker_b.totals() == (2, 40) and worker_b.get('torn.mp4') is None,
+                   f"Totals: {worker_b.totals()}")
+
+        worker_a.JOURNAL_COMPACT_BYTES = 0
+        worker_a.add_path(write_file(storage_dir, 'fourth.mp4', 40))
+        print_test("Large journal is compacted into the index", os.path.getsize(worker_a.journal_path) == 0
+                   and os.stat(index_path).st_mtime_ns != snapshot_state)
+        worker_b.refresh()
+        print_test("Other worker reloads a compacted index", worker_b.totals() == (3, 80) and len(rebuilds) == 1,
+                   f"Totals: {worker_b.totals()}, rebuilds: {len(rebuilds)}")
+        worker_b.confirm_drive('fourth.mp4', 'drive-fourth')
+        fresh = StorageIndex(storage_dir, index_path)
+        print_test("New process loads the index plus the journal", fresh.load() and fresh.totals() == (3, 80)
+                   and fresh.get('fourth.mp4').get('drive_file_id') == 'drive-fourth')
+
+        # Only one of several workers migrating the old registry merges it, and it is removed under the lock
+        registry_path = os.path.join(storage_dir, '.drive_uploads.json')
+        with open(registry_path, 'w') as f:
+            json.dump({'third.mp4': {'drive_file_id': 'drive-third', 'confirmed_at': 5}}, f)
+        worker_a.migrate_drive_registry(registry_path)
+        worker_b.migrate_drive_registry(registry_path)
+        worker_b.refresh()
+        print_test("Registry is merged once and removed", not os.path.exists(registry_path)
+                   and worker_b.get('third.mp4').get('drive_file_id') == 'drive-third')
+    finally:
+        shutil.rmtree(storage_dir)
+
+def test_retention_engine():
+    """Test that only Drive-confirmed files are evicted, least recently used first"""
+    print("\n=== Testing Retention Engine ===\n")
+
+    from app import StorageIndex, RetentionEngine
+
+    storage_dir = tempfile.mkdtemp()
+    try:
+        index = StorageIndex(storage_dir, os.path.join(storage_dir, '.storage_index.json'))
+        for i, name in enumerate(['old.mp4', 'recent.mp4', 'middle.mp4', 'unconfirmed.mp4']):
+            index.add_path(write_file(storage_dir, name, 100, mtime=1000 + i))
+        for name in ['old.mp4', 'recent.mp4', 'middle.mp4']:
+            index.confirm_drive(name, 'drive-' + name)
+        index.entries['old.mp4']['last_access'] = 2000
+        index.entries['middle.mp4']['last_access'] = 3000
+        index.entries['recent.mp4']['last_access'] = 4000
+
+        engine = RetentionEngine(storage_dir, index, max_bytes=250)
+        evicted, reclaimed = engine.run_once()
+        remaining = sorted(name for name in os.listdir(storage_dir) if not name.startswith('.'))
+
+        print_test("Evicts until under budget", (evicted, reclaimed) == (2, 200), f"Evicted {evicted} files, {reclaimed} bytes")
+        print_test("Keeps most recently used and unconfirmed files", remaining == ['recent.mp4', 'unconfirmed.mp4'], f"Remaining: {remaining}")
+        print_test("Index updated after eviction", index.totals() == (2, 200), f"Totals: {index.totals()}")
+        print_test("Reclaimed bytes counter", engine.get_stats()['reclaimed_bytes'] == 200)
+
+        engine = RetentionEngine(storage_dir, index, max_bytes=10 ** 12, max_age_seconds=60)
+        engine.run_once(now=4000 + 3600)
+        remaining = sorted(name for name in os.listdir(storage_dir) if not name.startswith('.'))
+        print_test("Age limit evicts idle confirmed files only", remaining == ['unconfirmed.mp4'], f"Remaining: {remaining}")
+    finally:
+        shutil.rmtree(storage_dir)
+
+def test_integrity_scrubber():
+    """Test hash verification, quarantine of corrupt files and orphan collection"""
+    print("\n=== Testing Integrity Scrubber ===\n")
+
+    import hashlib
+    from app import StorageIndex, IntegrityScrubber
+
+    storage_dir = tempfile.mkdtemp()
+    try:
+        index = StorageIndex(storage_dir, os.path.join(storage_dir, '.storage_index.json'))
+        quarantine_dir = os.path.join(storage_dir, '.quarantine')
+        scrubber = IntegrityScrubber(
+            storage_dir, index, quarantine_dir,
+            bytes_per_second=0, reverify_seconds=3600, tmp_max_age_seconds=60
+        )
+
+        good = write_file(storage_dir, 'good.mp4', 100, mtime=1000)
+        index.add_path(good, sha256=hashlib.sha256(b'x' * 100).hexdigest())
+        bad = write_file(storage_dir, 'bad.mp4', 100, mtime=1000)
+        index.add_path(bad, sha256=hashlib.sha256(b'x' * 100).hexdigest())
+        # Flip bytes in place without changing size or mtime (bit rot)
+        with open(bad, 'r+b') as f:
+            f.write(b'yy')
+        os.utime(bad, (1000, 1000))
+        index.add_path(write_file(storage_dir, 'legacy.mp4', 50))
+
+        old_tmp = write_file(storage_dir, 'crashed.mp4.tmp', 30, mtime=time.time() - 3600)
+        fresh_tmp = write_file(storage_dir, 'uploading.mp4.tmp', 30)
+
+        outcomes = scrubber.run_once()
+        print_test("Verifies, baselines and flags files", outcomes == {'ok': 1, 'corrupt': 1, 'baseline': 1}, f"Outcomes: {outcomes}")
+        print_test("Corrupt file moved to quarantine", os.path.exists(os.path.join(quarantine_dir, 'bad.mp4')) and not os.path.exists(bad))
+        print_test("Corrupt file dropped from the index", index.get('bad.mp4') is None and index.totals() == (2, 150))
+        print_test("Baseline hash recorded for files without one", index.get('legacy.mp4').get('sha256') == hashlib.sha256(b'x' * 50).hexdigest())
+        print_test("Old orphaned .tmp removed, fresh one kept", not os.path.exists(old_tmp) and os.path.exists(fresh_tmp))
+
+        outcomes = scrubber.run_once()
+        print_test("Recently verified files are not re-hashed", outcomes == {}, f"Outcomes: {outcomes}")
+        stats = scrubber.get_stats()
+        print_test("Progress reported", stats['progress_percent'] == 100.0 and stats['corrupt_files'] == 1 and stats['tmp_files_removed'] == 1)
+
+        write_file(storage_dir, 'good.mp4', 120)
+        outcomes = scrubber.run_once(now=time.time() + 7200)
+        print_test("Rewritten file is re-indexed, not quarantined", outcomes.get('changed') == 1 and index.get('good.mp4')['size'] == 120, f"Outcomes: {outcomes}")
+
+        started = time.monotonic()
+        from app import hash_file
+        hash_file(write_file(storage_dir, 'paced.bin', 2 * 1024 * 1024), bytes_per_second=4 * 1024 * 1024)
+        elapsed = time.monotonic() - started
+        print_test("Hashing is paced to the IO budget", elapsed >= 0.45, f"2 MB at 4 MB/s took {elapsed:.2f}s")
+    finally:
+        shutil.rmtree(storage_dir)
+
+def test_shared_scrubbing():
+    """Test that scrubbing state is shared by all workers"""
+    print("\n=== Testing Scrubbing Across Workers ===\n")
+
+    import hashlib
+    from app import StorageIndex, IntegrityScrubber
+
+    storage_dir = tempfile.mkdtemp()
+    try:
+        index_path = os.path.join(storage_dir, '.storage_index.json')
+        worker_a = StorageIndex(storage_dir, index_path)
+        worker_b = StorageIndex(storage_dir, index_path)
+        scrubbers = [
+            IntegrityScrubber(storage_dir, index, os.path.join(storage_dir, '.quarantine'),
+                              bytes_per_second=0, reverify_seconds=3600, tmp_max_age_seconds=60)
+            for index in (worker_a, worker_b)
+        ]
+
+        # Ingested by worker A, then corrupted before any scrub ran
+        index_hash = hashlib.sha256(b'x' * 100).hexdigest()
+        worker_a.add_path(write_file(storage_dir, 'good.mp4', 100, mtime=1000), sha256=index_hash)
+        bad = write_file(storage_dir, 'bad.mp4', 100, mtime=1000)
+        worker_a.add_path(bad, sha256=index_hash)
+        with open(bad, 'r+b') as f:
+            f.write(b'yy')
+        os.utime(bad, (1000, 1000))
+
+        outcomes = scrubbers[1].run_once()
+        print_test("Worker B checks against worker A's ingest hash", outcomes == {'ok': 1, 'corrupt': 1}, f"Outcomes: {outcomes}")
+        worker_a.flush()
+        print_test("Quarantine reaches worker A's index on its next flush", worker_a.get('bad.mp4') is None and worker_a.totals() == (1, 100))
+
+        outcomes = scrubbers[0].run_once()
+        print_test("Worker A does not re-hash what worker B verified", outcomes == {}, f"Outcomes: {outcomes}")
+    finally:
+        shutil.rmtree(storage_dir)
+
+def test_pagination():
+    """Test sorted, filtered, cursor-paginated listing"""
+    print("\n=== Testing Paginated Listing ===\n")
+
+    import app
+    from app import StorageIndex
+
+    storage_dir = tempfile.mkdtemp()
+    original_index = app.storage_index
+    try:
+        index = StorageIndex(storage_dir, os.path.join(storage_dir, '.storage_index.json'))
+        for i in range(25):
+            index.add_path(write_file(storage_dir, f'clip_{i:02d}.mp4', 10 + i, mtime=1000 + i))
+        index.add_path(write_file(storage_dir, 'notes.webm', 500, mtime=5000))
+
+        items, next_after = index.page(sort='name', descending=False, limit=10, prefix='clip_')
+        names = [filename for _, filename, _ in items]
+        print_test("First name page", names == [f'clip_{i:02d}.mp4' for i in range(10)], f"Names: {names[:3]}...")
+
+        seen = list(names)
+        while next_after:
+            items, next_after = index.page(sort='name', descending=False, after=next_after, limit=10, prefix='clip_')
+            seen.extend(filename for _, filename, _ in items)
+        print_test("Cursor walk visits every match once", seen == [f'clip_{i:02d}.mp4' for i in range(25)], f"Visited {len(seen)}")
+
+        items, _ = index.page(sort='size', descending=True, limit=2)
+        print_test("Size sort descending", [f for _, f, _ in items] == ['notes.webm', 'clip_24.mp4'])
+
+        items, _ = index.page(sort='mtime', descending=True, limit=5, content_type='video/webm')
+        print_test("Content-type filter", [f for _, f, _ in items] == ['notes.webm'])
+
+        print_test("Summary with prefix", index.summary(prefix='clip_') == (25, sum(10 + i for i in range(25))))
+        print_test("Summary with content type wildcard", index.summary(content_type='video/*') == (26, sum(10 + i for i in range(25)) + 500))
+
+        app.storage_index = index
+        client = app.app.test_client()
+        first = client.get('/api/videos/list?sort=mtime&order=asc&limit=20').get_json()
+        second = client.get(f"/api/videos/list?sort=mtime&order=asc&limit=20&cursor={first['next_cursor']}").get_json()
+        print_test(
+            "Endpoint pages through all videos",
+            first['count'] == 20 and second['count'] == 6 and second['next_cursor'] is None and first['total_count'] == 26,
+            f"Pages: {first['count']} + {second['count']}"
+        )
+        everything = client.get('/api/videos/list').get_json()
+        newest_first = [filename for filename, _ in sorted(index.snapshot(), key=lambda item: item[1]['ctime'], reverse=True)]
+        print_test(
+            "Without limit or cursor every video is listed, newest first",
+            everything['count'] == 26 and everything['next_cursor'] is None and everything['sort'] == 'ctime'
+            and [video['filename'] for video in everything['videos']] == newest_first
+        )
+        import base64, json
+        for sort_key in ('clip_05.mp4', None, True, [1]):
+            forged = base64.urlsafe_b64encode(json.dumps(['mtime', 'asc', sort_key, 'clip_05.mp4']).encode()).decode()
+            response = client.get(f'/api/videos/list?sort=mtime&order=asc&cursor={forged}')
+            print_test(f"Cursor with a {type(sort_key).__name__} sort key is rejected with 400", response.status_code == 400)
+        summary = client.get('/api/videos/list?summary=true&prefix=clip_').get_json()
+        print_test("Endpoint summary-only mode", summary['total_count'] == 25 and 'videos' not in summary)
+        bad = client.get('/api/videos/list?sort=created')
+        print_test("Endpoint rejects unknown sort field", bad.status_code == 400)
+    finally:
+        app.storage_index = original_index
+        shutil.rmtree(storage_dir)
+
+def test_streaming():
+    """Test Range, conditional GET and chunked delivery of the streaming endpoint"""
+    print("\n=== Testing Video Streaming ===\n")
+
+    import app
+    from app import StorageIndex
+
+    storage_dir = tempfile.mkdtemp()
+    original_index = app.storage_index
+    original_revocations = app.token_revocations
+    # Logging out below must not write to the real logs/.revoked_tokens.json
+    app.token_revocations = app.TokenRevocationList(os.path.join(storage_dir, 'revoked.json'))
+    try:
+        index = StorageIndex(storage_dir, os.path.join(storage_dir, '.storage_index.json'))
+        path = os.path.join(storage_dir, 'clip.mp4')
+        content = bytes(range(256)) * 4096  # 1 MB
+        with open(path, 'wb') as f:
+            f.write(content)
+        index.add_path(path)
+        app.storage_index = index
+        client = app.app.test_client()
+        token = app.generate_token('stream_user', 'stream_user@adda247.com')
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+
+        full = client.get('/api/videos/stream/clip.mp4')
+        print_test("Full GET returns the file", full.status_code == 200 and full.data == content)
+        print_test("Advertises byte ranges", full.headers.get('Accept-Ranges') == 'bytes')
+
+        partial = client.get('/api/videos/stream/clip.mp4', headers={'Range': 'bytes=1000-1999'})
+        print_test(
+            "Range request returns 206 with the exact slice",
+            partial.status_code == 206 and partial.data == content[1000:2000]
+            and partial.headers['Content-Range'] == f'bytes 1000-1999/{len(content)}',
+            f"Status: {partial.status_code}, bytes: {len(partial.data)}"
+        )
+
+        suffix = client.get('/api/videos/stream/clip.mp4', headers={'Range': 'bytes=-10'})
+        print_test("Suffix range", suffix.status_code == 206 and suffix.data == content[-10:])
+
+        unsatisfiable = client.get('/api/videos/stream/clip.mp4', headers={'Range': f'bytes={len(content) + 10}-'})
+        print_test("Unsatisfiable range returns 416", unsatisfiable.status_code == 416)
+
+        etag = full.headers['ETag']
+        not_modified = client.get('/api/videos/stream/clip.mp4', headers={'If-None-Match': etag})
+        print_test("If-None-Match returns 304", not_modified.status_code == 304 and not not_modified.data)
+
+        since = client.get('/api/videos/stream/clip.mp4', headers={'If-Modified-Since': full.headers['Last-Modified']})
+        print_test("If-Modified-Since returns 304", since.status_code == 304)
+
+        stale_if_range = client.get('/api/videos/stream/clip.mp4', headers={'Range': 'bytes=0-9', 'If-Range': '"other"'})
+        print_test("Mismatched If-Range falls back to the full file", stale_if_range.status_code == 200 and len(stale_if_range.data) == len(content))
+
+        head = client.head('/api/videos/stream/clip.mp4')
+        print_test("HEAD reports length without a body", head.status_code == 200 and head.headers['Content-Length'] == str(len(content)) and not head.data)
+
+        missing = client.get('/api/videos/stream/nothing.mp4')
+        print_test("Unknown video returns 404", missing.status_code == 404)
+
+        anonymous = app.app.test_client()
+        print_test("Streaming without a token is rejected", anonymous.get('/api/videos/stream/clip.mp4').status_code == 401)
+
+        signed = client.get('/api/videos/stream-url/clip.mp4').get_json()
+        ticketed = anonymous.get(signed['url'], headers={'Range': 'bytes=0-9'})
+        print_test("Signed URL streams without an Authorization header", ticketed.status_code == 206 and ticketed.data == content[:10])
+        ticket = signed['url'].split('ticket=')[1]
+        print_test("Ticket is bound to its video", anonymous.get(f'/api/videos/stream/other.mp4?ticket={ticket}').status_code == 401)
+        print_test("Ticket is not a session token", anonymous.get('/api/auth/verify', headers={'Authorization': f'Bearer {ticket}'}).status_code == 401)
+        expired = app.generate_ticket(app.verify_jwt(token)[0], 'video-stream', 'clip.mp4', -10)
+        print_test("Expired ticket is rejected", anonymous.get(f'/api/videos/stream/clip.mp4?ticket={expired}').status_code == 401)
+        app.revoke_token(token, app.verify_jwt(token)[0])
+        print_test("Logging out revokes the session's tickets", anonymous.get(signed['url']).status_code == 401)
+    finally:
+        app.storage_index = original_index
+        app.token_revocations = original_revocations
+        shutil.rmtree(storage_dir)
+
+def test_disk_admission():
+    """Test disk-space reservations and the 507 paths of uploads and downloads"""
+    print("\n=== Testing Disk Space Admission ===\n")
+
+    import io
+    import threading
+    import app
+    from app import DiskSpaceAdmission, StorageIndex
+
+    class FixedDisk(DiskSpaceAdmission):
+        """Reports a fixed amount of free space, so the numbers don't depend on the host"""
+        free = 0
+
+        def _free_bytes(self):
+            return self.free
+
+    storage_dir = tempfile.mkdtemp()
+    admission = FixedDisk(storage_dir, min_free_bytes=100)
+    admission.free = 1100
+    print_test("Room is free space minus the floor", admission.has_room(1000) and not admission.has_room(1001))
+
+    first = admission.reserve(600)
+    print_test("Reservations count against the headroom", first is not None and not admission.has_room(500))
+    print_test("A reservation that does not fit is rejected", admission.reserve(500) is None and admission.stats()['rejected'] == 1)
+
+    threading.Timer(0.1, admission.release, args=(first,)).start()
+    started = time.perf_counter()
+    second = admission.reserve(500, timeout=5)
+    print_test("A waiting reservation is admitted when another job releases", second is not None and time.perf_counter() - started < 2)
+    admission.release(second)
+    started = time.perf_counter()
+    print_test("Without reservations to wait for, a full disk rejects at once",
+               admission.reserve(2000, timeout=5) is None and time.perf_counter() - started < 1)
+    stats = admission.stats()
+    print_test("Stats after releases", stats['in_flight'] == 0 and stats['reserved_bytes'] == 0 and stats['headroom_bytes'] == 1000, f"Stats: {stats}")
+
+    original = (app.disk_admission, app.storage_index, app.get_drive_service, app.upload_video_to_drive, app.yt_dlp)
+    drive_uploads = []
+    app.disk_admission = FixedDisk(storage_dir, min_free_bytes=0)
+    app.storage_index = StorageIndex(storage_dir, os.path.join(storage_dir, '.storage_index.json'))
+    app.upload_video_to_drive = lambda content, name, mimetype='video/mp4': drive_uploads.append(name) or ('drive-id', 'https://drive/link', None)
+    try:
+        client = app.app.test_client()
+
+        def upload():
+            return client.post('/api/upload-video', data={'video': (io.BytesIO(b'x' * 4096), 'clip.mp4')}, content_type='multipart/form-data')
+
+        app.get_drive_service = lambda: None
+        response = upload()
+        print_test("Full disk and no Drive: upload rejected with 507", response.status_code == 507 and drive_uploads == [], f"Status: {response.status_code}")
+
+        app.get_drive_service = lambda: object()
+        response = upload()
+        body = response.get_json()
+        print_test("Full disk with Drive: upload still reaches Drive, not local storage",
+                   response.status_code == 200 and body['uploaded_to_drive'] and not body['saved_locally'] and app.storage_index.totals()[0] == 0,
+                   f"Body: {body}")
+
+        app.disk_admission.free = 10 * 1024 * 1024
+        response = upload()
+        body = response.get_json()
+        print_test("With room the upload is saved locally too", body['saved_locally'] and app.storage_index.totals()[0] == 1, f"Body: {body}")
+        print_test("Upload reservations are released", app.disk_admission.stats()['in_flight'] == 0)
+
+        downloaded = []
+
+        class FakeYoutubeDL:
+            def __init__(self, options):
+                self.options = options
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def extract_info(self, url, download=False):
+                return {'filesize': 20 * 1024 * 1024}
+
+            def process_ie_result(self, info, download=False):
+                downloaded.append(info)
+                return info
+
+        class FakeYtDlp:
+            YoutubeDL = FakeYoutubeDL
+
+        app.yt_dlp = FakeYtDlp()
+        result = app.download_youtube_video('https://www.youtube.com/watch?v=dQw4w9WgXcQ')
+        print_test("Download larger than the headroom is rejected before any media is fetched",
+                   result == (False, None, None, app.INSUFFICIENT_DISK_SPACE_ERROR) and downloaded == [], f"Result: {result}")
+        print_test("Rejected download holds no reservation", app.disk_admission.stats()['in_flight'] == 0)
+    finally:
+        app.disk_admission, app.storage_index, app.get_drive_service, app.upload_video_to_drive, app.yt_dlp = original
+        shutil.rmtree(storage_dir)
+
+def test_download_record_sweep():
+    """Test that finished download records expire and active ones are kept"""
+    print("\n=== Testing Download Record Sweep ===\n")
+
+    import app
+
+    retention = app.DOWNLOAD_RECORD_RETENTION_SECONDS
+    now = time.time()
+    original = dict(app.video_downloads_in_progress)
+    try:
+        with app.downloads_lock:
+            app.video_downloads_in_progress.clear()
+            app.video_downloads_in_progress.update({
+                'old-completed': {'status': 'completed', 'finished_ts': now - retention - 1},
+                'old-failed': {'status': 'failed', 'finished_ts': now - retention - 60},
+                'recent-completed': {'status': 'completed', 'finished_ts': now - 10},
+                'queued': {'status': 'queued'},
+                'downloading': {'status': 'downloading'}
+            })
+            active = app.count_active_downloads()
+        print_test("Queued and downloading records count as active", active == 2, f"Active: {active}")
+
+        removed = app.sweep_finished_downloads(now=now)
+        remaining = sorted(app.video_downloads_in_progress)
+        print_test("Finished records older than the retention expire", removed == 2 and remaining == ['downloading', 'queued', 'recent-completed'],
+                   f"Removed: {removed}, remaining: {remaining}")
+
+        removed = app.sweep_finished_downloads(now=now + retention)
+        remaining = sorted(app.video_downloads_in_progress)
+        print_test("Active downloads are kept however long they run", removed == 1 and remaining == ['downloading', 'queued'],
+                   f"Removed: {removed}, remaining: {remaining}")
+        with app.downloads_lock:
+            active = app.count_active_downloads()
+        print_test("Sweeping leaves the active count unchanged", active == 2, f"Active: {active}")
+
+        tasks = {name: interval for name, _, interval in app._background_tasks}
+        print_test("Sweeper is registered as a periodic background task",
+                   tasks.get('download-record-sweeper') == app.DOWNLOAD_SWEEP_INTERVAL_SECONDS, f"Tasks: {tasks}")
+    finally:
+        with app.downloads_lock:
+            app.video_downloads_in_progress.clear()
+            app.video_downloads_in_progress.update(original)
+
+def print_summary():
+    """Print test summary"""
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+    print(f"✓ Passed: {TESTS_PASSED}")
+    print(f"✗ Failed: {TESTS_FAILED}")
+    print(f"Total: {TESTS_PASSED + TESTS_FAILED}")
+    print("="*60)
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("STORAGE INDEX TEST SUITE")
+    print("="*60)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    # Test client requests would otherwise start the real retention, scrubber and index
+    # tasks against uploaded_videos/; the tests drive those components directly
+    import app
+    app._background_tasks_pid = os.getpid()
+
+    test_index_updates()
+    test_reconcile_and_persist()
+    test_sharded_layout()
+    test_shared_index()
+    test_index_journal()
+    test_retention_engine()
+    test_integrity_scrubber()
+    test_shared_scrubbing()
+    test_pagination()
+    test_streaming()
+    test_disk_admission()
+    test_download_record_sweep()
+
+    print_summary()
+
+    # Exit with appropriate code
+    sys.exit(0 if TESTS_FAILED == 0 else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Test script for video_manager.py scanning and manifests.
+Runs against temporary directories, so it never touches uploaded_videos/ or logs/.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+from datetime import datetime
+
+import video_manager
+
+# Test configuration
+TESTS_PASSED = 0
+TESTS_FAILED = 0
+
+def print_test(name, passed, message=""):
+    global TESTS_PASSED, TESTS_FAILED
+
+    if passed:
+        TESTS_PASSED += 1
+        print(f"✓ {name}")
+        if message:
+            print(f"  {message}")
+    else:
+        TESTS_FAILED += 1
+        print(f"✗ {name}")
+        if message:
+            print(f"  ERROR: {message}")
+
+def write_video(relative, size):
+    path = os.path.join(video_manager.VIDEO_STORAGE_DIR, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    return path
+
+def use_temp_dirs():
+    """Point video_manager at fresh temporary storage and log directories"""
+    root = tempfile.mkdtemp()
+    video_manager.VIDEO_STORAGE_DIR = os.path.join(root, 'uploaded_videos')
+    video_manager.LOG_DIR = os.path.join(root, 'logs')
+    video_manager.STORAGE_INDEX_FILE = os.path.join(video_manager.VIDEO_STORAGE_DIR, '.storage_index.json')
+    video_manager.MANIFEST_STATE_FILE = os.path.join(video_manager.LOG_DIR, '.manifest_state.json')
+    os.makedirs(video_manager.VIDEO_STORAGE_DIR)
+    return root
+
+def test_scan():
+    """Test the scandir scanner over flat files and shard directories"""
+    print("\n=== Testing Parallel Scan ===\n")
+
+    root = use_temp_dirs()
+    try:
+        for i in range(30):
+            write_video(video_manager.shard_relpath(f'clip_{i}.mp4'), i + 1)
+        write_video('legacy.mp4', 100)
+        write_video('.storage_index.json', 5)
+        write_video(video_manager.shard_relpath('partial.mp4') + '.tmp', 5)
+        write_video('notashard/ignored.mp4', 5)
+
+        records = video_manager.scan_videos(workers=4)
+        names = sorted(r['filename'] for r in records)
+        print_test("Finds sharded and flat videos", len(records) == 31 and 'legacy.mp4' in names, f"Found {len(records)}")
+        print_test("Skips hidden, .tmp and non-shard directories", not any(n.startswith('.') or n.endswith('.tmp') or n == 'ignored.mp4' for n in names))
+        print_test("Sizes come from the scan", sum(r['size'] for r in records) == sum(range(1, 31)) + 100)
+
+        matches = video_manager.scan_videos(name_filter=lambda name: 'clip_1' in name)
+        print_test("Name filter", sorted(r['filename'] for r in matches) == sorted(f'clip_{i}.mp4' for i in [1] + list(range(10, 20))))
+
+        path = video_manager.find_video_path('clip_3.mp4')
+        print_test("Finds a video's shard path by name", path is not None and path.endswith(video_manager.shard_relpath('clip_3.mp4')))
+    finally:
+        shutil.rmtree(root)
+
+def test_incremental_manifest():
+    """Test that manifests after the first only record changes"""
+    print("\n=== Testing Incremental Manifests ===\n")
+
+    root = use_temp_dirs()
+    try:
+        write_video(video_manager.shard_relpath('keep.mp4'), 10)
+        write_video(video_manager.shard_relpath('change.mp4'), 10)
+        write_video(video_manager.shard_relpath('drop.mp4'), 10)
+
+        first_file = video_manager.export_manifest()
+        with open(first_file) as f:
+            first = json.load(f)
+        print_test("First manifest is full", first['type'] == 'full' and first['total_videos'] == 3)
+
+        write_video(video_manager.shard_relpath('change.mp4'), 20)
+        os.remove(video_manager.find_video_path('drop.mp4'))
+        write_video(video_manager.shard_relpath('new.mp4'), 5)
+
+        delta_file = video_manager.export_manifest()
+        with open(delta_file) as f:
+            delta = json.load(f)
+        print_test("Second manifest is incremental", delta['type'] == 'incremental' and delta['base_manifest'] == os.path.basename(first_file))
+        print_test(
+            "Delta lists only the changes",
+            [v['filename'] for v in delta['added']] == ['new.mp4']
+            and [v['filename'] for v in delta['modified']] == ['change.mp4']
+            and delta['removed'] == ['drop.mp4'],
+            f"added={len(delta['added'])} modified={len(delta['modified'])} removed={delta['removed']}"
+        )
+        print_test("Delta carries current totals", delta['total_videos'] == 3 and delta['total_size_bytes'] == 35)
+
+        full_file = video_manager.export_manifest(full=True)
+        with open(full_file) as f:
+            full = json.load(f)
+        print_test("--full forces a complete manifest", full['type'] == 'full' and full['total_videos'] == 3)
+    finally:
+        shutil.rmtree(root)
+
+def test_bulk_delete():
+    """Test predicate-driven bulk deletion, its journal and crash-resume"""
+    print("\n=== Testing Bulk Delete ===\n")
+
+    root = use_temp_dirs()
+    try:
+        big = 2 * 1024 * 1024
+        for name in ['big_on_drive.mp4', 'big_local.mp4', 'small_on_drive.mp4']:
+            write_video(video_manager.shard_relpath(name), big if name.startswith('big') else 10)
+        def indexed_entry(name, **extra):
+            return dict({'path': video_manager.shard_relpath(name), 'size': big if name.startswith('big') else 10, 'mtime': 1000, 'ctime': 1000}, **extra)
+        index = {'version': 1, 'files': {
+            'big_on_drive.mp4': indexed_entry('big_on_drive.mp4', drive_file_id='a'),
+            'big_local.mp4': indexed_entry('big_local.mp4'),
+            'small_on_drive.mp4': indexed_entry('small_on_drive.mp4', drive_file_id='b')
+        }}
+        with open(video_manager.STORAGE_INDEX_FILE, 'w') as f:
+            json.dump(index, f)
+
+        result = video_manager.bulk_delete(['--min-size', '1', '--drive-confirmed'])
+        print_test("Dry run without --yes deletes nothing", result is None and len(video_manager.scan_videos()) == 3)
+
+        summary = video_manager.bulk_delete(['--min-size', '1', '--drive-confirmed', '--workers', '4', '--yes'])
+        remaining = sorted(r['filename'] for r in video_manager.scan_videos())
+        print_test("Deletes only videos matching every predicate", remaining == ['big_local.mp4', 'small_on_drive.mp4'], f"Remaining: {remaining}")
+        print_test("Summary reports deleted bytes", summary['deleted'] == 1 and summary['deleted_bytes'] == big)
+
+        with open(summary['journal']) as f:
+            events = [json.loads(line)['event'] for line in f]
+        print_test("Journal records plan, outcome and completion", events == ['plan', 'deleted', 'complete'], f"Events: {events}")
+
+        with open(video_manager.STORAGE_INDEX_FILE) as f:
+            indexed = sorted(json.load(f)['files'])
+        print_test("Deleted videos dropped from the storage index", indexed == ['big_local.mp4', 'small_on_drive.mp4'])
+
+        refused = video_manager.bulk_delete(['--yes'])
+        print_test("Refuses to run without a manifest or predicate", refused is None and len(video_manager.scan_videos()) == 2)
+
+        # Simulate a run that crashed after deleting the first of two planned files
+        first = write_video(video_manager.shard_relpath('done.mp4'), 5)
+        second = write_video(video_manager.shard_relpath('pending.mp4'), 7)
+        os.remove(first)
+        journal_path = os.path.join(video_manager.LOG_DIR, 'deletions_crashed.jsonl')
+        with open(journal_path, 'w') as f:
+            f.write(json.dumps({'event': 'plan', 'criteria': {}, 'files': [
+                {'filename': 'done.mp4', 'path': first, 'size': 5},
+                {'filename': 'pending.mp4', 'path': second, 'size': 7}
+            ]}) + '\n')
+            f.write(json.dumps({'event': 'deleted', 'filename': 'done.mp4', 'path': first, 'size': 5}) + '\n')
+            f.write('{"event": "dele')
+
+        resumed = video_manager.bulk_delete(['--resume', journal_path, '--yes'])
+        print_test("Resume deletes only the unfinished files", resumed['deleted'] == 1 and not os.path.exists(second))
+        _, finished = video_manager.read_deletion_journal(journal_path)
+        print_test("Resumed journal stays readable after a torn line", finished == {'done.mp4', 'pending.mp4'})
+
+        manifest_path = os.path.join(root, 'to_delete.txt')
+        with open(manifest_path, 'w') as f:
+            f.write('big_local.mp4\n')
+        video_manager.bulk_delete(['--manifest', manifest_path, '--yes'])
+        remaining = sorted(r['filename'] for r in video_manager.scan_videos())
+        print_test("Manifest-driven deletion", remaining == ['small_on_drive.mp4'], f"Remaining: {remaining}")
+    finally:
+        shutil.rmtree(root)
+
+def print_summary():
+    """Print test summary"""
+    print("\n" + "="*60)
+    print("TEST SUMMARY")
+    print("="*60)
+    print(f"✓ Passed: {TESTS_PASSED}")
+    print(f"✗ Failed: {TESTS_FAILED}")
+    print(f"Total: {TESTS_PASSED + TESTS_FAILED}")
+    print("="*60)
+
+def main():
+    """Run all tests"""
+    print("\n" + "="*60)
+    print("VIDEO MANAGER TEST SUITE")
+    print("="*60)
+    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    test_scan()
+    test_incremental_manifest()
+    test_bulk_delete()
+
+    print_summary()
+
+    # Exit with appropriate code
+    sys.exit(0 if TESTS_FAILED == 0 else 1)
+
+if __name__ == '__main__':
+    main()
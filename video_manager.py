@@ -7,6 +7,10 @@ This script provides command-line utilities for managing locally stored videos.
 
 import os
 import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 import json
@@ -14,8 +18,102 @@ import json
 # Add parent directory to path to import from app.py
 sys.path.insert(0, os.path.dirname(__file__))
 
+from app import StorageIndex
+
 VIDEO_STORAGE_DIR = os.path.join(os.path.dirname(__file__), 'uploaded_videos')
 LOG_DIR = os.path.join(os.path.dirname(__file__), 'logs')
+STORAGE_INDEX_FILE = os.path.join(VIDEO_STORAGE_DIR, '.storage_index.json')
+
+# Shard layout helpers are shared with the server, so both always agree on paths
+SHARD_DEPTH = StorageIndex.SHARD_DEPTH
+shard_relpath = StorageIndex.shard_relpath
+is_video_name = StorageIndex.is_video_name
+is_shard_name = StorageIndex.is_shard_name
+
+# Shard directories are scanned in parallel; scandir/stat release the GIL
+SCAN_WORKERS = int(os.environ.get('VIDEO_SCAN_WORKERS', 8))
+MANIFEST_STATE_FILE = os.path.join(LOG_DIR, '.manifest_state.json')
+DELETE_WORKERS = int(os.environ.get('VIDEO_DELETE_WORKERS', 8))
+
+def video_record(entry):
+    """Record for a scanned os.DirEntry (its stat result is cached by scandir)"""
+    stats = entry.stat()
+    return {
+        'filename': entry.name,
+        'path': entry.path,
+        'size': stats.st_size,
+        'mtime': stats.st_mtime,
+        'ctime': stats.st_ctime
+    }
+
+def _scan_directory(directory, depth, name_filter, records):
+    """Collect video records under directory with os.scandir (one stat per matching file)"""
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if depth < SHARD_DEPTH and is_shard_name(entry.name):
+                        _scan_directory(entry.path, depth + 1, name_filter, records)
+                    continue
+                if not is_video_name(entry.name) or not entry.is_file():
+                    continue
+                if name_filter is not None and not name_filter(entry.name):
+                    continue
+                records.append(video_record(entry))
+    except FileNotFoundError:
+        pass
+    return records
+
+def scan_videos(name_filter=None, workers=SCAN_WORKERS):
+    """
+    Scan VIDEO_STORAGE_DIR (flat files and shard directories) and return a list of
+    {'filename', 'path', 'size', 'mtime', 'ctime'} records.
+    Top-level shard directories are fanned out over a thread pool. name_filter is
+    applied before stat, so searches only stat the files that match.
+    """
+    records = []
+    shard_dirs = []
+    with os.scandir(VIDEO_STORAGE_DIR) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if is_shard_name(entry.name):
+                    shard_dirs.append(entry.path)
+                continue
+            if not is_video_name(entry.name) or not entry.is_file():
+                continue
+            if name_filter is not None and not name_filter(entry.name):
+                continue
+            records.append(video_record(entry))
+
+    if shard_dirs:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for shard_records in executor.map(lambda path: _scan_directory(path, 1, name_filter, []), shard_dirs):
+                records.extend(shard_records)
+
+    return records
+
+def find_video_path(filename):
+    """Path of a video by name (shard location first, then the flat layout), or None"""
+    for relative in (shard_relpath(filename), filename):
+        path = os.path.join(VIDEO_STORAGE_DIR, relative)
+        if os.path.isfile(path):
+            return path
+    return None
+
+def update_storage_index(mutate):
+    """
+    Apply mutate(files) to the persisted storage index, if there is one.
+    Uses the server's read-merge-write under the index file lock, so changes running
+    workers make at the same time are kept, and they pick these up on their next flush.
+    """
+    if not os.path.exists(STORAGE_INDEX_FILE):
+        return
+    try:
+        index = StorageIndex(VIDEO_STORAGE_DIR, STORAGE_INDEX_FILE)
+        if index.load():
+            index.modify(mutate)
+    except Exception as e:
+        print(f"⚠️  Could not update storage index ({e}); it will be rebuilt on the next reconcile")
 
 def ensure_directories():
     """Ensure storage directories exist"""
@@ -34,21 +132,14 @@ def list_videos():
     videos = []
     total_size = 0
     
-    for filename in os.listdir(VIDEO_STORAGE_DIR):
-        filepath = os.path.join(VIDEO_STORAGE_DIR, filename)
-        
-        if os.path.isfile(filepath) and not filename.startswith('.'):
-            stats = os.stat(filepath)
-            size_mb = stats.st_size / (1024 * 1024)
-            created = datetime.fromtimestamp(stats.st_ctime)
-            
-            videos.append({
-                'filename': filename,
-                'size_mb': size_mb,
-                'created': created,
-                'path': filepath
-            })
-            total_size += stats.st_size
+    for record in scan_videos():
+        videos.append({
+            'filename': record['filename'],
+            'size_mb': record['size'] / (1024 * 1024),
+            'created': datetime.fromtimestamp(record['ctime']),
+            'path': record['path']
+        })
+        total_size += record['size']
     
     videos.sort(key=lambda x: x['created'], reverse=True)
     
@@ -72,16 +163,12 @@ def get_stats():
     video_count = 0
     file_types = {}
     
-    for filename in os.listdir(VIDEO_STORAGE_DIR):
-        filepath = os.path.join(VIDEO_STORAGE_DIR, filename)
+    for record in scan_videos():
+        video_count += 1
+        total_size += record['size']
         
-        if os.path.isfile(filepath) and not filename.startswith('.'):
-            video_count += 1
-            size = os.path.getsize(filepath)
-            total_size += size
-            
-            ext = os.path.splitext(filename)[1].lower()
-            file_types[ext] = file_types.get(ext, 0) + 1
+        ext = os.path.splitext(record['filename'])[1].lower()
+        file_types[ext] = file_types.get(ext, 0) + 1
     
     print("\n📊 Storage Statistics")
     print("="*50)
@@ -123,21 +210,15 @@ def find_video(search_term):
         return
     
     matches = []
+    term = search_term.lower()
     
-    for filename in os.listdir(VIDEO_STORAGE_DIR):
-        filepath = os.path.join(VIDEO_STORAGE_DIR, filename)
-        
-        if os.path.isfile(filepath) and search_term.lower() in filename.lower():
-            stats = os.stat(filepath)
-            size_mb = stats.st_size / (1024 * 1024)
-            created = datetime.fromtimestamp(stats.st_ctime)
-            
-            matches.append({
-                'filename': filename,
-                'size_mb': size_mb,
-                'created': created,
-                'path': filepath
-            })
+    for record in scan_videos(name_filter=lambda name: term in name.lower()):
+        matches.append({
+            'filename': record['filename'],
+            'size_mb': record['size'] / (1024 * 1024),
+            'created': datetime.fromtimestamp(record['ctime']),
+            'path': record['path']
+        })
     
     if not matches:
         print(f"\n❌ No videos found matching: {search_term}")
@@ -152,11 +233,11 @@ def find_video(search_term):
         print(f"   Created: {video['created'].strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"   Path: {video['path']}")
 
-def delete_video(filename):
-    """Delete a specific video file"""
-    filepath = os.path.join(VIDEO_STORAGE_DIR, filename)
+def delete_video(filename, assume_yes=False):
+    """Delete a specific video file (assume_yes skips the confirmation prompt)"""
+    filepath = find_video_path(filename)
     
-    if not os.path.exists(filepath):
+    if filepath is None:
         print(f"❌ Video not found: {filename}")
         return
     
@@ -164,58 +245,117 @@ def delete_video(filename):
         size = os.path.getsize(filepath)
         size_mb = size / (1024 * 1024)
         
-        confirm = input(f"⚠️  Delete '{filename}' ({size_mb:.2f} MB)? (yes/no): ")
+        confirm = 'yes' if assume_yes else input(f"⚠️  Delete '{filename}' ({size_mb:.2f} MB)? (yes/no): ")
         
         if confirm.lower() == 'yes':
             os.remove(filepath)
+            update_storage_index(lambda files: files.pop(filename, None))
             print(f"✓ Deleted: {filename}")
         else:
             print("❌ Deletion cancelled")
     except Exception as e:
         print(f"❌ Error deleting video: {e}")
 
-def export_manifest():
-    """Export a JSON manifest of all videos"""
+def manifest_record(record):
+    """Manifest entry for a scanned video"""
+    return {
+        'filename': record['filename'],
+        'size_bytes': record['size'],
+        'size_mb': round(record['size'] / (1024 * 1024), 2),
+        'created': datetime.fromtimestamp(record['ctime']).isoformat(),
+        'modified': datetime.fromtimestamp(record['mtime']).isoformat(),
+        'path': record['path']
+    }
+
+def load_manifest_state():
+    """State of the last exported manifest: {'generated', 'manifest', 'files': {filename: [path, size, mtime]}}"""
+    try:
+        with open(MANIFEST_STATE_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️  Ignoring unreadable manifest state ({e}); exporting a full manifest")
+        return None
+
+def save_manifest_state(state):
+    temp_path = MANIFEST_STATE_FILE + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(temp_path, MANIFEST_STATE_FILE)
+
+def export_manifest(full=False):
+    """
+    Export a JSON manifest of the videos.
+    After the first (full) manifest, only videos added, modified or removed since the
+    previous manifest are written, unless full=True.
+    """
     if not os.path.exists(VIDEO_STORAGE_DIR):
         print("❌ Video storage directory does not exist")
         return
     
-    videos = []
-    
-    for filename in os.listdir(VIDEO_STORAGE_DIR):
-        filepath = os.path.join(VIDEO_STORAGE_DIR, filename)
+    os.makedirs(LOG_DIR, exist_ok=True)
+    records = scan_videos()
+    generated = datetime.now()
+    files = {r['filename']: [r['path'], r['size'], r['mtime']] for r in records}
+    total_size = sum(r['size'] for r in records)
+    previous = None if full else load_manifest_state()
+    
+    if previous is None:
+        manifest_file = os.path.join(LOG_DIR, f'video_manifest_{generated.strftime("%Y%m%d_%H%M%S")}.json')
+        manifest = {
+            'generated': generated.isoformat(),
+            'type': 'full',
+            'total_videos': len(records),
+            'total_size_bytes': total_size,
+            'total_size_mb': round(total_size / (1024 * 1024), 2),
+            'videos': [manifest_record(r) for r in records]
+        }
+    else:
+        previous_files = previous.get('files', {})
+        added = []
+        modified = []
+        for record in records:
+            before = previous_files.get(record['filename'])
+            if before is None:
+                added.append(manifest_record(record))
+            elif before != files[record['filename']]:
+                modified.append(manifest_record(record))
+        removed = sorted(previous_files.keys() - files.keys())
         
-        if os.path.isfile(filepath) and not filename.startswith('.'):
-            stats = os.stat(filepath)
-            
-            videos.append({
-                'filename': filename,
-                'size_bytes': stats.st_size,
-                'size_mb': round(stats.st_size / (1024 * 1024), 2),
-                'created': datetime.fromtimestamp(stats.st_ctime).isoformat(),
-                'modified': datetime.fromtimestamp(stats.st_mtime).isoformat(),
-                'path': filepath
-            })
-    
-    manifest_file = os.path.join(LOG_DIR, f'video_manifest_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
-    
-    manifest = {
-        'generated': datetime.now().isoformat(),
-        'total_videos': len(videos),
-        'total_size_bytes': sum(v['size_bytes'] for v in videos),
-        'total_size_mb': round(sum(v['size_bytes'] for v in videos) / (1024 * 1024), 2),
-        'videos': videos
-    }
+        manifest_file = os.path.join(LOG_DIR, f'video_manifest_delta_{generated.strftime("%Y%m%d_%H%M%S")}.json')
+        manifest = {
+            'generated': generated.isoformat(),
+            'type': 'incremental',
+            'since': previous.get('generated'),
+            'base_manifest': previous.get('manifest'),
+            'total_videos': len(records),
+            'total_size_bytes': total_size,
+            'total_size_mb': round(total_size / (1024 * 1024), 2),
+            'added': added,
+            'modified': modified,
+            'removed': removed
+        }
     
     with open(manifest_file, 'w') as f:
         json.dump(manifest, f, indent=2)
     
+    save_manifest_state({
+        'generated': manifest['generated'],
+        'manifest': os.path.basename(manifest_file),
+        'files': files
+    })
+    
     print(f"✓ Manifest exported: {manifest_file}")
-    print(f"  Total Videos: {len(videos)}")
+    print(f"  Total Videos: {len(records)}")
     print(f"  Total Size: {manifest['total_size_mb']} MB")
+    if manifest['type'] == 'incremental':
+        print(f"  Changes since {manifest['since']}: +{len(manifest['added'])} added, "
+              f"~{len(manifest['modified'])} modified, -{len(manifest['removed'])} removed")
+    return manifest_file
 
-def cleanup_old_videos(days=30, dry_run=True):
-    """Clean up videos older than specified days"""
+def cleanup_old_videos(days=30, dry_run=True, assume_yes=False):
+    """Clean up videos older than specified days (assume_yes skips the confirmation prompt)"""
     if not os.path.exists(VIDEO_STORAGE_DIR):
         print("❌ Video storage directory does not exist")
         return
@@ -226,21 +366,17 @@ def cleanup_old_videos(days=30, dry_run=True):
     old_videos = []
     total_size = 0
     
-    for filename in os.listdir(VIDEO_STORAGE_DIR):
-        filepath = os.path.join(VIDEO_STORAGE_DIR, filename)
+    for record in scan_videos():
+        created = datetime.fromtimestamp(record['ctime'])
         
-        if os.path.isfile(filepath) and not filename.startswith('.'):
-            created = datetime.fromtimestamp(os.path.getctime(filepath))
-            
-            if created < cutoff_date:
-                size = os.path.getsize(filepath)
-                old_videos.append({
-                    'filename': filename,
-                    'path': filepath,
-                    'size': size,
-                    'created': created
-                })
-                total_size += size
+        if created < cutoff_date:
+            old_videos.append({
+                'filename': record['filename'],
+                'path': record['path'],
+                'size': record['size'],
+                'created': created
+            })
+            total_size += record['size']
     
     if not old_videos:
         print(f"\n✓ No videos older than {days} days found")
@@ -259,18 +395,274 @@ def cleanup_old_videos(days=30, dry_run=True):
         print(f"\n⚠️  DRY RUN MODE - No files deleted")
         print(f"   Run with --execute to actually delete these files")
     else:
-        confirm = input(f"\n⚠️  Delete {len(old_videos)} videos? (yes/no): ")
+        confirm = 'yes' if assume_yes else input(f"\n⚠️  Delete {len(old_videos)} videos? (yes/no): ")
         
         if confirm.lower() == 'yes':
-            for video in old_videos:
-                try:
-                    os.remove(video['path'])
-                    print(f"✓ Deleted: {video['filename']}")
-                except Exception as e:
-                    print(f"❌ Error deleting {video['filename']}: {e}")
+            run_bulk_delete(old_videos, criteria={'older_than_days': days})
         else:
             print("❌ Cleanup cancelled")
 
+def load_deletion_manifest(manifest_path):
+    """
+    Filenames to delete from a manifest: a manifest exported by this tool
+    ('videos' or 'added'/'modified' lists), a JSON list of filenames or records,
+    or a text file with one filename per line.
+    """
+    with open(manifest_path, 'r') as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return {line.strip() for line in content.splitlines() if line.strip()}
+
+    if isinstance(data, dict):
+        items = data.get('videos', []) + data.get('added', []) + data.get('modified', [])
+    else:
+        items = data
+    return {item['filename'] if isinstance(item, dict) else item for item in items}
+
+def select_videos(manifest=None, older_than_days=None, min_size_mb=None, max_size_mb=None, drive_confirmed=False):
+    """Scan for videos matching every given predicate"""
+    name_filter = None
+    if manifest:
+        names = load_deletion_manifest(manifest)
+        name_filter = names.__contains__
+
+    confirmed = None
+    if drive_confirmed:
+        # load() applies the index journal too, where recent Drive confirmations live
+        index = StorageIndex(VIDEO_STORAGE_DIR, STORAGE_INDEX_FILE)
+        index.load()
+        confirmed = {name for name, entry in index.snapshot() if entry.get('drive_file_id')}
+
+    cutoff = time.time() - older_than_days * 86400 if older_than_days is not None else None
+    selected = []
+    for record in scan_videos(name_filter=name_filter):
+        if cutoff is not None and record['ctime'] >= cutoff:
+            continue
+        if min_size_mb is not None and record['size'] < min_size_mb * 1024 * 1024:
+            continue
+        if max_size_mb is not None and record['size'] > max_size_mb * 1024 * 1024:
+            continue
+        if confirmed is not None and record['filename'] not in confirmed:
+            continue
+        selected.append(record)
+    return selected
+
+def read_deletion_journal(journal_path):
+    """Return (plan_record, finished_filenames) from a deletion journal"""
+    plan = None
+    finished = set()
+    with open(journal_path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn last line from a crash
+                continue
+            if record.get('event') == 'plan':
+                plan = record
+            elif record.get('event') in ('deleted', 'missing'):
+                finished.add(record['filename'])
+    return plan, finished
+
+def run_bulk_delete(videos, criteria=None, workers=DELETE_WORKERS, journal_path=None, resume=False):
+    """
+    Delete videos ({'filename', 'path', 'size'} records) in parallel.
+    Every outcome is appended to a JSONL journal in LOG_DIR, which doubles as an
+    audit log and lets an interrupted run be resumed with resume=True.
+    Returns a summary dict.
+    """
+    os.makedirs(LOG_DIR, exist_ok=True)
+    if journal_path is None:
+        journal_path = os.path.join(LOG_DIR, f'deletions_{datetime.now().strftime("%Y%m%d_%H%M%S")}.jsonl')
+
+    journal = open(journal_path, 'a')
+    journal_lock = threading.Lock()
+    if journal.tell() > 0:
+        # Terminate a line torn by a crash so the next record starts cleanly
+        with open(journal_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                journal.write('\n')
+
+    def log(record):
+        record['time'] = datetime.now().isoformat()
+        with journal_lock:
+            journal.write(json.dumps(record) + '\n')
+            journal.flush()
+
+    if not resume:
+        log({
+            'event': 'plan',
+            'criteria': criteria or {},
+            'files': [{'filename': v['filename'], 'path': v['path'], 'size': v['size']} for v in videos]
+        })
+
+    def unlink(video):
+        try:
+            os.remove(video['path'])
+            log({'event': 'deleted', 'filename': video['filename'], 'path': video['path'], 'size': video['size']})
+            return 'deleted', video
+        except FileNotFoundError:
+            log({'event': 'missing', 'filename': video['filename'], 'path': video['path']})
+            return 'missing', video
+        except Exception as e:
+            log({'event': 'error', 'filename': video['filename'], 'path': video['path'], 'error': str(e)})
+            return 'error', video
+
+    started = time.time()
+    counts = {'deleted': 0, 'missing': 0, 'error': 0}
+    deleted_bytes = 0
+    removed_names = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for outcome, video in executor.map(unlink, videos):
+                counts[outcome] += 1
+                if outcome == 'deleted':
+                    deleted_bytes += video['size']
+                if outcome != 'error':
+                    removed_names.append(video['filename'])
+                else:
+                    print(f"❌ Error deleting {video['filename']}")
+        elapsed = time.time() - started
+
+        summary = {
+            'event': 'complete',
+            'deleted': counts['deleted'],
+            'missing': counts['missing'],
+            'errors': counts['error'],
+            'deleted_bytes': deleted_bytes,
+            'elapsed_seconds': round(elapsed, 3),
+            'files_per_second': round(counts['deleted'] / elapsed, 1) if elapsed > 0 else None,
+            'mb_per_second': round(deleted_bytes / (1024 * 1024) / elapsed, 2) if elapsed > 0 else None
+        }
+        log(dict(summary))
+    finally:
+        journal.close()
+
+    if removed_names:
+        def drop_entries(files):
+            for filename in removed_names:
+                files.pop(filename, None)
+        update_storage_index(drop_entries)
+
+    print(f"\n✓ Deleted {summary['deleted']} videos ({deleted_bytes / (1024 * 1024):.2f} MB) "
+          f"in {summary['elapsed_seconds']}s with {workers} workers")
+    if summary['files_per_second'] is not None:
+        print(f"  Throughput: {summary['files_per_second']} files/s, {summary['mb_per_second']} MB/s")
+    if counts['missing'] or counts['error']:
+        print(f"  Already gone: {counts['missing']}, errors: {counts['error']}")
+    print(f"  Journal: {journal_path}")
+    summary['journal'] = journal_path
+    return summary
+
+def bulk_delete(args):
+    """Non-interactive batch deletion by manifest and/or predicates, or resume of a journal"""
+    parser = argparse.ArgumentParser(prog='video_manager.py bulk-delete')
+    parser.add_argument('--manifest', help='manifest JSON or text file listing filenames to delete')
+    parser.add_argument('--older-than', type=float, metavar='DAYS', help='only videos created more than DAYS ago')
+    parser.add_argument('--min-size', type=float, metavar='MB', help='only videos of at least MB megabytes')
+    parser.add_argument('--max-size', type=float, metavar='MB', help='only videos of at most MB megabytes')
+    parser.add_argument('--drive-confirmed', action='store_true', help='only videos confirmed on Google Drive')
+    parser.add_argument('--workers', type=int, default=DELETE_WORKERS, help='parallel unlink workers')
+    parser.add_argument('--resume', metavar='JOURNAL', help='finish an interrupted run from its journal')
+    parser.add_argument('--yes', action='store_true', help='delete without asking (otherwise dry run)')
+    options = parser.parse_args(args)
+
+    if options.resume:
+        plan, finished = read_deletion_journal(options.resume)
+        if plan is None:
+            print(f"❌ No deletion plan found in journal: {options.resume}")
+            return
+        videos = [v for v in plan['files'] if v['filename'] not in finished]
+        print(f"\n🔁 Resuming {options.resume}: {len(finished)} done, {len(videos)} remaining")
+        criteria = plan.get('criteria', {})
+    else:
+        criteria = {
+            'manifest': options.manifest,
+            'older_than_days': options.older_than,
+            'min_size_mb': options.min_size,
+            'max_size_mb': options.max_size,
+            'drive_confirmed': options.drive_confirmed
+        }
+        if not any(value for value in criteria.values()):
+            print("❌ Refusing to delete everything: give --manifest and/or a predicate")
+            return
+        videos = select_videos(options.manifest, options.older_than, options.min_size, options.max_size, options.drive_confirmed)
+        criteria = {key: value for key, value in criteria.items() if value}
+
+    total_size = sum(v['size'] for v in videos)
+    print(f"\n🗑️  {len(videos)} videos selected ({total_size / (1024 * 1024):.2f} MB)")
+
+    if not videos:
+        return
+    if not options.yes:
+        for video in videos[:20]:
+            print(f"  - {video['filename']} ({video['size'] / (1024 * 1024):.2f} MB)")
+        if len(videos) > 20:
+            print(f"  ... and {len(videos) - 20} more")
+        print(f"\n⚠️  DRY RUN MODE - No files deleted")
+        print(f"   Add --yes to actually delete these files")
+        return
+
+    return run_bulk_delete(
+        videos,
+        criteria=criteria,
+        workers=options.workers,
+        journal_path=options.resume,
+        resume=bool(options.resume)
+    )
+
+def migrate_shards(dry_run=True):
+    """Move videos from the old flat layout into their hashed shard directories"""
+    if not os.path.exists(VIDEO_STORAGE_DIR):
+        print("❌ Video storage directory does not exist")
+        return
+
+    flat_videos = []
+    with os.scandir(VIDEO_STORAGE_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and not entry.name.startswith('.') and not entry.name.endswith('.tmp'):
+                flat_videos.append(entry.name)
+
+    if not flat_videos:
+        print("\n✓ All videos are already in the shard layout")
+        return
+
+    print(f"\n📦 Found {len(flat_videos)} videos in the flat layout")
+
+    if dry_run:
+        for filename in sorted(flat_videos)[:20]:
+            print(f"  - {filename} -> {shard_relpath(filename)}")
+        if len(flat_videos) > 20:
+            print(f"  ... and {len(flat_videos) - 20} more")
+        print(f"\n⚠️  DRY RUN MODE - No files moved")
+        print(f"   Run migrate-shards-exec to actually move these files")
+        return
+
+    moved = {}
+    for filename in flat_videos:
+        relative = shard_relpath(filename)
+        target = os.path.join(VIDEO_STORAGE_DIR, relative)
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Same filesystem, so this is an atomic rename that keeps mtime
+            os.rename(os.path.join(VIDEO_STORAGE_DIR, filename), target)
+            moved[filename] = relative
+        except Exception as e:
+            print(f"❌ Error moving {filename}: {e}")
+
+    # Point existing index entries at the new locations (keeps Drive confirmations)
+    def set_paths(files):
+        for filename, relative in moved.items():
+            if filename in files:
+                files[filename]['path'] = relative
+    if moved:
+        update_storage_index(set_paths)
+
+    print(f"✓ Moved {len(moved)} of {len(flat_videos)} videos into shard directories")
+
 def print_help():
     """Print help message"""
     print("""
@@ -284,10 +676,15 @@ Commands:
     stats             - Show storage statistics
     logs [lines]      - Show recent log entries (default: 50 lines)
     find <term>       - Find videos matching search term
-    delete <filename> - Delete a specific video
-    manifest          - Export JSON manifest of all videos
+    delete <filename> [--yes] - Delete a specific video
+    manifest [--full] - Export JSON manifest (only changes since the last one, unless --full)
     cleanup <days>    - Show videos older than N days (dry run)
-    cleanup-exec <days> - Delete videos older than N days
+    cleanup-exec <days> [--yes] - Delete videos older than N days
+    bulk-delete [options] - Batch delete by manifest/predicates (dry run unless --yes)
+                        --manifest FILE, --older-than DAYS, --min-size MB, --max-size MB,
+                        --drive-confirmed, --workers N, --resume JOURNAL, --yes
+    migrate-shards    - Show flat-layout videos that would move into shards (dry run)
+    migrate-shards-exec - Move flat-layout videos into shard directories
     check             - Verify directories exist
     help              - Show this help message
 
@@ -299,6 +696,9 @@ Examples:
     python video_manager.py delete "20241112_143052_video.mp4"
     python video_manager.py cleanup 30
     python video_manager.py cleanup-exec 30
+    python video_manager.py bulk-delete --older-than 30 --drive-confirmed --yes
+    python video_manager.py bulk-delete --resume logs/deletions_20241112_030000.jsonl --yes
+    python video_manager.py migrate-shards-exec
     """)
 
 def main():
@@ -325,15 +725,21 @@ def main():
         if len(sys.argv) < 3:
             print("❌ Usage: python video_manager.py delete <filename>")
             return
-        delete_video(sys.argv[2])
+        delete_video(sys.argv[2], assume_yes='--yes' in sys.argv[3:])
     elif command == 'manifest':
-        export_manifest()
+        export_manifest(full='--full' in sys.argv[2:])
     elif command == 'cleanup':
         days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
         cleanup_old_videos(days, dry_run=True)
     elif command == 'cleanup-exec':
-        days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
-        cleanup_old_videos(days, dry_run=False)
+        days = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2] != '--yes' else 30
+        cleanup_old_videos(days, dry_run=False, assume_yes='--yes' in sys.argv[2:])
+    elif command == 'bulk-delete':
+        bulk_delete(sys.argv[2:])
+    elif command == 'migrate-shards':
+        migrate_shards(dry_run=True)
+    elif command == 'migrate-shards-exec':
+        migrate_shards(dry_run=False)
     elif command == 'check':
         ensure_directories()
     elif command == 'help':